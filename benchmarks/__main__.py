@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Run lelesk benchmarks
+
+Usage:
+    python3 -m benchmarks run -o results.json
+    python3 -m benchmarks compare baseline.json results.json
+"""
+
+# This code is a part of lelesk library: https://github.com/letuananh/lelesk
+# :copyright: (c) 2014 Le Tuan Anh <tuananh.ke@gmail.com>
+# :license: MIT, see LICENSE for more details.
+
+import sys
+import json
+import tempfile
+
+from texttaglib.chirptext.cli import CLIApp
+
+from .suite import BenchmarkSuite, compare, DEFAULT_REPEAT
+
+# -----------------------------------------------------------------------
+
+QUICK = {'n_synsets': 60, 'n_sents': 20, 'repeat': 2}
+
+
+def run_benchmarks(cli, args):
+    ''' Run benchmarks and write results to a JSON file '''
+    if args.quick:
+        options = dict(QUICK)
+    else:
+        options = {'n_synsets': args.synsets, 'n_sents': args.sents, 'repeat': args.repeat}
+    with tempfile.TemporaryDirectory() as folder:
+        report = BenchmarkSuite(args.workdir if args.workdir else folder, **options).run(args.bench)
+    for name, result in sorted(report['results'].items()):
+        if 'skipped' in result:
+            print("{:<32} skipped ({})".format(name, result['skipped']))
+        else:
+            print("{:<32} {:>12.1f} ops/sec  median {:.6f} sec".format(name, result['ops_per_sec'], result['median']))
+    if args.output:
+        with open(args.output, 'w') as outfile:
+            json.dump(report, outfile, indent=2)
+        print("Results were written to {}".format(args.output))
+    if args.compare:
+        report_regressions(args.compare, report, args.threshold)
+
+
+def compare_results(cli, args):
+    ''' Compare two result files '''
+    with open(args.current) as infile:
+        current = json.load(infile)
+    report_regressions(args.baseline, current, args.threshold)
+
+
+def report_regressions(baseline_path, current, threshold):
+    with open(baseline_path) as infile:
+        baseline = json.load(infile)
+    rows = compare(baseline, current, threshold)
+    for name, base, now, ratio, regressed in rows:
+        print("{:<32} {:.6f} -> {:.6f} sec  x{:.2f}{}".format(name, base, now, ratio, "  REGRESSION" if regressed else ""))
+    regressions = [row[0] for row in rows if row[-1]]
+    if regressions:
+        print("{} benchmark(s) are more than {:.0%} slower than {}".format(len(regressions), threshold, baseline_path))
+        sys.exit(1)
+
+
+def main():
+    app = CLIApp(desc='LeLesk benchmarks', logger=__name__)
+
+    task = app.add_task('run', func=run_benchmarks)
+    task.add_argument('-o', '--output', help='Write results to a JSON file')
+    task.add_argument('-b', '--bench', help='Run only these benchmarks', nargs='*', choices=BenchmarkSuite.BENCHMARKS)
+    task.add_argument('--synsets', help='Number of synsets in the fixture WordNet', type=int, default=300)
+    task.add_argument('--sents', help='Number of sentences in the fixture corpus', type=int, default=200)
+    task.add_argument('--repeat', help='Number of timed rounds of each benchmark', type=int, default=DEFAULT_REPEAT)
+    task.add_argument('--quick', help='Small fixture and few rounds (smoke test)', action='store_true')
+    task.add_argument('--workdir', help='Build the fixture here instead of a temporary directory')
+    task.add_argument('--compare', help='Compare with a baseline JSON file (exit with status 1 on regressions)')
+    task.add_argument('--threshold', help='Maximum allowed slowdown (e.g. 0.1 = 10%%)', type=float, default=0.1)
+
+    task = app.add_task('compare', func=compare_results)
+    task.add_argument('baseline', help='Baseline JSON file')
+    task.add_argument('current', help='Current JSON file')
+    task.add_argument('--threshold', help='Maximum allowed slowdown (e.g. 0.1 = 10%%)', type=float, default=0.1)
+
+    app.run()
+
+
+if __name__ == "__main__":
+    main()
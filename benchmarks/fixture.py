@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Synthetic Gloss WordNet, WordNet SQL and TTL corpus for offline benchmarks
+
+The fixture is generated from a fixed random seed so that every run (and every machine) uses the same data.
+"""
+
+# This code is a part of lelesk library: https://github.com/letuananh/lelesk
+# :copyright: (c) 2014 Le Tuan Anh <tuananh.ke@gmail.com>
+# :license: MIT, see LICENSE for more details.
+
+import os
+import random
+import contextlib
+import sqlite3
+
+from texttaglib.chirptext import ttl
+from yawlib.glosswordnet.gwnsqlite import SETUP_SCRIPT as GWN_SETUP_SCRIPT
+
+# -----------------------------------------------------------------------
+
+POSNUM = {'n': 1, 'v': 2, 'a': 3, 'r': 4}
+PTB_TAGS = {'n': ('NN', 'NNS'), 'v': ('VB', 'VBZ'), 'a': ('JJ',)}
+WORDS = ("fish river water bank money run set take animal swim stream current flow "
+         "light heavy move body sea shark salmon boat net catch eat food market "
+         "deposit loan credit field game play team score goal line point head foot "
+         "hand arm leg tree leaf plant grow green red blue sky cloud rain wind storm").split()
+# NLTK stopwords are not needed to run benchmarks
+STOPWORDS = ('the', 'a', 'an', 'of', 'to', 'in', 'and', 'is', 'it', 'at', 'on', 'with')
+
+WNSQL_SETUP_SCRIPT = '''
+CREATE TABLE words (wordid INTEGER PRIMARY KEY, lemma TEXT);
+CREATE TABLE synsets (synsetid INTEGER PRIMARY KEY, pos TEXT, lexdomainid INTEGER, definition TEXT);
+CREATE TABLE senses (wordid INTEGER, casedwordid INTEGER, synsetid INTEGER, senseid INTEGER, sensenum INTEGER,
+                     lexid INTEGER, tagcount INTEGER, sensekey TEXT);
+CREATE TABLE semlinks (synset1id INTEGER, synset2id INTEGER, linkid INTEGER);
+CREATE TABLE samples (synsetid INTEGER, sampleid INTEGER, sample TEXT);
+CREATE VIEW wordsXsenses AS SELECT words.wordid, lemma, casedwordid, synsetid, senseid, sensenum, lexid, tagcount, sensekey
+                            FROM words JOIN senses USING (wordid);
+CREATE INDEX senses_synsetid ON senses (synsetid);
+CREATE INDEX semlinks_synset1id ON semlinks (synset1id);
+'''
+
+
+def build_wordnet(folder, n_synsets=300, seed=42):
+    """ Create gwn.db (Gloss WordNet) and wn.db (WordNet SQL) with n_synsets random synsets in folder.
+    Returns (path to gwn.db, path to wn.db)
+    """
+    rnd = random.Random(seed)
+    os.makedirs(folder, exist_ok=True)
+    gwn_path = os.path.join(folder, 'gwn.db')
+    wn_path = os.path.join(folder, 'wn.db')
+    for path in (gwn_path, wn_path):
+        if os.path.exists(path):
+            os.unlink(path)
+    gwn = sqlite3.connect(gwn_path)
+    with open(GWN_SETUP_SCRIPT) as script:
+        gwn.executescript(script.read())
+    wn = sqlite3.connect(wn_path)
+    wn.executescript(WNSQL_SETUP_SCRIPT)
+    wordids = {w: i + 1 for i, w in enumerate(WORDS)}
+    wn.executemany('INSERT INTO words VALUES (?, ?)', [(i, w) for w, i in wordids.items()])
+    synsets = []
+    for i in range(n_synsets):
+        pos = rnd.choice('nnnvva')
+        offset = '{:08d}'.format(1000000 + i * 17)
+        synsets.append((offset, pos, rnd.sample(WORDS, rnd.randint(1, 2))))
+    sensekeys = {}  # sense key => GWN synset ID
+    for offset, pos, lemmas in synsets:
+        gwn_sid = pos + offset
+        wn_sid = int('{}{}'.format(POSNUM[pos], offset))
+        definition = ' '.join(rnd.sample(WORDS, rnd.randint(3, 8)))
+        gwn.execute('INSERT INTO synset VALUES (?, ?, ?)', (gwn_sid, offset, pos))
+        wn.execute('INSERT INTO synsets VALUES (?, ?, 0, ?)', (wn_sid, pos, definition))
+        for idx, lemma in enumerate(lemmas):
+            sensekey = '{}%{}:00:{:02d}::'.format(lemma, POSNUM[pos], len(sensekeys) % 100)
+            sensekeys[sensekey] = gwn_sid
+            gwn.execute('INSERT INTO term VALUES (?, ?)', (gwn_sid, lemma))
+            gwn.execute('INSERT INTO sensekey VALUES (?, ?)', (gwn_sid, sensekey))
+            wn.execute('INSERT INTO senses VALUES (?, ?, ?, ?, ?, 0, ?, ?)',
+                       (wordids[lemma], wordids[lemma], wn_sid, len(sensekeys), idx + 1, rnd.randint(0, 20), sensekey))
+        gwn.execute('INSERT INTO gloss_raw VALUES (?, ?, ?)', (gwn_sid, 'orig', definition))
+        gid = gwn.execute('INSERT INTO gloss (origid, sid, cat, surface) VALUES (?, ?, ?, ?)', (gwn_sid + '_d', gwn_sid, 'def', definition)).lastrowid
+        for idx, word in enumerate(definition.split()):
+            item = gwn.execute('INSERT INTO glossitem (ord, gid, tag, lemma, pos, cat, coll, rdf, sep, text, origid) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                               (idx, gid, 'ignore', '{}%1'.format(word), 'NN', 'wf', None, None, None, word, '{}_w{}'.format(gwn_sid, idx)))
+            if rnd.random() < 0.2:
+                # sense-tagged gloss words
+                sensekey = rnd.choice(sorted(sensekeys))
+                gwn.execute('INSERT INTO sensetag (cat, tag, sid, gid, sk, origid, lemma, itemid) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                            ('wf', 'man', gwn_sid, gid, sensekey, '{}_t{}'.format(gwn_sid, idx), word, item.lastrowid))
+    wn_sids = [int('{}{}'.format(POSNUM[pos], offset)) for offset, pos, _ in synsets]
+    for wn_sid in wn_sids:
+        for other in rnd.sample(wn_sids, 2):
+            if other != wn_sid:
+                wn.execute('INSERT INTO semlinks VALUES (?, ?, ?)', (wn_sid, other, rnd.choice((1, 2))))
+    gwn.commit()
+    wn.commit()
+    gwn.close()
+    wn.close()
+    return gwn_path, wn_path
+
+
+def read_lexicon(gwn_path):
+    """ Read synset IDs (e.g. 01000000-n) and the number of synsets of each (lemma, POS) from a fixture gwn.db """
+    with contextlib.closing(sqlite3.connect(gwn_path)) as conn:
+        synsetids = ['{}-{}'.format(offset, pos) for offset, pos in conn.execute('SELECT offset, pos FROM synset ORDER BY id')]
+        words = {(term, pos): count for term, pos, count in
+                 conn.execute('SELECT term, pos, count(*) FROM term JOIN synset ON term.sid = synset.id GROUP BY term, pos')}
+    return synsetids, words
+
+
+def build_corpus(n_sents=200, seed=3, tagged=True):
+    """ Random tokenized sentences (ttl.Sentence objects), tokens are POS-tagged and lemmatized if tagged is True """
+    rnd = random.Random(seed)
+    sents = []
+    for idx in range(n_sents):
+        words = [rnd.choice(WORDS + list(STOPWORDS)) for _ in range(rnd.randint(3, 12))]
+        sent = ttl.Sentence(' '.join(words), ID=idx + 1)
+        sent.tokens = words
+        if not tagged:
+            sents.append(sent)
+            continue
+        for token in sent:
+            token.pos = 'DT' if token.text in STOPWORDS else rnd.choice(PTB_TAGS[rnd.choice('nnva')])
+            token.lemma = token.text
+        sents.append(sent)
+    return sents
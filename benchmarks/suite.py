@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Micro and macro benchmarks of WSD hot paths
+"""
+
+# This code is a part of lelesk library: https://github.com/letuananh/lelesk
+# :copyright: (c) 2014 Le Tuan Anh <tuananh.ke@gmail.com>
+# :license: MIT, see LICENSE for more details.
+
+import io
+import os
+import sys
+import time
+import random
+import logging
+import platform
+import statistics
+import contextlib
+from types import SimpleNamespace
+
+from texttaglib.chirptext import ttl
+
+from lelesk import LeLeskWSD, LeskCache
+from lelesk.wsdtk import wsd_document
+
+from . import fixture
+
+# -----------------------------------------------------------------------
+
+DEFAULT_REPEAT = 5
+# (name, min polysemy, max polysemy)
+POLYSEMY_BUCKETS = (('1', 1, 1), ('2-3', 2, 3), ('4-7', 4, 7), ('8+', 8, None))
+
+
+def getLogger():
+    return logging.getLogger(__name__)
+
+
+def measure(func, ops=1, repeat=DEFAULT_REPEAT, setup=None):
+    """ Time func() repeat times (setup() is called before every round and is not timed).
+    Each call of func performs ops operations, statistics are in seconds per operation.
+    """
+    times = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        func()
+        times.append((time.perf_counter() - start) / ops)
+    median = statistics.median(times)
+    return {'ops': ops,
+            'repeat': repeat,
+            'mean': statistics.mean(times),
+            'median': median,
+            'min': min(times),
+            'max': max(times),
+            'stdev': statistics.stdev(times) if len(times) > 1 else 0.0,
+            'ops_per_sec': 1 / median if median else None}
+
+
+class BenchmarkSuite:
+    """ Benchmarks of a synthetic WordNet fixture which is generated in folder
+
+    Arguments:
+        folder    -- a working directory (fixture databases and outputs are written here)
+        n_synsets -- number of synsets in the fixture WordNet
+        n_sents   -- number of sentences in the fixture corpus
+        repeat    -- number of timed rounds of each benchmark
+        seed      -- random seed of the fixture
+    """
+    def __init__(self, folder, n_synsets=300, n_sents=200, repeat=DEFAULT_REPEAT, seed=42):
+        self.folder = folder
+        self.n_synsets = n_synsets
+        self.n_sents = n_sents
+        self.repeat = repeat
+        self.seed = seed
+        self.gwn_path = None
+        self.wn_path = None
+        self.cache_path = os.path.join(folder, 'lesk_cache.db')
+        self.sents = []
+        self.synsetids = []
+        self.words = {}  # (lemma, pos) => number of synsets
+
+    def setup(self):
+        """ Build the fixture WordNet, its LeskCache and the corpus """
+        self.gwn_path, self.wn_path = fixture.build_wordnet(self.folder, n_synsets=self.n_synsets, seed=self.seed)
+        if os.path.exists(self.cache_path):
+            os.unlink(self.cache_path)
+        with contextlib.redirect_stdout(io.StringIO()):
+            LeskCache(self.cache_path, wsd=self.new_wsd(cached=False)).generate()
+        self.synsetids, self.words = fixture.read_lexicon(self.gwn_path)
+        self.sents = self.corpus()
+
+    def corpus(self, tagged=True):
+        """ A new copy of the fixture corpus """
+        return fixture.build_corpus(self.n_sents, seed=self.seed, tagged=tagged)
+
+    def new_wsd(self, cached=True):
+        """ A new LeLeskWSD object of the fixture (with an empty in-memory cache) """
+        wsd = LeLeskWSD(self.gwn_path, self.wn_path, dbcache=self.cache_path if cached else None)
+        wsd.stopwords = fixture.STOPWORDS
+        return wsd
+
+    def sample_synsets(self, k=50):
+        return random.Random(self.seed).sample(self.synsetids, min(k, len(self.synsetids)))
+
+    def context(self, size=10):
+        """ Words of a fixture sentence """
+        rnd = random.Random(self.seed)
+        return [w for w, _ in rnd.sample(sorted(self.words), min(size, len(self.words)))]
+
+    # -------------------------------------------------------------------
+    # Benchmarks
+    # -------------------------------------------------------------------
+
+    def bench_build_lelesk_set(self):
+        sids = self.sample_synsets()
+        state = {}
+
+        def _setup(cached):
+            state['wsd'] = self.new_wsd(cached=cached)
+            state['wsd'].connect(readonly=True)
+
+        def _build():
+            for sid in sids:
+                state['wsd'].build_lelesk_set(sid)
+        results = {}
+        # cold: signatures are built from Gloss WordNet and WordNet SQL, warm: signatures are read from LeskCache
+        for name, cached in (('cold', False), ('warm', True)):
+            results['build_lelesk_set.{}'.format(name)] = measure(_build, ops=len(sids), repeat=self.repeat, setup=lambda: _setup(cached))
+            state['wsd'].disconnect()
+        return results
+
+    def bench_leskcache_select(self):
+        sids = self.sample_synsets()
+        cache = LeskCache(self.cache_path)
+        results = {}
+        with cache.db.ctx() as ctx:
+            results['LeskCache.select'] = measure(lambda: [cache.select(sid, ctx=ctx) for sid in sids], ops=len(sids), repeat=self.repeat)
+            results['LeskCache.select_many'] = measure(lambda: cache.select_many(sids, ctx=ctx), ops=len(sids), repeat=self.repeat)
+        return results
+
+    def bench_lelesk_wsd(self):
+        """ lelesk_wsd() of words grouped by number of candidate synsets (candidates are cached) """
+        wsd = self.new_wsd()
+        context = self.context()
+        results = {}
+        for name, low, high in POLYSEMY_BUCKETS:
+            words = sorted(w for w, n in self.words.items() if n >= low and (high is None or n <= high))
+            if not words:
+                results['lelesk_wsd.polysemy_{}'.format(name)] = {'skipped': 'no word in this bucket'}
+                continue
+            wsd.prefetch_candidates(words)
+            results['lelesk_wsd.polysemy_{}'.format(name)] = measure(
+                lambda: [wsd.lelesk_wsd(lemma, pos=pos, context=context, remove_stop_words=False) for lemma, pos in words],
+                ops=len(words), repeat=self.repeat)
+        wsd.disconnect()
+        return results
+
+    def bench_mfs_wsd(self):
+        wsd = self.new_wsd()
+        words = sorted(self.words)
+        wsd.synset_cache.update(wsd.batch_synset_search(words))
+        result = measure(lambda: [wsd.mfs_wsd(lemma, '', pos=pos) for lemma, pos in words], ops=len(words), repeat=self.repeat)
+        wsd.disconnect()
+        return {'mfs_wsd': result}
+
+    def bench_lemmatize_ttl(self):
+        """ POS tagging and lemmatization of tokenized sentences (NLTK data are required) """
+        wsd = self.new_wsd()
+        try:
+            wsd.lemmatize_ttl_sents(self.corpus(tagged=False)[:1])
+        except LookupError:
+            getLogger().warning("NLTK data are not available, lemmatize_ttl is skipped")
+            return {'lemmatize_ttl': {'skipped': 'NLTK data are not available'}}
+        state = {}
+        result = measure(lambda: wsd.lemmatize_ttl_sents(state['sents']), ops=self.n_sents, repeat=self.repeat,
+                         setup=lambda: state.update(sents=self.corpus(tagged=False)))
+        return {'lemmatize_ttl': result}
+
+    def bench_wsd_document(self):
+        """ End-to-end wsd_document() (candidate lookup, WSD and TTL output) with a cold in-memory cache, in sentences/sec """
+        results = {}
+        cli = SimpleNamespace(logger=getLogger())
+        output = os.path.join(self.folder, 'wsd_output')
+        for method in ('lelesk', 'mfs', 'sparse'):
+            args = SimpleNamespace(glosswn=self.gwn_path, wnsql=self.wn_path, cache=self.cache_path, cache_size=None, quiet=True,
+                                   method=method, ttl_format=ttl.MODE_TSV, output=output, topk=None, workers=1, chunk=None,
+                                   server=None, notag=False, nolemmatize=True, keep_tags=False)
+            state = {}
+
+            def _setup():
+                wsd = self.new_wsd()
+                if method == 'sparse':
+                    wsd.load_matrix()
+                state.update(wsd=wsd, sents=self.corpus())
+
+            def _run():
+                with contextlib.redirect_stdout(io.StringIO()):
+                    wsd_document(state['sents'], cli, args, wsd=state['wsd'])
+            results['wsd_document.{}'.format(method)] = measure(_run, ops=len(self.sents), repeat=self.repeat, setup=_setup)
+            state['wsd'].disconnect()
+        return results
+
+    BENCHMARKS = ('build_lelesk_set', 'leskcache_select', 'lelesk_wsd', 'mfs_wsd', 'lemmatize_ttl', 'wsd_document')
+
+    def run(self, names=None):
+        """ Run benchmarks (all benchmarks if names is None) and return a JSON-serializable report """
+        if self.gwn_path is None:
+            self.setup()
+        results = {}
+        for name in (names if names else self.BENCHMARKS):
+            getLogger().info("Running {}".format(name))
+            results.update(getattr(self, 'bench_{}'.format(name))())
+        return {'created': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'argv': sys.argv[1:],
+                'fixture': {'synsets': self.n_synsets, 'sentences': self.n_sents, 'seed': self.seed, 'repeat': self.repeat},
+                'results': results}
+
+
+def compare(baseline, current, threshold=0.1):
+    """ Compare median time per operation of two reports.
+    Returns a list of (benchmark name, baseline median, current median, ratio, regressed)
+    """
+    rows = []
+    for name, result in sorted(current['results'].items()):
+        base = baseline['results'].get(name)
+        if not base or 'median' not in base or 'median' not in result:
+            continue
+        ratio = result['median'] / base['median'] if base['median'] else float('inf')
+        rows.append((name, base['median'], result['median'], ratio, ratio > 1 + threshold))
+    return rows
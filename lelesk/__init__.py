@@ -31,8 +31,19 @@ from .__version__ import __author__, __email__, __copyright__, __maintainer__
 from .__version__ import __credits__, __license__, __description__, __url__
 from .__version__ import __version_major__, __version_long__, __version__, __status__
 
-from .main import LeLeskWSD, LeskCache
 from .config import LLConfig
 
-__all__ = ['LLConfig', 'LeLeskWSD', 'LeskCache',
+
+def __getattr__(name):
+    # LeLeskWSD and LeskCache pull in yawlib and texttaglib, they are imported on first use
+    if name in ('LeLeskWSD', 'LeskCache'):
+        from . import main
+        return getattr(main, name)
+    elif name == 'AsyncLeLeskWSD':
+        from .aio import AsyncLeLeskWSD
+        return AsyncLeLeskWSD
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+
+
+__all__ = ['LLConfig', 'LeLeskWSD', 'LeskCache', 'AsyncLeLeskWSD',
            "__version__", "__author__", "__description__", "__copyright__"]
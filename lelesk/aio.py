@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+asyncio API for LeLeskWSD (e.g. for async web services)
+"""
+
+# This code is a part of lelesk library: https://github.com/letuananh/lelesk
+# :copyright: (c) 2014 Le Tuan Anh <tuananh.ke@gmail.com>
+# :license: MIT, see LICENSE for more details.
+
+import asyncio
+import logging
+import functools
+from types import SimpleNamespace
+from concurrent.futures import ThreadPoolExecutor
+
+from texttaglib.chirptext import ttl
+
+from .main import LeLeskWSD
+from .util import ptpos_to_wn
+from .wsdtk import prepare_sents, wsd_targets, wsd_sent, wsd_candidates
+
+# -----------------------------------------------------------------------
+
+DEFAULT_MAX_WORKERS = 4
+
+
+def getLogger():
+    return logging.getLogger(__name__)
+
+
+class AsyncLeLeskWSD:
+    """ asyncio facade of LeLeskWSD
+
+    Everything which may touch SQLite or NLTK runs on a bounded thread pool, each worker thread
+    has its own database connections (see LeLeskWSD.connect()) and all threads share the caches of a single LeLeskWSD object.
+    Concurrent requests for the same (lemma, pos) are coalesced into one lookup.
+
+    Arguments:
+        wsd         -- a LeLeskWSD object, a new one will be created with kwargs if it is None
+        max_workers -- maximum number of worker threads
+    """
+    def __init__(self, wsd=None, max_workers=DEFAULT_MAX_WORKERS, **kwargs):
+        self.__owns_wsd = wsd is None
+        self.wsd = wsd if wsd is not None else LeLeskWSD(**kwargs)
+        self.max_workers = max_workers
+        self.executor = ThreadPoolExecutor(max_workers, thread_name_prefix='lelesk', initializer=self.wsd.connect, initargs=(True,))
+        self.__inflight = {}  # (kind, lemma, pos) => future of the lookup which is in progress
+        self.__started = None  # future of the warm-up job (see start())
+        self.coalesced = 0  # number of lookups which were shared with another request
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def start(self):
+        """ Load stopwords and NLTK models on a worker thread before any other job (see LeLeskWSD.warm_up()).
+        This is called automatically by the first job
+        """
+        if self.__started is None:
+            self.__started = asyncio.ensure_future(asyncio.get_running_loop().run_in_executor(self.executor, self.wsd.warm_up))
+        await asyncio.shield(self.__started)
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def close(self):
+        """ Wait for running jobs and stop worker threads.
+        Database connections are closed if the LeLeskWSD object was created by this object (see LeLeskWSD.disconnect())
+        """
+        await asyncio.get_running_loop().run_in_executor(None, functools.partial(self.executor.shutdown, wait=True))
+        if self.__owns_wsd:
+            self.wsd.disconnect()
+
+    async def run(self, func, *args, **kwargs):
+        """ Run a blocking function on the worker threads """
+        if self.__started is None or not self.__started.done():
+            await self.start()
+        return await asyncio.get_running_loop().run_in_executor(self.executor, functools.partial(func, *args, **kwargs))
+
+    async def __lookup(self, kind, words, cache, func):
+        """ Run func(missing words) once for words which are neither in cache nor being looked up,
+        and wait for lookups of the other words which are in progress
+        """
+        waiting = []
+        missing = []
+        for lemma, pos in set(words):
+            future = self.__inflight.get((kind, lemma, pos))
+            if future is not None:
+                self.coalesced += 1
+                waiting.append(future)
+            elif (lemma, pos) not in cache:
+                missing.append((lemma, pos))
+        if missing:
+            future = asyncio.ensure_future(self.run(func, missing))
+            keys = [(kind, lemma, pos) for lemma, pos in missing]
+            for key in keys:
+                self.__inflight[key] = future
+
+            def _done(_):
+                for key in keys:
+                    if self.__inflight.get(key) is future:
+                        del self.__inflight[key]
+            future.add_done_callback(_done)
+            waiting.append(future)
+        # a cancelled request must not cancel lookups which other requests are waiting for
+        for future in waiting:
+            await asyncio.shield(future)
+
+    async def prefetch_candidates(self, words):
+        """ Build WSD candidates of many (lemma, pos) pairs (see LeLeskWSD.prefetch_candidates()) """
+        await self.__lookup('candidates', words, self.wsd.candidates_cache, self.wsd.prefetch_candidates)
+
+    async def prefetch_synsets(self, words):
+        """ Search synsets of many (lemma, pos) pairs (see LeLeskWSD.batch_synset_search()) """
+        await self.__lookup('synsets', words, self.wsd.synset_cache, self.__search_synsets)
+
+    def __search_synsets(self, words):
+        self.wsd.synset_cache.update(self.wsd.batch_synset_search(words))
+
+    async def lelesk_wsd(self, word, sentence_text='', pos=None, context=None, synsets=None, remove_stop_words=True, top_k=None, **kwargs):
+        """ async version of LeLeskWSD.lelesk_wsd() """
+        if not synsets:
+            await self.prefetch_candidates([(word, pos)])
+        return await self.run(self.wsd.lelesk_wsd, word, sentence_text, pos=pos, context=context, synsets=synsets,
+                              remove_stop_words=remove_stop_words, top_k=top_k, **kwargs)
+
+    async def mfs_wsd(self, word, sentence_text='', pos=None, synsets=None, **kwargs):
+        """ async version of LeLeskWSD.mfs_wsd() """
+        if not synsets:
+            await self.prefetch_synsets([(word, pos)])
+        return await self.run(self.wsd.mfs_wsd, word, sentence_text, pos=pos, synsets=synsets, **kwargs)
+
+    async def disambiguate_sentence(self, tokens, context, remove_stop_words=True, top_k=None):
+        """ async version of LeLeskWSD.disambiguate_sentence() """
+        tokens = list(tokens)
+        await self.prefetch_candidates(tokens)
+        return await self.run(self.wsd.disambiguate_sentence, tokens, context, remove_stop_words=remove_stop_words, top_k=top_k)
+
+    async def wsd_sentence(self, sent, method='lelesk', notag=False, nolemmatize=False, keep_tags=False, candidates_only=False):
+        """ Disambiguate a sentence (a text or a ttl.Sentence) and add the best sense of each word as a concept,
+        same as the wsd task of wsdtk. Returns a ttl.Sentence
+        """
+        if isinstance(sent, str):
+            sent = ttl.Sentence(text=sent)
+        args = SimpleNamespace(method=method, notag=notag, nolemmatize=nolemmatize, keep_tags=keep_tags)
+        cli = SimpleNamespace(logger=getLogger())
+        await self.run(prepare_sents, [sent], args, self.wsd)
+        words = [(token.lemma if token.lemma else token.text, ptpos_to_wn(token.pos)) for token in wsd_targets(sent, self.wsd)]
+        if candidates_only or (method and method.lower() == 'mfs'):
+            await self.prefetch_synsets(words)
+        else:
+            await self.prefetch_candidates(words)
+        if candidates_only:
+            return await self.run(wsd_candidates, sent, cli, args, self.wsd, prepared=True)
+        if method and method.lower() == 'sparse' and self.wsd.matrix is None:
+            await self.run(self.wsd.load_matrix)
+        return await self.run(wsd_sent, sent, cli, args, self.wsd, prepared=True)
@@ -17,3 +17,13 @@ class LLConfig:
     LELESK_CACHE_DB_INIT_SCRIPT = os.path.join(LELESK_DIR, 'script', 'lesk_cache.sql')
     LELESK_CACHE_DB_LOC = os.path.expanduser('./data/temp/lesk_cache.db')
     LELESK_CACHE_DEBUG_DIR = os.path.expanduser('./data/temp/debug')
+    # maximum number of (lemma, pos) entries in LeLeskWSD's in-memory candidate caches
+    LELESK_CANDIDATES_CACHE_SIZE = 100000
+    # maximum number of (surface, POS) => lemma entries memoized by LeLeskWSD
+    LELESK_LEMMA_CACHE_SIZE = 100000
+    # PRAGMAs of pooled SQLite connections (see dbpool.ConnectionPool)
+    SQLITE_PRAGMAS = {'cache_size': -65536,  # 64 MiB page cache
+                      'mmap_size': 268435456,  # memory-map up to 256 MiB of the DB file
+                      'temp_store': 'MEMORY'}
+    # Gloss WordNet and WordNet SQL are never modified
+    SQLITE_READONLY_PRAGMAS = dict(SQLITE_PRAGMAS, query_only='ON')
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Thread-keyed pools of SQLite connections
+"""
+
+# This code is a part of lelesk library: https://github.com/letuananh/lelesk
+# :copyright: (c) 2014 Le Tuan Anh <tuananh.ke@gmail.com>
+# :license: MIT, see LICENSE for more details.
+
+import os
+import sqlite3
+import logging
+import threading
+from pathlib import Path
+
+from texttaglib.puchikarui.puchikarui import ExecutionContext
+
+
+def getLogger():
+    return logging.getLogger(__name__)
+
+
+class PooledContext(ExecutionContext):
+    """ puchikarui execution context with a tuned connection which may be closed by any thread
+
+    Read-only contexts are opened with an immutable URI (mode=ro&immutable=1), SQLite then skips file locking
+    and change detection, so they must only be used for databases which are never modified while they are open.
+    """
+    def __init__(self, path, schema, readonly=False, pragmas=None, trace=None):
+        if readonly:
+            if not os.path.isfile(path):
+                raise FileNotFoundError("Database does not exist at {}".format(path))
+            uri = '{}?mode=ro&immutable=1'.format(Path(path).absolute().as_uri())
+            self.conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        else:
+            self.conn = sqlite3.connect(str(path), check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.cur = self.conn.cursor()
+        self.schema = schema
+        self.auto_commit = False if readonly else schema.auto_commit
+        self.readonly = readonly
+        if pragmas:
+            for name, value in pragmas.items():
+                self.cur.execute('PRAGMA {} = {}'.format(name, value))
+        if trace is not None:
+            self.conn.set_trace_callback(trace)
+
+
+class ConnectionPool:
+    """ Connections (puchikarui execution contexts) of a SQLite database, one for each thread
+
+    A connection is opened the first time a thread asks for it (see ctx()) and is reused by that thread until close_all().
+    Connections of threads which have finished are closed when a new connection is opened,
+    connections opened before a fork are never used by the child process.
+
+    Arguments:
+        db       -- a puchikarui Schema (e.g. GWordnetSQLite, LeskCacheSchema)
+        readonly -- open read-only, immutable connections (see PooledContext)
+        pragmas  -- a dict of PRAGMA name => value to be executed on every new connection
+        trace    -- a function to be called with every SQL statement (see set_trace())
+    """
+    def __init__(self, db, readonly=False, pragmas=None, trace=None):
+        self.db = db
+        self.readonly = readonly
+        self.pragmas = dict(pragmas) if pragmas else {}
+        self.trace = trace
+        self.__contexts = {}  # (process ID, thread ID) => PooledContext
+        self.__lock = threading.Lock()
+
+    @property
+    def path(self):
+        return self.db.ds.path
+
+    def __len__(self):
+        return len(self.__contexts)
+
+    def open(self):
+        """ Open a new connection (not pooled) """
+        if not self.readonly and not os.path.isfile(self.path):
+            # let puchikarui set up the database (e.g. a new LeskCache)
+            self.db.ctx().close()
+        return PooledContext(self.path, self.db, readonly=self.readonly, pragmas=self.pragmas, trace=self.trace)
+
+    def set_trace(self, trace):
+        """ Set (or remove with None) the trace callback of open and future connections """
+        self.trace = trace
+        with self.__lock:
+            contexts = list(self.__contexts.values())
+        for ctx in contexts:
+            ctx.conn.set_trace_callback(trace)
+
+    def ctx(self):
+        """ Get the connection of the calling thread """
+        key = (os.getpid(), threading.get_ident())
+        ctx = self.__contexts.get(key)
+        if ctx is None:
+            ctx = self.open()
+            with self.__lock:
+                self.__prune()
+                self.__contexts[key] = ctx
+            getLogger().debug("Opened connection #{} to {}".format(len(self.__contexts), self.path))
+        return ctx
+
+    def __prune(self):
+        pid = os.getpid()
+        alive = {t.ident for t in threading.enumerate()}
+        for key in list(self.__contexts):
+            if key[0] != pid:
+                del self.__contexts[key]  # inherited from the parent process, do not touch
+            elif key[1] not in alive:
+                self.__contexts.pop(key).close()
+
+    def close(self):
+        """ Close the connection of the calling thread """
+        with self.__lock:
+            ctx = self.__contexts.pop((os.getpid(), threading.get_ident()), None)
+        if ctx is not None:
+            ctx.close()
+
+    def close_all(self):
+        """ Close connections of all threads (they must not be in use) """
+        with self.__lock:
+            contexts, self.__contexts = self.__contexts, {}
+        pid = os.getpid()
+        for (ctx_pid, _), ctx in contexts.items():
+            if ctx_pid == pid:
+                ctx.close()
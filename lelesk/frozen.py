@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Frozen WSD model: a single read-only file with everything LeLeskWSD needs, so that no database is required
+"""
+
+# This code is a part of lelesk library: https://github.com/letuananh/lelesk
+# :copyright: (c) 2014 Le Tuan Anh <tuananh.ke@gmail.com>
+# :license: MIT, see LICENSE for more details.
+
+import os
+import json
+import zlib
+import struct
+import logging
+
+from texttaglib.chirptext import uniquify
+from yawlib import Synset, SynsetCollection
+
+from .index import TagCounts
+from .sigfile import SignatureFile, write_signatures, NO_TAGCOUNT
+
+# -----------------------------------------------------------------------
+# File layout (integers are unsigned, little-endian)
+#
+#   header     : magic, version, lexicon size, signatures offset
+#   lexicon    : zlib compressed JSON
+#                {"lelesk": version, "words": {lowercased lemma: [[GWN synset ID, pos], ...]},
+#                 "synsets": {canonical synset ID: [lemmas, definition]}}
+#   signatures : a signature file (see sigfile.py), aligned to 8 bytes
+# -----------------------------------------------------------------------
+
+MAGIC = b'LLFRZ'
+VERSION = 1
+HEADER = struct.Struct('<5sB2xQQ')
+
+
+def getLogger():
+    return logging.getLogger(__name__)
+
+
+def write_frozen_model(path, store, tagcounts, words, synsets, lelesk_version=None):
+    """ Write a frozen model
+
+    Arguments:
+        store     -- signatures (SignatureStore)
+        tagcounts -- tag counts of synsets (TagCounts)
+        words     -- a dict of lowercased lemma => list of (GWN synset ID, pos) in Gloss WordNet order
+        synsets   -- a dict of canonical synset ID => (lemmas, definition)
+    """
+    lexicon = zlib.compress(json.dumps({'lelesk': lelesk_version, 'words': words, 'synsets': synsets}).encode('utf-8'))
+    sig_offset = HEADER.size + len(lexicon)
+    sig_offset += (8 - sig_offset % 8) % 8
+    with open(path, 'wb') as outfile:
+        outfile.write(HEADER.pack(MAGIC, VERSION, len(lexicon), sig_offset))
+        outfile.write(lexicon)
+        outfile.write(bytes(sig_offset - HEADER.size - len(lexicon)))
+        write_signatures(outfile, store, tagcounts)
+    getLogger().info("Wrote frozen model ({} words, {} synsets, {} signatures) to {}".format(len(words), len(synsets), len(store), path))
+
+
+class FrozenModel(SignatureFile):
+    """ Read-only WSD model which replaces Gloss WordNet, WordNet SQL and LeskCache
+
+    Signatures and tag counts are memory-mapped (see SignatureFile),
+    the lexicon (lemma => candidates, synset lemmas and definitions) is loaded on first use.
+    """
+    def __init__(self, path):
+        with open(path, 'rb') as infile:
+            header = infile.read(HEADER.size)
+        if len(header) != HEADER.size:
+            raise ValueError("{} is not a valid frozen model".format(path))
+        magic, version, lexicon_size, sig_offset = HEADER.unpack(header)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("{} is not a valid frozen model (version {})".format(path, VERSION))
+        super().__init__(path, offset=sig_offset)
+        self.lexicon_size = lexicon_size
+        self.__lexicon = None
+
+    @staticmethod
+    def is_frozen_model(path):
+        """ Check if a file is a frozen model (by its magic bytes) """
+        if not path or not os.path.isfile(path):
+            return False
+        with open(path, 'rb') as infile:
+            return infile.read(len(MAGIC)) == MAGIC
+
+    @property
+    def lexicon(self):
+        if self.__lexicon is None:
+            self.__lexicon = json.loads(zlib.decompress(self.buf[HEADER.size:HEADER.size + self.lexicon_size]).decode('utf-8'))
+        return self.__lexicon
+
+    @property
+    def lelesk_version(self):
+        """ Version of lelesk which created this model """
+        return self.lexicon['lelesk']
+
+    def synset(self, synsetid):
+        """ Get a synset with its lemmas and definition """
+        lemmas, definition = self.lexicon['synsets'].get(str(synsetid), ([], None))
+        return Synset(str(synsetid), lemmas=list(lemmas), defs=[definition] if definition else None)
+
+    def search(self, lemma, pos=None, deep_select=False):
+        """ Find synsets of a lemma, same as LeLeskWSD.smart_synset_search() on Gloss WordNet.
+        Lemmas are matched case-insensitively, '-' is replaced with space if nothing is found.
+        """
+        words = self.lexicon['words']
+        sids = []
+        for term in (lemma, lemma.replace('-', ' ')):
+            sids = uniquify([sid for sid, spos in words.get(term.lower(), ()) if not pos or spos == pos])
+            if not pos:
+                sids.sort()
+            if sids:
+                break
+        if deep_select:
+            return SynsetCollection(synsets=(self.synset(Synset(sid).ID) for sid in sids))
+        return SynsetCollection(synsets=(Synset(sid) for sid in sids))
+
+    def tagcounts(self):
+        """ Get tag counts of all synsets (TagCounts) """
+        tagcounts = TagCounts()
+        for sno in range(len(self)):
+            count = self.counts[sno]
+            tagcounts.add(self._sid(sno), None if count == NO_TAGCOUNT else count)
+        return tagcounts
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Compact indices of LESK tokens for fast overlap scoring
+"""
+
+# This code is a part of lelesk library: https://github.com/letuananh/lelesk
+# :copyright: (c) 2014 Le Tuan Anh <tuananh.ke@gmail.com>
+# :license: MIT, see LICENSE for more details.
+
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from itertools import chain
+
+
+class InvertedIndex:
+    """ Map each LESK token to the list of synsets (posting list) whose signature contains it
+
+    Synsets are numbered internally in the order they are added.
+    """
+    def __init__(self):
+        self.synsetids = []   # synset number => synset ID (canonical string)
+        self.synset_map = {}  # synset ID => synset number
+        self.postings = {}    # token => array of synset numbers
+
+    def __len__(self):
+        return len(self.synsetids)
+
+    def __contains__(self, synsetid):
+        return str(synsetid) in self.synset_map
+
+    def add(self, synsetid, tokens):
+        """ Add the LESK tokens of a synset to the index """
+        synsetid = str(synsetid)
+        if synsetid in self.synset_map:
+            raise ValueError("Synset {} has been indexed already".format(synsetid))
+        sno = len(self.synsetids)
+        self.synsetids.append(synsetid)
+        self.synset_map[synsetid] = sno
+        for token in set(tokens):
+            if token not in self.postings:
+                self.postings[token] = array('I')
+            self.postings[token].append(sno)
+        return sno
+
+    def lookup(self, synsetid):
+        """ Get the internal number of an indexed synset (None if it is not indexed) """
+        return self.synset_map.get(str(synsetid))
+
+    def overlap(self, context):
+        """ Count shared tokens between a context and every indexed synset by walking
+        the posting list of each context token once.
+
+        Returns a Counter of synset number => score (synsets without overlap are omitted)
+        """
+        return Counter(chain.from_iterable(self.postings[t] for t in set(context) if t in self.postings))
+
+    def scores(self, context):
+        """ Same as overlap() but keyed by synset IDs """
+        return {self.synsetids[sno]: score for sno, score in self.overlap(context).items()}
+
+
+class Vocabulary:
+    """ Map LESK tokens to integer IDs """
+    def __init__(self):
+        self.token_map = {}  # token => token ID
+        self.tokens = {}     # token ID => token
+        self.__next_id = 1
+
+    def __len__(self):
+        return len(self.token_map)
+
+    def __contains__(self, token):
+        return token in self.token_map
+
+    def add(self, token, tid=None):
+        """ Add a token to this vocabulary and return its ID.
+        A new ID will be assigned when tid is not provided """
+        if token in self.token_map:
+            return self.token_map[token]
+        if tid is None:
+            tid = self.__next_id
+        self.__next_id = max(self.__next_id, tid + 1)
+        self.token_map[token] = tid
+        self.tokens[tid] = token
+        return tid
+
+    def get(self, token, default=None):
+        return self.token_map.get(token, default)
+
+    def encode(self, tokens):
+        """ Convert tokens to a sorted array of unique token IDs (unknown tokens are ignored) """
+        return array('I', sorted({self.token_map[t] for t in tokens if t in self.token_map}))
+
+    def decode(self, token_ids):
+        return [self.tokens[tid] for tid in token_ids]
+
+
+class SignatureStore:
+    """ Store LESK signatures as sorted token ID arrays packed into one contiguous buffer
+
+    Tokens of synset number i are data[offsets[i]:offsets[i + 1]]
+    """
+    def __init__(self, vocab=None):
+        self.vocab = vocab if vocab is not None else Vocabulary()
+        self.synsetids = []   # synset number => synset ID (canonical string)
+        self.synset_map = {}  # synset ID => synset number
+        self.offsets = array('I', [0])
+        self.data = array('I')
+
+    def __len__(self):
+        return len(self.synsetids)
+
+    def __contains__(self, synsetid):
+        return str(synsetid) in self.synset_map
+
+    @property
+    def nbytes(self):
+        """ Size of the packed signature buffers in bytes """
+        return self.offsets.itemsize * len(self.offsets) + self.data.itemsize * len(self.data)
+
+    def add(self, synsetid, tokens):
+        """ Add the LESK tokens of a synset, new tokens will be added to the vocabulary """
+        return self.add_ids(synsetid, sorted({self.vocab.add(t) for t in tokens}))
+
+    def add_ids(self, synsetid, token_ids):
+        """ Add a synset signature from sorted unique token IDs """
+        synsetid = str(synsetid)
+        if synsetid in self.synset_map:
+            raise ValueError("Synset {} has been stored already".format(synsetid))
+        sno = len(self.synsetids)
+        self.synsetids.append(synsetid)
+        self.synset_map[synsetid] = sno
+        self.data.extend(token_ids)
+        self.offsets.append(len(self.data))
+        return sno
+
+    def lookup(self, synsetid):
+        """ Get the internal number of a stored synset (None if it is not available) """
+        return self.synset_map.get(str(synsetid))
+
+    def token_ids(self, sno):
+        return self.data[self.offsets[sno]:self.offsets[sno + 1]]
+
+    def tokens(self, synsetid):
+        """ Get LESK tokens of a synset (None if the synset is not available) """
+        sno = self.lookup(synsetid)
+        return None if sno is None else self.vocab.decode(self.token_ids(sno))
+
+    def overlap(self, sno, context_ids):
+        """ Count shared token IDs between a synset signature and
+        a sorted context (e.g. from Vocabulary.encode()) """
+        lo, hi = self.offsets[sno], self.offsets[sno + 1]
+        data = self.data
+        score = 0
+        for tid in context_ids:
+            lo = bisect_left(data, tid, lo, hi)
+            if lo == hi:
+                break
+            if data[lo] == tid:
+                score += 1
+                lo += 1
+        return score
+
+
+class TagCounts:
+    """ Tag counts of synsets in a dense array indexed by synset number """
+
+    NA = 0xFFFFFFFF  # tag count is not available
+
+    def __init__(self):
+        self.synset_map = {}  # synset ID => synset number
+        self.counts = array('I')
+
+    def __len__(self):
+        return len(self.counts)
+
+    def __contains__(self, synsetid):
+        return str(synsetid) in self.synset_map
+
+    def add(self, synsetid, count):
+        synsetid = str(synsetid)
+        count = TagCounts.NA if count is None else count
+        if synsetid in self.synset_map:
+            self.counts[self.synset_map[synsetid]] = count
+        else:
+            self.synset_map[synsetid] = len(self.counts)
+            self.counts.append(count)
+
+    def get(self, synsetid, default=None):
+        """ Get tag count of a synset (default if it is not available) """
+        sno = self.synset_map.get(str(synsetid))
+        if sno is None or self.counts[sno] == TagCounts.NA:
+            return default
+        return self.counts[sno]
+
+    def items(self):
+        return ((sid, self.get(sid)) for sid in self.synset_map)
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Opt-in per-stage timers, counters and database query counts
+"""
+
+# This code is a part of lelesk library: https://github.com/letuananh/lelesk
+# :copyright: (c) 2014 Le Tuan Anh <tuananh.ke@gmail.com>
+# :license: MIT, see LICENSE for more details.
+
+import json
+import time
+import threading
+import functools
+from contextlib import contextmanager, nullcontext
+
+# -----------------------------------------------------------------------
+
+STAGES = ('tokenize', 'pos_tag', 'lemmatize', 'candidates', 'signatures', 'tagcount', 'scoring', 'writing')
+
+
+class Instrumentation:
+    """ Cumulative wall-clock time and number of calls of WSD stages (see STAGES), event counters
+    (e.g. signatures.hit/signatures.miss) and number of SQL statements executed on each database.
+
+    A stage which is entered again while it is running in the same thread (e.g. batch_synset_search()
+    calling smart_synset_search()) is timed once. Different stages may be nested, e.g. tagcount is also
+    counted in scoring. All methods can be called from many threads.
+    """
+
+    enabled = True
+
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.__active = threading.local()
+        self.timers = {}    # stage => [calls, seconds]
+        self.counters = {}  # name => count
+        self.queries = {}   # database => number of SQL statements
+
+    @contextmanager
+    def stage(self, name):
+        """ Time a block of code as a stage """
+        active = self.__active.__dict__.setdefault('stages', set())
+        if name in active:
+            yield
+            return
+        active.add(name)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            active.discard(name)
+            self.add_time(name, elapsed)
+
+    def add_time(self, name, seconds, calls=1):
+        with self.__lock:
+            timer = self.timers.setdefault(name, [0, 0.0])
+            timer[0] += calls
+            timer[1] += seconds
+
+    def count(self, name, n=1):
+        with self.__lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def query(self, db, statement=None):
+        """ Count an SQL statement executed on db """
+        with self.__lock:
+            self.queries[db] = self.queries.get(db, 0) + 1
+
+    def tracer(self, db):
+        """ A sqlite3 trace callback which counts statements of db (see sqlite3.Connection.set_trace_callback()) """
+        return functools.partial(self.query, db)
+
+    def reset(self):
+        with self.__lock:
+            self.timers = {}
+            self.counters = {}
+            self.queries = {}
+
+    def report(self):
+        """ A JSON-serializable snapshot of all timers and counters """
+        with self.__lock:
+            stages = {name: {'calls': calls, 'seconds': seconds, 'mean_ms': seconds * 1000 / calls if calls else 0.0}
+                      for name, (calls, seconds) in self.timers.items()}
+            return {'stages': dict(sorted(stages.items(), key=lambda x: _stage_order(x[0]))),
+                    'counters': dict(sorted(self.counters.items())),
+                    'queries': dict(sorted(self.queries.items()))}
+
+    def merge(self, report):
+        """ Add a report (e.g. from a worker process, see report()) to this object """
+        for name, stage in report.get('stages', {}).items():
+            self.add_time(name, stage['seconds'], calls=stage['calls'])
+        for name, n in report.get('counters', {}).items():
+            self.count(name, n)
+        with self.__lock:
+            for db, n in report.get('queries', {}).items():
+                self.queries[db] = self.queries.get(db, 0) + n
+
+    def dump(self, path, **extra):
+        """ Write report() (and extra information) to a JSON file """
+        report = dict(extra)
+        report.update(self.report())
+        with open(path, 'w') as outfile:
+            json.dump(report, outfile, indent=2)
+
+
+class NullInstrumentation:
+    """ Instrumentation which records nothing (the default of LeLeskWSD) """
+
+    enabled = False
+    __null = nullcontext()
+
+    def stage(self, name):
+        return self.__null
+
+    def add_time(self, name, seconds, calls=1):
+        pass
+
+    def count(self, name, n=1):
+        pass
+
+    def query(self, db, statement=None):
+        pass
+
+    def tracer(self, db):
+        return None
+
+    def reset(self):
+        pass
+
+    def report(self):
+        return {'stages': {}, 'counters': {}, 'queries': {}}
+
+
+NULL_INSTRUMENTATION = NullInstrumentation()
+
+
+def timed(stage):
+    """ Time a method as a stage of self.stats (an Instrumentation object) """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            if not self.stats.enabled:
+                return func(self, *args, **kwargs)
+            with self.stats.stage(stage):
+                return func(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _stage_order(name):
+    return (STAGES.index(name), name) if name in STAGES else (len(STAGES), name)
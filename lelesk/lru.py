@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Bounded least-recently-used cache with usage statistics
+"""
+
+# This code is a part of lelesk library: https://github.com/letuananh/lelesk
+# :copyright: (c) 2014 Le Tuan Anh <tuananh.ke@gmail.com>
+# :license: MIT, see LICENSE for more details.
+
+import sys
+import threading
+from collections import OrderedDict
+
+
+class LRUCache:
+    """ A dict-like cache which evicts least recently used entries when it has more than
+    max_entries entries or when the estimated size of its values exceeds max_bytes.
+
+    Arguments:
+        max_entries -- Maximum number of entries (None = unlimited)
+        max_bytes   -- Maximum total size of values (None = unlimited)
+        sizeof      -- Function to estimate the size of a value in bytes (default to sys.getsizeof),
+                       it is only called (and nbytes is only tracked) when max_bytes is set
+    """
+    def __init__(self, max_entries=None, max_bytes=None, sizeof=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof if sizeof is not None else sys.getsizeof
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.nbytes = 0
+        self.__data = OrderedDict()  # key => (value, size)
+        self.__lock = threading.RLock()
+
+    def __len__(self):
+        return len(self.__data)
+
+    def __contains__(self, key):
+        """ Check if a key is cached (does not count as a hit or miss) """
+        return key in self.__data
+
+    def __getitem__(self, key):
+        with self.__lock:
+            try:
+                value = self.__data[key][0]
+            except KeyError:
+                self.misses += 1
+                raise
+            self.__data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def __setitem__(self, key, value):
+        size = self.sizeof(value) if self.max_bytes is not None else 0
+        with self.__lock:
+            if key in self.__data:
+                self.nbytes -= self.__data.pop(key)[1]
+            self.__data[key] = (value, size)
+            self.nbytes += size
+            self._evict()
+
+    def __delitem__(self, key):
+        with self.__lock:
+            self.nbytes -= self.__data.pop(key)[1]
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def update(self, items):
+        """ Add many entries from a dict or an iterable of (key, value) """
+        for key, value in (items.items() if hasattr(items, 'items') else items):
+            self[key] = value
+
+    def keys(self):
+        return list(self.__data.keys())
+
+    def clear(self):
+        with self.__lock:
+            self.__data.clear()
+            self.nbytes = 0
+
+    def _evict(self):
+        while self.__data and ((self.max_entries is not None and len(self.__data) > self.max_entries) or
+                               (self.max_bytes is not None and self.nbytes > self.max_bytes)):
+            _, (_, size) = self.__data.popitem(last=False)
+            self.nbytes -= size
+            self.evictions += 1
+
+    def stats(self):
+        """ Usage statistics (hits, misses, evictions, current size) of this cache """
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                'entries': len(self), 'bytes': self.nbytes,
+                'max_entries': self.max_entries, 'max_bytes': self.max_bytes}
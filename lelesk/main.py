@@ -9,21 +9,33 @@ Le's LESK - Word Sense Disambiguation Package
 # :copyright: (c) 2014 Le Tuan Anh <tuananh.ke@gmail.com>
 # :license: MIT, see LICENSE for more details.
 
+import sys
 import logging
 import os.path
+import hashlib
+import heapq
 import operator
+import multiprocessing
+from itertools import groupby
 from collections import defaultdict as dd
 from collections import namedtuple
 
-import nltk
-from nltk.corpus import stopwords
 from texttaglib.chirptext import FileHelper
 from texttaglib.chirptext import Counter, Timer, uniquify, header, TextReport
 from texttaglib.puchikarui import Schema
 
+from .__version__ import __version__
 from .config import LLConfig
+from .lru import LRUCache
+from .dbpool import ConnectionPool
+from .instrument import Instrumentation, NULL_INSTRUMENTATION, timed
+from .index import InvertedIndex, Vocabulary, SignatureStore, TagCounts
+from .sigfile import SignatureFile, write_signature_file
+from .frozen import FrozenModel, write_frozen_model
+from .sparse import SparseSignatures
 from .util import ptpos_to_wn, PUNCS
-from yawlib import SynsetID, YLConfig
+from yawlib import SynsetID, YLConfig, SynsetNotFoundException
+from yawlib import Synset, SynsetCollection
 from yawlib import GWordnetSQLite as GWNSQL
 from yawlib import WordnetSQL as WSQL
 
@@ -33,12 +45,42 @@ from yawlib import WordnetSQL as WSQL
 
 ScoreTup = namedtuple('Score', 'candidate score freq'.split())
 WSDCandidate = namedtuple('WSDCandidate', 'id synset tokens'.split())
+SQL_CHUNK_SIZE = 500  # max number of values in an IN (...) clause
+
+
+def _chunks(items, size=SQL_CHUNK_SIZE):
+    items = list(items)
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def _sizeof_candidates(candidates):
+    """ Estimate memory used by a list of WSD candidates (in bytes) """
+    size = sys.getsizeof(candidates)
+    for candidate in candidates:
+        size += sys.getsizeof(candidate) + sys.getsizeof(candidate.tokens)
+        size += sum(sys.getsizeof(token) for token in candidate.tokens)
+    return size
+
+
+def _sizeof_synsets(synsets):
+    return sys.getsizeof(synsets.synsets) + sum(sys.getsizeof(ss) for ss in synsets)
+
+
+def read_tagcounts(wn):
+    """ Read tag counts of all synsets from a WordNet SQL database with a single query """
+    tagcounts = TagCounts()
+    with wn.ctx() as ctx:
+        for synsetid, tagcount in ctx.execute('SELECT synsetid, SUM(tagcount) FROM senses GROUP BY synsetid'):
+            tagcounts.add(SynsetID.from_string(str(synsetid)).to_canonical(), tagcount)
+    return tagcounts
 
 
 class LeLeskWSD:
     """ Le's LESK algorithm for Word-Sense Disambiguation
     """
-    def __init__(self, wng_db_loc=None, wn30_loc=None, verbose=False, dbcache=None):
+    def __init__(self, wng_db_loc=None, wn30_loc=None, verbose=False, dbcache=None, index=None, signatures=None, tagcounts=None,
+                 cache_size=LLConfig.LELESK_CANDIDATES_CACHE_SIZE, cache_bytes=None, instrument=False):
         logging.getLogger(__name__).debug("Initializing LeLeskWSD object ...")
         self.wng_db_loc = wng_db_loc if wng_db_loc else YLConfig.GWN30_DB
         self.wn30_loc = wn30_loc if wn30_loc else YLConfig.WNSQL30_PATH
@@ -47,123 +89,519 @@ class LeLeskWSD:
         self.__stopwords = None  # this should be loaded only once
         self.PUNCS = set(PUNCS)
 
-        if dbcache and not isinstance(dbcache, LeskCache):
-            dbcache = LeskCache(dbcache)
+        if dbcache and not isinstance(dbcache, (LeskCache, SignatureFile)):
+            if FrozenModel.is_frozen_model(dbcache):
+                dbcache = FrozenModel(dbcache)
+            elif SignatureFile.is_signature_file(dbcache):
+                dbcache = SignatureFile(dbcache)
+            else:
+                dbcache = LeskCache(dbcache)
         self.dbcache = dbcache
         self._lemmatizer = None
-        self.candidates_cache = {}
+        # (word, pos) => WSD candidates, bounded by number of entries and/or estimated size in bytes
+        self.candidates_cache = LRUCache(cache_size, cache_bytes, sizeof=_sizeof_candidates)
+        self.word_cache = self.candidates_cache  # for backward compatibility
         self.verbose = verbose
-        self.word_cache = {}
+        self.synset_cache = LRUCache(cache_size, sizeof=_sizeof_synsets)  # (lemma, pos) => synsets (see smart_synset_search)
+        self.lemma_cache = LRUCache(LLConfig.LELESK_LEMMA_CACHE_SIZE)  # (surface, WN POS) => lemma
+        # inverted index (token => synsets) for overlap scoring
+        self.index = index
+        self.__overlap_cache = None  # (context, overlap scores) of the last context
+        # integer-encoded signatures (SignatureStore)
+        if signatures is None and isinstance(dbcache, SignatureFile):
+            signatures = dbcache
+        self.signatures = signatures
+        # signatures as a sparse matrix for the 'sparse' method (see load_matrix())
+        self.matrix = None
+        # preloaded tag counts (TagCounts)
+        self.tagcounts = tagcounts
 
-        # database context for faster access
-        self.__dbcache_ctx = None
-        self.__gwn_ctx = None
-        self.__wn_ctx = None
+        # per-stage timers and counters (see enable_stats())
+        self.stats = NULL_INSTRUMENTATION
+        # database connections, each thread has its own connections (see connect())
+        self.gwn_pool = ConnectionPool(self.gwn, readonly=True, pragmas=LLConfig.SQLITE_READONLY_PRAGMAS)
+        self.wn_pool = ConnectionPool(self.wn, readonly=True, pragmas=LLConfig.SQLITE_READONLY_PRAGMAS)
+        self.dbcache_pool = ConnectionPool(dbcache.db, pragmas=LLConfig.SQLITE_PRAGMAS) if isinstance(dbcache, LeskCache) else None
+        if instrument:
+            self.enable_stats()
         logging.getLogger(__name__).debug("LeLeskWSD object has been initialized ...")
 
-    def connect(self):
-        """ Use a single database connection for DB access """
-        self.disconnect()
-        if self.dbcache is not None:
-            self.__dbcache_ctx = self.dbcache.db.ctx()
-        self.__gwn_ctx = self.gwn.ctx()
-        self.__wn_ctx = self.wn.ctx()
+    @classmethod
+    def from_frozen(cls, path, **kwargs):
+        """ Create a LeLeskWSD object from a frozen model (see freeze()), no database will be used """
+        return cls(dbcache=FrozenModel(path), **kwargs)
+
+    @property
+    def frozen(self):
+        """ Check if this object uses a frozen model instead of databases """
+        return isinstance(self.dbcache, FrozenModel)
+
+    @property
+    def __dbcache_ctx(self):
+        return self.dbcache_pool.ctx() if self.dbcache_pool is not None else None
+
+    @property
+    def __gwn_ctx(self):
+        return self.gwn_pool.ctx()
+
+    @property
+    def __wn_ctx(self):
+        return self.wn_pool.ctx()
+
+    def connect(self, readonly=False):
+        """ Open database connections of the calling thread now instead of on first use.
+
+        Every thread uses its own pooled connections (see ConnectionPool) so that many threads can share
+        a single LeLeskWSD object and its caches. Gloss WordNet and WordNet SQL are always opened
+        read-only (readonly is kept for backward compatibility).
+        """
+        if self.dbcache_pool is not None:
+            self.dbcache_pool.ctx()
+        if self.frozen:
+            return
+        self.gwn_pool.ctx()
+        self.wn_pool.ctx()
+
+    def warm_up(self):
+        """ Load stopwords and NLTK models now instead of on first use.
+
+        NLTK corpus loaders are not thread-safe on first load, so this should be called once
+        before WSD runs on many threads. Missing NLTK data are logged and ignored.
+        """
+        try:
+            self.stopwords
+        except LookupError:
+            logging.getLogger(__name__).warning("NLTK stopwords could not be loaded", exc_info=True)
+        try:
+            self.lemmatize(self.tokenize("The WSD models are warming up."))
+        except LookupError:
+            logging.getLogger(__name__).warning("NLTK models could not be loaded, only tokenized and lemmatized input can be processed", exc_info=True)
+        return self
 
     def disconnect(self):
-        if self.__dbcache_ctx is not None:
-            self.__dbcache_ctx.close()
-            self.__dbcache_ctx = None
-        if self.__gwn_ctx is not None:
-            self.__gwn_ctx.close()
-            self.__gwn_ctx = None
-        if self.__wn_ctx is not None:
-            self.__wn_ctx.close()
-            self.__wn_ctx = None
+        """ Close database connections of all threads """
+        for pool in (self.dbcache_pool, self.gwn_pool, self.wn_pool):
+            if pool is not None:
+                pool.close_all()
+
+    def build_index(self):
+        """ Build an inverted index from all synsets in the LeskCache DB """
+        if self.dbcache is None:
+            raise ValueError("A LeskCache is required to build an inverted index")
+        self.index = self.dbcache.build_index(ctx=self.__dbcache_ctx)
+        self.__overlap_cache = None
+        return self.index
+
+    def load_signatures(self):
+        """ Load all signatures from the LeskCache DB into a compact SignatureStore """
+        if self.dbcache is None:
+            raise ValueError("A LeskCache is required to load signatures")
+        self.signatures = self.dbcache.build_signatures(ctx=self.__dbcache_ctx)
+        return self.signatures
+
+    def load_matrix(self):
+        """ Build a sparse signature matrix (see sparse_wsd()) from loaded signatures or the LeskCache DB """
+        if self.signatures is None:
+            self.load_signatures()
+        self.matrix = SparseSignatures(self.signatures)
+        return self.matrix
+
+    def freeze(self, path):
+        """ Compile everything WSD needs (lemma => candidates, signatures of all synsets, tag counts,
+        synset lemmas and definitions) into a frozen model file (see from_frozen())
+        """
+        if not isinstance(self.dbcache, LeskCache):
+            raise ValueError("A LeskCache is required to freeze a model")
+        words = dd(list)    # lowercased lemma => [(GWN synset ID, pos)], same order as batch_synset_search()
+        lemmas = dd(list)   # GWN synset ID => lemmas
+        definitions = {}    # GWN synset ID => definition
+        with self.gwn.ctx() as ctx:
+            for term, sid, pos in ctx.execute('SELECT lower(term.term), synset.ID, synset.pos FROM term JOIN synset ON synset.ID = term.sid ORDER BY synset.rowid'):
+                words[term].append((sid, pos))
+            for sid, term in ctx.execute('SELECT sid, term FROM term ORDER BY rowid'):
+                lemmas[sid].append(term)
+            for sid, surface in ctx.execute("SELECT sid, surface FROM gloss WHERE cat='def' ORDER BY id"):
+                definitions.setdefault(sid, surface)
+            gwn_ids = [row[0] for row in ctx.execute('SELECT id FROM synset')]
+        synsets = {SynsetID.from_string(sid).to_canonical(): (lemmas[sid], definitions.get(sid)) for sid in gwn_ids}
+        # build and cache signatures of synsets which have not been generated
+        for chunk in _chunks(synsets, LLConfig.LELESK_CANDIDATES_CACHE_SIZE):
+            self.get_lelesk_sets(chunk)
+        store = self.dbcache.build_signatures(ctx=self.__dbcache_ctx)
+        write_frozen_model(path, store, read_tagcounts(self.wn), words, synsets, lelesk_version=__version__)
+        return store
+
+    def load_tagcounts(self):
+        """ Load tag counts of all synsets so that scoring does not need to query WordNet SQL.
+        Tag counts are read from LeskCache if they were cached there, otherwise from WordNet SQL.
+        """
+        tagcounts = None
+        if self.frozen:
+            tagcounts = self.dbcache.tagcounts()
+        elif isinstance(self.dbcache, LeskCache):
+            tagcounts = self.dbcache.load_tagcounts(ctx=self.__dbcache_ctx)
+        if not tagcounts:
+            tagcounts = read_tagcounts(self.wn)
+            if isinstance(self.dbcache, LeskCache):
+                self.dbcache.cache_tagcounts(tagcounts)
+        self.tagcounts = tagcounts
+        return tagcounts
+
+    def get_tagcount(self, synsetid):
+        """ Get tag count of a synset (from preloaded tag counts or the signature file if available) """
+        if self.tagcounts is not None:
+            return self.tagcounts.get(synsetid)
+        with self.stats.stage('tagcount'):
+            if isinstance(self.dbcache, SignatureFile):
+                tagcount = self.dbcache.tagcount(synsetid)
+                if tagcount is not None or self.frozen:
+                    return tagcount
+            return self.wn.get_tagcount(synsetid.to_wnsql(), ctx=self.__wn_ctx)
+
+    @timed('scoring')
+    def context_overlap(self, context_set):
+        """ Score all indexed synsets against a context.
+        The result is reused as long as the same context is given (e.g. all tokens of a sentence)
+        """
+        key = frozenset(context_set)
+        cached = self.__overlap_cache
+        if cached is None or cached[0] != key:
+            cached = (key, self.index.overlap(key))
+            self.__overlap_cache = cached
+        return cached[1]
 
     @property
     def stopwords(self):
         if self.__stopwords is None:
-            self.__stopwords = stopwords.words('english')
-            self.__stopwords.extend(PUNCS)
+            from nltk.corpus import stopwords
+            self.__stopwords = frozenset(stopwords.words('english')).union(PUNCS)
         return self.__stopwords
 
+    @stopwords.setter
+    def stopwords(self, words):
+        ''' Use a custom stop word list instead of NLTK English stop words (punctuations are always stop words) '''
+        self.__stopwords = frozenset(words).union(PUNCS)
+
     @property
     def lemmatizer(self):
         if self._lemmatizer is None:
-            self._lemmatizer = nltk.WordNetLemmatizer()
+            from nltk.stem import WordNetLemmatizer
+            self._lemmatizer = WordNetLemmatizer()
         return self._lemmatizer
 
+    def lemmatize_word(self, surface, pos):
+        """ Lemmatize a word given its Penn Treebank POS tag, lemmas are memoized in lemma_cache """
+        key = (surface, ptpos_to_wn(pos, default='n'))
+        lemma = self.lemma_cache.get(key)
+        if lemma is None:
+            lemma = self.lemmatizer.lemmatize(surface, pos=key[1])
+            self.lemma_cache[key] = lemma
+        return lemma
+
     def lemmatize(self, words):
         """ Return a list of triplets (surface, pos, lemma) """
-        tags = nltk.pos_tag(words)
-        tokens = [(w, pos, self.lemmatizer.lemmatize(w, pos=ptpos_to_wn(pos, default='n'))) for w, pos in tags]
+        from nltk import pos_tag
+        with self.stats.stage('pos_tag'):
+            tags = pos_tag(words)
+        with self.stats.stage('lemmatize'):
+            tokens = [(w, pos, self.lemmatize_word(w, pos)) for w, pos in tags]
         return tokens  # [(surface, tag, lemma)]
 
     def lemmatize_ttl(self, sent):
-        tags = nltk.pos_tag([t.text for t in sent.tokens])
-        for token, (surface, pos) in zip(sent, tags):
-            token.pos = pos
-            token.lemma = self.lemmatizer.lemmatize(surface, pos=ptpos_to_wn(pos, default='n'))
+        self.lemmatize_ttl_sents([sent])
         return sent
 
+    def lemmatize_ttl_sents(self, sents, keep_existing=False):
+        """ POS tag and lemmatize many TTL sentences with a single tagger call
+
+        When keep_existing is True, POS tags and lemmas which are available on tokens are kept,
+        only sentences which have tokens without POS tags are tagged and only missing values are filled.
+        """
+        if keep_existing:
+            to_tag = [sent for sent in sents if any(not t.pos for t in sent)]
+        else:
+            to_tag = sents
+        if to_tag:
+            from nltk import pos_tag_sents
+            with self.stats.stage('pos_tag'):
+                tagged_sents = pos_tag_sents([[t.text for t in sent.tokens] for sent in to_tag])
+            with self.stats.stage('lemmatize'):
+                for sent, tags in zip(to_tag, tagged_sents):
+                    for token, (surface, pos) in zip(sent, tags):
+                        if keep_existing and token.pos:
+                            continue
+                        token.pos = pos
+                        if not keep_existing or not token.lemma:
+                            token.lemma = self.lemmatize_word(surface, pos)
+        if keep_existing:
+            with self.stats.stage('lemmatize'):
+                for sent in sents:
+                    for token in sent:
+                        if not token.lemma:
+                            token.lemma = self.lemmatize_word(token.text, token.pos)
+        return sents
+
+    @timed('tokenize')
     def tokenize(self, sentence_text):
-        return nltk.word_tokenize(sentence_text)
+        from nltk import word_tokenize
+        return word_tokenize(sentence_text)
 
+    def cache_stats(self):
+        """ Usage statistics of in-memory caches (see LRUCache.stats()) """
+        return {'candidates': self.candidates_cache.stats(), 'synsets': self.synset_cache.stats(), 'lemmas': self.lemma_cache.stats()}
+
+    def enable_stats(self, stats=None):
+        """ Start collecting per-stage timers, counters and SQL statement counts of each database (see Instrumentation).
+        Returns the Instrumentation object (a new one is created if stats is None)
+        """
+        self.stats = stats if stats is not None else Instrumentation()
+        self.__trace_pools()
+        return self.stats
+
+    def disable_stats(self):
+        self.stats = NULL_INSTRUMENTATION
+        self.__trace_pools()
+
+    def __trace_pools(self):
+        for name, pool in (('gwn', self.gwn_pool), ('wn', self.wn_pool), ('lesk_cache', self.dbcache_pool)):
+            if pool is not None:
+                pool.set_trace(self.stats.tracer(name))
+
+    def stats_report(self):
+        """ Timers, counters and SQL statement counts (see Instrumentation.report()) and in-memory cache statistics """
+        report = self.stats.report()
+        report['caches'] = self.cache_stats()
+        return report
+
+    @timed('candidates')
     def smart_synset_search(self, lemma, pos, deep_select=False):
+        if not deep_select:
+            sses = self.synset_cache.get((lemma, pos))
+            if sses is None:
+                # LeskCache is searched first and found candidates are stored there (see batch_synset_search())
+                sses = self.batch_synset_search([(lemma, pos)])[(lemma, pos)]
+                self.synset_cache[(lemma, pos)] = sses
+            return sses
+        if self.frozen:
+            return self.dbcache.search(lemma, pos, deep_select=deep_select)
+        return self.__gwn_search(lemma, pos, deep_select=deep_select)
+
+    def __gwn_search(self, lemma, pos, deep_select=False):
         sses = self.gwn.search(lemma=lemma, pos=pos, deep_select=deep_select, ctx=self.__gwn_ctx)
         if len(sses) == 0:
             # try replace '-' with space
             sses = self.gwn.search(lemma=lemma.replace('-', ' '), pos=pos, ctx=self.__gwn_ctx)
         return sses
 
+    @timed('candidates')
+    def batch_synset_search(self, words):
+        """ Same as smart_synset_search() (without deep_select) for many (lemma, pos) pairs,
+        but all lemmas are looked up with a few batched queries (in LeskCache first, then in Gloss WordNet).
+
+        Returns a dict of (lemma, pos) => synsets
+        """
+        words = set(words)
+        if self.frozen:
+            return {(lemma, pos): self.dbcache.search(lemma, pos) for lemma, pos in words}
+        results = {}
+        if isinstance(self.dbcache, LeskCache):
+            for key, synsetids in self.dbcache.select_candidates_many(words, ctx=self.__dbcache_ctx).items():
+                results[key] = SynsetCollection(synsets=(Synset(sid) for sid in synsetids))
+        pending = []
+        searched = []
+        for lemma, pos in words:
+            if (lemma, pos) in results:
+                continue
+            searched.append((lemma, pos))
+            if '%' in lemma or '_' in lemma:
+                # LIKE wildcards need escaping, let gwn.search() handle these
+                results[(lemma, pos)] = self.__gwn_search(lemma, pos)
+            else:
+                pending.append((lemma, pos))
+        for replace_hyphen in (False, True):
+            if not pending:
+                break
+            queries = dd(list)  # lowercased lemma => (lemma, pos) pairs
+            for lemma, pos in pending:
+                term = lemma.replace('-', ' ') if replace_hyphen else lemma
+                queries[term.lower()].append((lemma, pos))
+            matches = dd(list)  # lowercased lemma => [(synset ID, pos)]
+            for chunk in _chunks(queries):
+                query = ('SELECT lower(term.term), synset.ID, synset.pos FROM term JOIN synset ON synset.ID = term.sid '
+                         'WHERE lower(term.term) IN ({}) ORDER BY synset.rowid'.format(','.join('?' * len(chunk))))
+                for term, sid, spos in self.__gwn_execute(query, chunk):
+                    matches[term].append((sid, spos))
+            not_found = []
+            for term, pairs in queries.items():
+                for lemma, pos in pairs:
+                    # same order as gwn.search(): by synset rowid when pos is given, by synset ID otherwise
+                    sids = uniquify([sid for sid, spos in matches[term] if not pos or spos == pos])
+                    if not pos:
+                        sids.sort()
+                    if sids or replace_hyphen:
+                        results[(lemma, pos)] = SynsetCollection(synsets=(Synset(sid) for sid in sids))
+                    else:
+                        not_found.append((lemma, pos))
+            pending = not_found
+        if searched and isinstance(self.dbcache, LeskCache):
+            self.dbcache.cache_candidates_many((((lemma, pos), [ss.ID for ss in results[(lemma, pos)]]) for lemma, pos in searched), ctx=self.__dbcache_ctx)
+        return results
+
+    def __gwn_execute(self, query, params):
+        return self.__gwn_ctx.execute(query, params)
+
+    def __wn_execute(self, query, params):
+        return self.__wn_ctx.execute(query, params)
+
+    def prefetch_candidates(self, words):
+        """ Build WSD candidates of many (lemma, pos) pairs (e.g. all words of a document) at once.
+        Synsets are searched with batched queries and cached LESK tokens are selected together,
+        results are stored in candidates_cache so that lelesk_wsd() will not query the databases again.
+        """
+        words = {key for key in words if key not in self.candidates_cache}
+        if not words:
+            return
+        found = self.batch_synset_search(words)
+        self.synset_cache.update(found)
+        tokens = self.get_lelesk_sets(ss.ID for synsets in found.values() for ss in synsets)
+        for key, synsets in found.items():
+            self.candidates_cache[key] = [WSDCandidate(idx + 1, ss, tokens[str(ss.ID)]) for idx, ss in enumerate(synsets)]
+        logging.getLogger(__name__).debug("Prefetched candidates of {} words".format(len(words)))
+
     def build_lelesk_for_word(self, a_word, pos=None, deep_select=False):
         cache_key = (a_word, pos)
-        if cache_key in self.word_cache:
-            return self.word_cache[cache_key]
+        candidates = self.candidates_cache.get(cache_key)
+        if candidates is not None:
+            return candidates
         synsets = self.smart_synset_search(lemma=a_word, pos=pos, deep_select=deep_select)
         candidates = self.build_candidates(synsets)
-        self.word_cache[cache_key] = candidates
+        self.candidates_cache[cache_key] = candidates
         return candidates
 
     def build_candidates(self, synsets):
+        tokens = self.get_lelesk_sets(ss.ID for ss in synsets)
         candidates = []
         for idx, ss in enumerate(synsets):
-            tokens = self.build_lelesk_set(ss.ID)
-            candidates.append(WSDCandidate(idx + 1, ss, tokens))
+            candidates.append(WSDCandidate(idx + 1, ss, tokens[str(ss.ID)]))
         return candidates
 
-    def build_lelesk_set(self, a_sid):
+    @timed('signatures')
+    def get_lelesk_sets(self, synsetids):
+        """ Get LESK tokens of many synsets from the cache, tokens which are not cached yet
+        are built together (see build_lelesk_sets()) and cached.
+
+        Returns a dict of synset ID => tokens
+        """
+        synsetids = uniquify([str(sid) for sid in synsetids])
+        found = self.dbcache.select_many(synsetids, ctx=self.__dbcache_ctx) if self.dbcache is not None else {}
+        missing = [sid for sid in synsetids if not found.get(sid)]
+        self.stats.count('signatures.hit', len(synsetids) - len(missing))
+        self.stats.count('signatures.miss', len(missing))
+        if self.frozen:
+            # frozen models contain signatures of all synsets
+            found.update((sid, []) for sid in missing)
+        elif missing:
+            built = self.build_lelesk_sets(missing)
+            not_found = [sid for sid in missing if sid not in built]
+            if not_found:
+                raise SynsetNotFoundException(not_found[0])
+            if self.dbcache is not None:
+                self.dbcache.cache_many(built.items(), ctx=self.__dbcache_ctx)
+            found.update(built)
+        return found
+
+    @timed('signatures')
+    def build_lelesk_set(self, a_sid, debug_file=None):
         sid_obj = SynsetID.from_string(a_sid)
         if self.dbcache is not None:
             # try to fetch from DB then ...
             lelesk_tokens = self.dbcache.select(sid_obj, ctx=self.__dbcache_ctx)
-            if lelesk_tokens:
-                return lelesk_tokens
-        lelesk_tokens = []
-        ss = self.gwn.get_synset(a_sid, ctx=self.__gwn_ctx)
-        lelesk_tokens.extend(ss.get_tokens())
-        lelesk_tokens.extend(ss.get_gramwords())
-        # Retrieving tagged synsets
-        sscol = self.gwn.get_by_keys(ss.get_tags(), ctx=self.__gwn_ctx)
-        for s in sscol:
-            lelesk_tokens.extend(s.get_tokens())
-            lelesk_tokens.extend(s.get_gramwords())
-
-        # Get hypehypo information from WordNet 30 DB
-        ssids = self.wn.hypehypo(ss.ID, ctx=self.__wn_ctx)
-        # Get synsets from Gloss WordNet
-        sscol = self.gwn.get_synsets(ssids, ctx=self.__gwn_ctx)
-        # dump_synsets(ss)
-        for s in sscol:
-            lelesk_tokens.extend(s.get_tokens())
-            lelesk_tokens.extend(s.get_gramwords())
-
-        uniquified_lelesk_tokens = [w for w in uniquify(lelesk_tokens) if w not in self.stopwords]
+            if lelesk_tokens or self.frozen:
+                self.stats.count('signatures.hit')
+                return lelesk_tokens if lelesk_tokens else []
+        self.stats.count('signatures.miss')
+        uniquified_lelesk_tokens = self.build_lelesk_sets([sid_obj], debug_file=debug_file).get(sid_obj.to_canonical())
+        if uniquified_lelesk_tokens is None:
+            raise SynsetNotFoundException(a_sid)
         # try to cache this token list ...
         if self.dbcache:
             self.dbcache.cache(sid_obj, uniquified_lelesk_tokens)
         return uniquified_lelesk_tokens
 
+    def build_lelesk_sets(self, synsetids, debug_file=None):
+        """ Build LESK tokens of many synsets from WordNet with a few set-based queries.
+
+        Tokens of a synset are its lemmas and gloss words, and those of the synsets tagged in its glosses
+        and of its hypernyms & hyponyms, without stopwords.
+        Returns a dict of canonical synset ID => tokens (synsets which are not in Gloss WordNet are omitted)
+        """
+        sid_objs = [SynsetID.from_string(str(sid)) for sid in synsetids]
+        targets = {sid.to_gwnsql(): sid.to_canonical() for sid in sid_objs}
+        found = set()
+        for chunk in _chunks(targets):
+            found.update(row[0] for row in self.__gwn_execute('SELECT id FROM synset WHERE id IN ({})'.format(','.join('?' * len(chunk))), chunk))
+        # synsets tagged in glosses
+        tagged_keys = dd(set)  # GWN synset ID => lowercased sensekeys
+        for chunk in _chunks(found):
+            query = ('SELECT gloss.sid, sensetag.sk FROM sensetag JOIN gloss ON sensetag.gid = gloss.id '
+                     'WHERE gloss.sid IN ({})'.format(','.join('?' * len(chunk))))
+            for sid, sk in list(self.__gwn_execute(query, chunk)):
+                if sk:
+                    tagged_keys[sid].add(sk.lower())
+        sk_map = dd(set)  # lowercased sensekey => GWN synset IDs
+        for chunk in _chunks({sk for sks in tagged_keys.values() for sk in sks}):
+            # sensekeys are stored in lower case so sensekey_sensekey index can be used
+            for sid, sk in list(self.__gwn_execute('SELECT sid, sensekey FROM sensekey WHERE sensekey IN ({})'.format(','.join('?' * len(chunk))), chunk)):
+                sk_map[sk.lower()].add(sid)
+        related = dd(list)  # GWN synset ID => GWN IDs of tagged synsets, then hypernyms & hyponyms
+        for sid, sks in tagged_keys.items():
+            related[sid].extend(sorted(set().union(*(sk_map[sk] for sk in sks if sk in sk_map))))
+        # hypernyms & hyponyms from WordNet SQL
+        wnsql_ids = {SynsetID.from_string(sid).to_wnsql(): sid for sid in found}
+        hypehypo = dd(set)
+        for chunk in _chunks(wnsql_ids):
+            query = ('SELECT synset1id, synset2id FROM semlinks WHERE linkid IN (1,2,3,4,11,12,13,14,15,16,40,50,81) '
+                     'AND synset1id IN ({})'.format(','.join('?' * len(chunk))))
+            for sid1, sid2 in list(self.__wn_execute(query, chunk)):
+                hypehypo[wnsql_ids[str(sid1)]].add(SynsetID.from_string(str(sid2)).to_gwnsql())
+        for sid, sids in hypehypo.items():
+            related[sid].extend(sorted(sids))
+        # lemmas and gloss words of all involved synsets
+        own = self.__synset_words(found.union(*related.values()))
+        stopwords = self.stopwords
+        results = {}
+        for sid in found:
+            tokens = dict.fromkeys(own.get(sid, ()))
+            for rsid in related[sid]:
+                tokens.update(dict.fromkeys(own.get(rsid, ())))
+            results[targets[sid]] = [w for w in tokens if w not in stopwords]
+            if debug_file is not None:
+                debug_file.header("Synset: {}".format(targets[sid]))
+                debug_file.writeline("Tagged synsets & hypernyms & hyponyms: {}".format(related[sid]))
+                debug_file.writeline("Tokens: {}".format(results[targets[sid]]))
+        return results
+
+    def __synset_words(self, gwn_ids):
+        """ Get lemmas (and their parts) and gloss words of synsets (a dict of GWN synset ID => list of words) """
+        terms = dd(list)
+        gramwords = dd(list)
+        for chunk in _chunks(gwn_ids):
+            for sid, term in list(self.__gwn_execute('SELECT sid, term FROM term WHERE sid IN ({}) ORDER BY rowid'.format(','.join('?' * len(chunk))), chunk)):
+                terms[sid].append(term)
+            query = ('SELECT gloss.sid, glossitem.lemma, glossitem.cat FROM glossitem JOIN gloss ON glossitem.gid = gloss.id '
+                     'WHERE gloss.sid IN ({}) ORDER BY gloss.id, glossitem.id'.format(','.join('?' * len(chunk))))
+            for sid, lemma, cat in list(self.__gwn_execute(query, chunk)):
+                # same as GlossItem.get_gramwords(): prefer%2|preferred%3 => prefer, preferred
+                lemma = lemma.strip() if lemma else ''
+                if not lemma or (cat and cat.strip() == 'punc'):
+                    continue
+                gramwords[sid].extend(w for w in (token.split('%')[0] for token in lemma.split('|')) if w)
+        words = {}
+        for sid in gwn_ids:
+            lemmas = terms.get(sid, [])
+            words[sid] = lemmas + [part for l in lemmas if ' ' in l for part in l.split()] + gramwords.get(sid, [])
+        return words
+
     def prepare_data(self, sentence_text, remove_stop_words=True):
         """Given a sentence as a raw text string, perform tokenization, lemmatization
         """
@@ -176,38 +614,159 @@ class LeLeskWSD:
         else:
             return tokens
 
-    def lelesk_wsd(self, word, sentence_text='', expected_sense='', lemmatizing=True, pos=None, context=None, synsets=None, remove_stop_words=True, **kwargs):
+    def lelesk_wsd(self, word, sentence_text='', expected_sense='', lemmatizing=True, pos=None, context=None, synsets=None, remove_stop_words=True, top_k=None, **kwargs):
         """ Perform Word-sense disambiguation with extended simplified LESK and annotated WordNet 3.0
+        Only the top_k best candidates are returned when top_k is provided (see score_candidates())
         """
         # 1. Retrieve candidates for the given word
         if not synsets:
-            if (word, pos) not in self.candidates_cache:
-                self.candidates_cache[(word, pos)] = self.build_lelesk_for_word(word, pos=pos)
-            candidates = self.candidates_cache[(word, pos)]
+            candidates = self.build_lelesk_for_word(word, pos=pos)
         else:
             candidates = self.build_candidates(synsets)
 
         # 2. Calculate overlap between the context and each given word
         if not context:
             context = uniquify([x[2] for x in self.prepare_data(sentence_text, remove_stop_words=remove_stop_words)])
+        context_set = self.build_context_set(context, remove_stop_words=remove_stop_words)
+        overlap = self.context_overlap(context_set) if self.index is not None else None
+        context_ids = self.signatures.vocab.encode(context_set) if self.signatures is not None else None
 
+        logging.getLogger(__name__).info("candidate for {} => {}".format(word, list(c.synset for c in candidates)))
+        return self.score_candidates(candidates, context_set, overlap, context_ids, top_k=top_k)
+
+    def build_context_set(self, context, remove_stop_words=True):
+        """ Build the set of context tokens which candidates are scored against """
         if remove_stop_words:
-            context_set = set(x for x in context if self.stopwords and x not in self.stopwords)
+            return set(x for x in context if self.stopwords and x not in self.stopwords)
         else:
-            context_set = set(context)
-            
-        scores = []
+            return set(context)
 
-        logging.getLogger(__name__).info("candidate for {} => {}".format(word, list(c.synset for c in candidates)))
-        for candidate in candidates:
-            candidate_set = set(candidate.tokens)
-            score = len(context_set.intersection(candidate_set))
-            scores.append(ScoreTup(candidate, score, self.wn.get_tagcount(candidate.synset.ID.to_wnsql(), ctx=self.__wn_ctx)))
-            # scores.append([candidate, score, candidate.sense.tagcount])
+    @timed('scoring')
+    def score_candidates(self, candidates, context_set, overlap=None, context_ids=None, scored=None, top_k=None):
+        """ Score candidates against a context and rank them (see lelesk_wsd())
+
+        Arguments:
+            overlap     -- scores of indexed synsets (see context_overlap())
+            context_ids -- encoded context for scoring with signatures
+            scored      -- a dict of synset ID => (score, freq) to reuse scores between calls with the same context
+            top_k       -- only return the k best candidates (in the same order as a full ranking).
+                           Candidates whose signature is too small to reach the k-th best score are not scored.
+        """
+        if top_k is not None and top_k < len(candidates):
+            return self.__top_candidates(candidates, context_set, overlap, context_ids, scored, top_k)
+        scores = [ScoreTup(candidate, *self.__score_candidate(candidate, context_set, overlap, context_ids, scored)) for candidate in candidates]
         scores.sort(key=operator.itemgetter(1, 2))
         scores.reverse()
         return scores
 
+    def __score_candidate(self, candidate, context_set, overlap=None, context_ids=None, scored=None):
+        """ Get (score, freq) of a candidate """
+        sid = candidate.synset.ID
+        if scored is not None and sid in scored:
+            return scored[sid]
+        sno = self.index.lookup(sid) if overlap is not None else None
+        if sno is not None:
+            score = overlap[sno]
+        elif context_ids is not None and sid in self.signatures:
+            score = self.signatures.overlap(self.signatures.lookup(sid), context_ids)
+        else:
+            score = len(context_set.intersection(candidate.tokens))
+        freq = self.get_tagcount(sid)
+        if scored is not None:
+            scored[sid] = (score, freq)
+        return score, freq
+
+    def signature_size(self, candidate):
+        """ Number of LESK tokens of a candidate (an upper bound of its overlap score) """
+        if self.signatures is not None:
+            sno = self.signatures.lookup(candidate.synset.ID)
+            if sno is not None:
+                return self.signatures.offsets[sno + 1] - self.signatures.offsets[sno]
+        return len(candidate.tokens)
+
+    def __top_candidates(self, candidates, context_set, overlap, context_ids, scored, top_k):
+        """ Select the top_k best candidates with a bounded min-heap.
+        Candidates are visited from the largest signature, so the search stops as soon as
+        no remaining signature can reach the k-th best score.
+        Ties are broken by candidate position (later first) to keep the order of sort() + reverse()
+        """
+        if top_k <= 0:
+            return []
+        max_score = len(context_set)
+        bounds = sorted(((min(self.signature_size(c), max_score), idx) for idx, c in enumerate(candidates)), reverse=True)
+        heap = []  # (score, freq, position, candidate)
+        for bound, idx in bounds:
+            if len(heap) == top_k and bound < heap[0][0]:
+                break
+            candidate = candidates[idx]
+            score, freq = self.__score_candidate(candidate, context_set, overlap, context_ids, scored)
+            if len(heap) < top_k:
+                heapq.heappush(heap, (score, freq, idx, candidate))
+            else:
+                heapq.heappushpop(heap, (score, freq, idx, candidate))
+        heap.sort(key=operator.itemgetter(0, 1, 2), reverse=True)
+        return [ScoreTup(candidate, score, freq) for score, freq, _, candidate in heap]
+
+    def disambiguate_sentence(self, tokens, context, remove_stop_words=True, top_k=None):
+        """ Disambiguate all target words of a sentence against the same context in one pass.
+        The context representation is built once and each synset is scored at most once.
+
+        Arguments:
+            tokens  -- a list of (word, pos) to be disambiguated
+            context -- context tokens (e.g. all tokens and lemmas of the sentence)
+        Returns a list of ranked scores (same as lelesk_wsd()), one for each token
+        """
+        tokens = list(tokens)
+        context_set = self.build_context_set(context, remove_stop_words=remove_stop_words)
+        overlap = self.context_overlap(context_set) if self.index is not None else None
+        context_ids = self.signatures.vocab.encode(context_set) if self.signatures is not None else None
+        self.prefetch_candidates(tokens)
+        scored = {}
+        return [self.score_candidates(self.build_lelesk_for_word(word, pos=pos), context_set, overlap, context_ids, scored, top_k=top_k)
+                for word, pos in tokens]
+
+    def sparse_wsd(self, word, sentence_text='', expected_sense='', lemmatizing=True, pos=None, context=None, synsets=None, remove_stop_words=True, top_k=None, **kwargs):
+        """ Same as lelesk_wsd() but overlaps are computed as a sparse matrix product (see SparseSignatures).
+        Candidates are ranked exactly as lelesk_wsd() does.
+        """
+        if not synsets:
+            candidates = self.build_lelesk_for_word(word, pos=pos)
+        else:
+            candidates = self.build_candidates(synsets)
+        if not context:
+            context = uniquify([x[2] for x in self.prepare_data(sentence_text, remove_stop_words=remove_stop_words)])
+        context_set = self.build_context_set(context, remove_stop_words=remove_stop_words)
+        scored = self.matrix_scores([c.synset.ID for c in candidates], [context_set])[0]
+        return self.score_candidates(candidates, context_set, scored=scored, top_k=top_k)
+
+    def sparse_wsd_batch(self, sentences, remove_stop_words=True, top_k=None):
+        """ Disambiguate many sentences with a single sparse matrix product
+
+        Arguments:
+            sentences -- a list of (tokens, context), tokens is a list of (word, pos) to be disambiguated
+        Returns a list (one for each sentence) of lists of ranked scores (same as lelesk_wsd())
+        """
+        sentences = [(list(tokens), self.build_context_set(context, remove_stop_words=remove_stop_words)) for tokens, context in sentences]
+        self.prefetch_candidates(word for tokens, _ in sentences for word in tokens)
+        candidates = [[self.build_lelesk_for_word(word, pos=pos) for word, pos in tokens] for tokens, _ in sentences]
+        synsetids = uniquify([c.synset.ID for sent_candidates in candidates for word_candidates in sent_candidates for c in word_candidates])
+        all_scored = self.matrix_scores(synsetids, [context_set for _, context_set in sentences])
+        return [[self.score_candidates(word_candidates, context_set, scored=scored, top_k=top_k) for word_candidates in sent_candidates]
+                for (_, context_set), sent_candidates, scored in zip(sentences, candidates, all_scored)]
+
+    @timed('scoring')
+    def matrix_scores(self, synsetids, context_sets):
+        """ Score synsets against many contexts with the sparse signature matrix.
+        Returns a list of synset ID => (score, freq) (see score_candidates()), one for each context.
+        Synsets which are not in the matrix are left out.
+        """
+        if self.matrix is None:
+            self.load_matrix()
+        known = [sid for sid in synsetids if sid in self.matrix]
+        freqs = [self.get_tagcount(sid) for sid in known]
+        overlaps = self.matrix.overlap_batch(known, context_sets)
+        return [{sid: (row[idx], freq) for sid, freq, row in zip(known, freqs, overlaps)} for idx in range(len(context_sets))]
+
     def mfs_wsd(self, word, sentence_text, expected_sense='', lemmatizing=True, pos=None, synsets=None, **kwargs):
         """Perform Word-sense disambiguation with just most-frequent senses
         """
@@ -219,12 +778,13 @@ class LeLeskWSD:
             candidates.append(WSDCandidate(idx + 1, ss, []))
 
         scores = []
-        for candidate in candidates:
-            freq = self.wn.get_tagcount(candidate.synset.ID.to_wnsql(), ctx=self.__wn_ctx)
-            score = freq
-            scores.append(ScoreTup(candidate, score, freq))
-        scores.sort(key=operator.itemgetter(1))
-        scores.reverse()
+        with self.stats.stage('scoring'):
+            for candidate in candidates:
+                freq = self.get_tagcount(candidate.synset.ID)
+                score = freq
+                scores.append(ScoreTup(candidate, score, freq))
+            scores.sort(key=operator.itemgetter(1))
+            scores.reverse()
         return scores
 
 
@@ -255,11 +815,13 @@ class LeskCache:
         self.db_file = db_file if db_file else LLConfig.LELESK_CACHE_DB_LOC
         self.debug_dir = debug_dir if debug_dir else LLConfig.LELESK_CACHE_DEBUG_DIR
         self.db = LeskCacheSchema(self.db_file)
+        self.__schema_updated = False
+        self.__has_candidates = False
         # try to setup DB if needed
         if self.db_file is not None:
             # Create dir if needed
             logging.getLogger(__name__).info("LeskCache DB is located at {}".format(self.db_file))
-            if self.db_file != ':memory:':
+            if self.db_file != ':memory:' and os.path.dirname(self.db_file):
                 FileHelper.create_dir(os.path.dirname(self.db_file))
 
     def info(self):
@@ -278,6 +840,149 @@ class LeskCache:
             for token in tokens:
                 self.db.tokens.insert(str(synsetid), token, ctx=ctx)
 
+    def cache_many(self, items, ctx=None):
+        """ Cache LESK tokens of many synsets in a single transaction, items is an iterable of (synsetid, tokens) """
+        if ctx is None:
+            with self.db.ctx() as ctx:
+                return self.cache_many(items, ctx=ctx)
+        items = [(str(synsetid), tokens) for synsetid, tokens in items]
+        ctx.cur.executemany('DELETE FROM tokens WHERE synsetid=?', [(synsetid,) for synsetid, _ in items])
+        ctx.cur.executemany('INSERT INTO tokens (synsetid, token) VALUES (?, ?)',
+                            ((synsetid, token) for synsetid, tokens in items for token in tokens))
+        ctx.commit()
+
+    def build_index(self, ctx=None):
+        """ Build an inverted index (token => synset IDs) from all cached tokens """
+        index = InvertedIndex()
+        if ctx is None:
+            with self.db.ctx() as ctx:
+                return self.build_index(ctx=ctx)
+        rows = ctx.execute('SELECT synsetid, token FROM tokens ORDER BY synsetid')
+        for synsetid, group in groupby(rows, key=operator.itemgetter(0)):
+            index.add(SynsetID.from_string(synsetid).to_canonical(), (row[1] for row in group))
+        logging.getLogger(__name__).info("Indexed {} synsets ({} tokens)".format(len(index), len(index.postings)))
+        return index
+
+    def export(self, path, wn=None, ctx=None):
+        """ Export all cached signatures (and tag counts from WordNet SQL if provided)
+        to a read-only signature file (see SignatureFile) """
+        store = self.build_signatures(ctx=ctx)
+        tagcounts = read_tagcounts(wn) if wn is not None else None
+        write_signature_file(path, store, tagcounts)
+        return store
+
+    def cache_tagcounts(self, tagcounts, ctx=None):
+        """ Store tag counts (TagCounts) in the freq column of the synset table """
+        if ctx is None:
+            with self.db.ctx() as ctx:
+                return self.cache_tagcounts(tagcounts, ctx=ctx)
+        rows = []
+        for synsetid, freq in tagcounts.items():
+            sid = SynsetID.from_string(synsetid)
+            rows.append((sid.to_canonical(), sid.offset, sid.pos, sid.to_gwnsql(), freq))
+        ctx.cur.execute('DELETE FROM synset')
+        ctx.cur.executemany('INSERT INTO synset (synsetid, offset, pos, synsetid_gwn, freq) VALUES (?, ?, ?, ?, ?)', rows)
+        ctx.commit()
+
+    def load_tagcounts(self, ctx=None):
+        """ Load tag counts cached by cache_tagcounts() (None if they were not cached) """
+        if ctx is None:
+            with self.db.ctx() as ctx:
+                return self.load_tagcounts(ctx=ctx)
+        tagcounts = TagCounts()
+        for synsetid, freq in ctx.execute('SELECT synsetid, freq FROM synset'):
+            tagcounts.add(synsetid, int(freq) if freq is not None else None)
+        return tagcounts if tagcounts else None
+
+    def update_schema(self, ctx):
+        """ Create tables and indexes which are missing in caches created by older versions """
+        ctx.cur.executescript(self.db.ds.read_file(LLConfig.LELESK_CACHE_DB_INIT_SCRIPT))
+        self.__schema_updated = True
+        self.__has_candidates = True
+
+    def has_candidates(self, ctx):
+        """ Check if the candidates table exists (caches created by older versions do not have it,
+        and reading them must not change the DB file)
+        """
+        if not self.__has_candidates:
+            query = "SELECT count(*) FROM sqlite_master WHERE type = 'table' AND name = 'candidates'"
+            self.__has_candidates = ctx.execute(query).fetchone()[0] > 0
+        return self.__has_candidates
+
+    def select_candidates(self, lemma, pos, ctx=None):
+        """ Get cached synset IDs of a (lemma, pos) (None if they were not cached) """
+        return self.select_candidates_many([(lemma, pos)], ctx=ctx).get((lemma, pos))
+
+    def select_candidates_many(self, words, ctx=None):
+        """ Get cached synset IDs of many (lemma, pos) pairs.
+        Returns a dict of (lemma, pos) => list of synset IDs (pairs which are not cached are omitted)
+        """
+        if ctx is None:
+            with self.db.ctx() as ctx:
+                return self.select_candidates_many(words, ctx=ctx)
+        if not self.has_candidates(ctx):
+            return {}  # nothing was cached
+        wanted = dd(list)  # (lemma, pos as stored) => requested (lemma, pos) pairs
+        for lemma, pos in words:
+            wanted[(lemma, pos or '')].append((lemma, pos))
+        results = {}
+        for chunk in _chunks({lemma for lemma, _ in wanted}):
+            query = 'SELECT lemma, pos, synsetids FROM candidates WHERE lemma IN ({})'.format(','.join('?' * len(chunk)))
+            for lemma, pos, synsetids in ctx.execute(query, chunk):
+                for key in wanted.get((lemma, pos), ()):
+                    results[key] = synsetids.split()
+        return results
+
+    def clear_candidates(self, ctx=None):
+        """ Remove all stored (lemma, pos) => synset IDs """
+        if ctx is None:
+            with self.db.ctx() as ctx:
+                return self.clear_candidates(ctx=ctx)
+        self.update_schema(ctx)
+        ctx.execute('DELETE FROM candidates')
+        ctx.commit()
+
+    def cache_candidates(self, lemma, pos, synsetids, ctx=None):
+        """ Store synset IDs found for a (lemma, pos) """
+        self.cache_candidates_many([((lemma, pos), synsetids)], ctx=ctx)
+
+    def cache_candidates_many(self, items, ctx=None):
+        """ Store synset IDs of many words, items is an iterable of ((lemma, pos), synset IDs) """
+        if ctx is None:
+            with self.db.ctx() as ctx:
+                return self.cache_candidates_many(items, ctx=ctx)
+        if not self.__schema_updated:
+            self.update_schema(ctx)
+        rows = [(lemma, pos or '', ' '.join(str(sid) for sid in synsetids)) for (lemma, pos), synsetids in items]
+        ctx.cur.executemany('INSERT OR REPLACE INTO candidates (lemma, pos, synsetids) VALUES (?, ?, ?)', rows)
+        ctx.commit()
+
+    def build_vocab(self, ctx=None):
+        """ Assign an integer ID to every cached token (vocab table) and return the vocabulary """
+        if ctx is None:
+            with self.db.ctx() as ctx:
+                return self.build_vocab(ctx=ctx)
+        self.update_schema(ctx)
+        ctx.execute('INSERT OR IGNORE INTO vocab (token) SELECT DISTINCT token FROM tokens')
+        vocab = Vocabulary()
+        for tid, token in ctx.execute('SELECT id, token FROM vocab'):
+            vocab.add(token, tid)
+        return vocab
+
+    def build_signatures(self, ctx=None):
+        """ Pack all cached tokens into a SignatureStore of sorted token IDs """
+        if ctx is None:
+            with self.db.ctx() as ctx:
+                return self.build_signatures(ctx=ctx)
+        store = SignatureStore(self.build_vocab(ctx=ctx))
+        rows = ctx.execute('SELECT tokens.synsetid, vocab.id FROM tokens JOIN vocab ON tokens.token = vocab.token '
+                           'ORDER BY tokens.synsetid, vocab.id')
+        for synsetid, group in groupby(rows, key=operator.itemgetter(0)):
+            token_ids = sorted({row[1] for row in group})
+            store.add_ids(SynsetID.from_string(synsetid).to_canonical(), token_ids)
+        logging.getLogger(__name__).info("Loaded {} signatures ({} bytes)".format(len(store), store.nbytes))
+        return store
+
     def select(self, synsetid, ctx=None):
         result = self.db.tokens.select('synsetid=?', (str(synsetid),), ctx=ctx)
         if result:
@@ -285,6 +990,20 @@ class LeskCache:
         else:
             return None
 
+    def select_many(self, synsetids, ctx=None):
+        """ Select cached tokens of many synsets with batched queries.
+        Returns a dict of synset ID => tokens (synsets which are not cached are omitted)
+        """
+        if ctx is None:
+            with self.db.ctx() as ctx:
+                return self.select_many(synsetids, ctx=ctx)
+        results = dd(list)
+        for chunk in _chunks(str(sid) for sid in synsetids):
+            query = 'SELECT synsetid, token FROM tokens WHERE synsetid IN ({}) ORDER BY rowid'.format(','.join('?' * len(chunk)))
+            for synsetid, token in ctx.execute(query, chunk):
+                results[synsetid].append(token)
+        return dict(results)
+
     def validate(self):
         gwn = self.wsd.gwn
         wn = self.wsd.wn
@@ -377,13 +1096,162 @@ class LeskCache:
                 c.count("WN30 Found")
         c.summarise()
 
-    def generate(self):
-        synsets = self.wsd.gwn.all_synsets(deep_select=False)
-        with self.db.ds.open() as ctx:
-            total_synsets = len(synsets)
-            for idx, synset in enumerate(synsets):
-                logging.getLogger(__name__).info("Generating tokens for %s (%s/%s)" % (synset.id, idx, total_synsets))
-                debug_file = TextReport(os.path.join(self.debug_dir, synset.offset + '.txt'))
-                tokens = self.wsd.build_lelesk_set(synset.id, debug_file)
-                for token in tokens:
-                    self.db.tokens.insert(synset.id, token, ctx=ctx)
+    def all_synsetids(self):
+        """ Get IDs of all synsets in Gloss WordNet """
+        with self.wsd.gwn.ctx() as ctx:
+            return [SynsetID.from_string(row[0]).to_canonical() for row in ctx.select('SELECT id FROM synset')]
+
+    def source_hashes(self):
+        """ Compute a hash of the Gloss WordNet & WordNet SQL data which LESK tokens of each synset are built from.
+
+        Returns a dict of synset ID => hash
+        """
+        own = dd(list)      # GWN synset ID => data of the synset itself
+        deps = dd(set)      # GWN synset ID => GWN IDs of tagged synsets, hypernyms & hyponyms
+        tagged = dd(set)    # GWN synset ID => tagged sensekeys
+        sk_map = dd(set)
+        with self.wsd.gwn.ctx() as ctx:
+            gwn_ids = [row[0] for row in ctx.execute('SELECT id FROM synset')]
+            for sid, term in ctx.execute('SELECT sid, term FROM term'):
+                own[sid].append('t|{}'.format(term))
+            for sid, lemma, cat in ctx.execute('SELECT gloss.sid, glossitem.lemma, glossitem.cat FROM glossitem JOIN gloss ON glossitem.gid = gloss.id'):
+                own[sid].append('g|{}|{}'.format(lemma, cat))
+            for sid, sk in ctx.execute('SELECT gloss.sid, sensetag.sk FROM sensetag JOIN gloss ON sensetag.gid = gloss.id'):
+                if sk:
+                    tagged[sid].add(sk.lower())
+            for sid, sk in ctx.execute('SELECT sid, sensekey FROM sensekey'):
+                sk_map[sk.lower()].add(sid)
+        for sid, sks in tagged.items():
+            deps[sid].update(*(sk_map[sk] for sk in sks if sk in sk_map))
+        with self.wsd.wn.ctx() as ctx:
+            gwn_sid = {}
+            for sid1, sid2 in ctx.execute('SELECT synset1id, synset2id FROM semlinks WHERE linkid IN (1,2,3,4,11,12,13,14,15,16,40,50,81)'):
+                for sid in (sid1, sid2):
+                    if sid not in gwn_sid:
+                        gwn_sid[sid] = SynsetID.from_string(str(sid)).to_gwnsql()
+                deps[gwn_sid[sid1]].add(gwn_sid[sid2])
+        own_hashes = {sid: hashlib.sha1('\n'.join(sorted(own[sid])).encode('utf-8')).hexdigest() for sid in gwn_ids}
+        salt = '\n'.join(sorted(set(self.wsd.stopwords)))
+        hashes = {}
+        for sid in gwn_ids:
+            content = [salt, own_hashes[sid]]
+            content.extend(own_hashes.get(dep, dep) for dep in sorted(deps[sid]))
+            hashes[SynsetID.from_string(sid).to_canonical()] = hashlib.sha1('\n'.join(content).encode('utf-8')).hexdigest()
+        return hashes
+
+    def generated(self, ctx=None):
+        """ Get synsets generated by generate() (a dict of synset ID => source hash) """
+        if ctx is None:
+            with self.db.ctx() as ctx:
+                return self.generated(ctx=ctx)
+        self.update_schema(ctx)
+        return {sid: h for sid, h in ctx.execute('SELECT synsetid, hash FROM generated')}
+
+    def generate(self, jobs=1, debug=False, batch_size=1000, force=False):
+        """ Pre-generate LESK tokens for all synsets
+
+        Generation is resumable: every batch is committed together with the source hash
+        of its synsets, synsets which are generated and whose source data have not changed
+        since are skipped.
+
+        Arguments:
+            jobs       -- Number of worker processes used to build LESK tokens
+            debug      -- Write details of how tokens are generated to debug_dir
+            batch_size -- Number of synsets to be written in a single transaction
+            force      -- Regenerate all synsets
+        """
+        t = Timer()
+        t.start("Computing source hashes")
+        hashes = self.source_hashes()
+        t.stop("Computed source hashes of {} synsets".format(len(hashes)))
+        generated = self.generated()
+        synsetids = sorted(sid for sid, h in hashes.items() if force or generated.get(sid) != h)
+        stale = [sid for sid in generated if sid not in hashes]
+        if stale:
+            logging.getLogger(__name__).info("Removing {} synsets which are no longer in WordNet".format(len(stale)))
+            with self.db.ctx() as ctx:
+                ctx.cur.executemany('DELETE FROM tokens WHERE synsetid=?', [(sid,) for sid in stale])
+                ctx.cur.executemany('DELETE FROM generated WHERE synsetid=?', [(sid,) for sid in stale])
+                ctx.commit()
+        if synsetids or stale:
+            # WordNet data have changed, stored candidates may be outdated
+            self.clear_candidates()
+        total_synsets = len(synsetids)
+        print("Generating tokens for {} synsets ({} synsets are up-to-date)".format(total_synsets, len(hashes) - total_synsets))
+        debug_dir = self.debug_dir if debug else None
+        if debug_dir:
+            FileHelper.create_dir(debug_dir)
+        batches = [synsetids[i:i + batch_size] for i in range(0, total_synsets, batch_size)]
+        t.start("Generating tokens for {} synsets (jobs={})".format(total_synsets, jobs))
+        if jobs and jobs > 1:
+            with multiprocessing.Pool(jobs, initializer=_init_generate_worker, initargs=(self.wsd.wng_db_loc, self.wsd.wn30_loc, debug_dir, self.wsd.stopwords)) as pool:
+                self.bulk_insert(pool.imap_unordered(_generate_batch, batches), total_synsets, hashes=hashes)
+        else:
+            # tokens must be built from WordNet, not read back from a cache
+            wsd = LeLeskWSD(self.wsd.wng_db_loc, self.wsd.wn30_loc)
+            wsd.stopwords = self.wsd.stopwords
+            wsd.connect(readonly=True)
+            try:
+                self.bulk_insert((_build_batch(wsd, batch, debug_dir) for batch in batches), total_synsets, hashes=hashes)
+            finally:
+                wsd.disconnect()
+        t.stop("Generated tokens for {} synsets".format(total_synsets))
+        self.cache_tagcounts(read_tagcounts(self.wsd.wn))
+
+    def bulk_insert(self, batches, total_synsets=None, hashes=None):
+        """ Write batches of (synsetid, tokens) into the tokens table, replacing existing tokens.
+
+        Each batch is committed in a single transaction together with its checkpoint
+        (synset IDs and source hashes in the generated table) when hashes are provided.
+        When the cache is empty, indexes are dropped during the load and rebuilt afterward.
+        """
+        with self.db.ds.open(auto_commit=False) as ctx:
+            self.update_schema(ctx)
+            fresh = ctx.select_single('SELECT 1 FROM tokens LIMIT 1') is None
+            if fresh:
+                ctx.cur.execute('DROP INDEX IF EXISTS tokens_synsetid')
+            done = 0
+            for batch in batches:
+                if not fresh:
+                    ctx.cur.executemany('DELETE FROM tokens WHERE synsetid=?', [(synsetid,) for synsetid, _ in batch])
+                ctx.cur.executemany('INSERT INTO tokens (synsetid, token) VALUES (?, ?)',
+                                    ((synsetid, token) for synsetid, tokens in batch for token in tokens))
+                if hashes is not None:
+                    ctx.cur.executemany('INSERT OR REPLACE INTO generated (synsetid, hash) VALUES (?, ?)',
+                                        [(synsetid, hashes.get(synsetid)) for synsetid, _ in batch])
+                ctx.commit()
+                done += len(batch)
+                logging.getLogger(__name__).info("Generated tokens for {}/{} synsets".format(done, total_synsets))
+            if fresh:
+                ctx.cur.execute('CREATE INDEX IF NOT EXISTS tokens_synsetid ON tokens (synsetid)')
+                ctx.commit()
+
+
+def _build_batch(wsd, synsetids, debug_dir=None):
+    """ Build LESK tokens for a batch of synsets, returns a list of (synsetid, tokens) """
+    if not debug_dir:
+        tokens = wsd.build_lelesk_sets(synsetids)
+        return [(synsetid, tokens[synsetid]) for synsetid in synsetids]
+    results = []
+    for synsetid in synsetids:
+        with TextReport(os.path.join(debug_dir, synsetid + '.txt')) as debug_file:
+            tokens = wsd.build_lelesk_set(synsetid, debug_file)
+        results.append((synsetid, tokens))
+    return results
+
+
+# LeLeskWSD object of a LeskCache.generate() worker process
+_worker_wsd = None
+_worker_debug_dir = None
+
+
+def _init_generate_worker(wng_db_loc, wn30_loc, debug_dir, stopwords):
+    global _worker_wsd, _worker_debug_dir
+    _worker_wsd = LeLeskWSD(wng_db_loc, wn30_loc)
+    _worker_wsd.stopwords = stopwords
+    _worker_wsd.connect(readonly=True)
+    _worker_debug_dir = debug_dir
+
+
+def _generate_batch(synsetids):
+    return _build_batch(_worker_wsd, synsetids, _worker_debug_dir)
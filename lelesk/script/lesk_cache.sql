@@ -30,6 +30,26 @@ CREATE TABLE IF NOT EXISTS tokens  (
    ,token    TEXT
 );
 
+-- generated: synsetid hash (synsets generated by LeskCache.generate and hash of their source data)
+CREATE TABLE IF NOT EXISTS generated  (
+    synsetid TEXT PRIMARY KEY
+   ,hash     TEXT
+);
+
+-- candidates: lemma pos synsetids (space separated synset IDs found by LeLeskWSD.smart_synset_search, in order)
+CREATE TABLE IF NOT EXISTS candidates  (
+    lemma     TEXT
+   ,pos       TEXT
+   ,synsetids TEXT
+   ,PRIMARY KEY (lemma, pos)
+);
+
+-- vocab: id token
+CREATE TABLE IF NOT EXISTS vocab  (
+    id       INTEGER PRIMARY KEY
+   ,token    TEXT UNIQUE
+);
+
 
 
 CREATE INDEX IF NOT EXISTS tokens_synsetid ON tokens (synsetid);
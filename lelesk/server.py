@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+WSD server: keep a warm LeLeskWSD object behind a local HTTP endpoint (TCP or Unix socket)
+
+Endpoints (requests and responses are JSON):
+    GET  /status  -- server information and cache statistics
+    POST /wsd     -- {"sentences": [text or TTL sentence JSON, ...], "method": ..., "notag": ..., "nolemmatize": ..., "keep_tags": ...}
+    POST /cand    -- same as /wsd but only sense candidates are added
+Both POST endpoints return {"sentences": [TTL sentence JSON, ...]}
+"""
+
+# This code is a part of lelesk library: https://github.com/letuananh/lelesk
+# :copyright: (c) 2014 Le Tuan Anh <tuananh.ke@gmail.com>
+# :license: MIT, see LICENSE for more details.
+
+import os
+import json
+import stat
+import time
+import errno
+import socket
+import logging
+import socketserver
+import http.client
+from types import SimpleNamespace
+from http.server import HTTPServer, BaseHTTPRequestHandler
+
+from texttaglib.chirptext import ttl
+
+from . import __version__
+from .wsdtk import wsd_sents, build_wsd_object, iter_chunks, DEFAULT_CHUNK_SIZE
+
+# -----------------------------------------------------------------------
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+WSD_METHODS = ('lesk', 'lelesk', 'mfs', 'sparse')
+REQUEST_OPTIONS = ('method', 'notag', 'nolemmatize', 'keep_tags')  # per-request options (same as CLI arguments)
+
+
+def getLogger():
+    return logging.getLogger(__name__)
+
+
+def parse_address(address):
+    ''' Parse a server address
+        host:port, http://host:port or a port number => ('tcp', (host, port))
+        unix:path or a path to a socket file         => ('unix', path)
+    '''
+    address = str(address)
+    if address.startswith('unix:'):
+        return 'unix', address[len('unix:'):]
+    elif address.startswith('/') or address.startswith('.'):
+        return 'unix', address
+    if address.startswith('http://'):
+        address = address[len('http://'):].rstrip('/')
+    host, _, port = address.rpartition(':')
+    return 'tcp', (host or DEFAULT_HOST, int(port) if port else DEFAULT_PORT)
+
+
+class WSDService:
+    ''' Disambiguate sentences of WSD requests with a single warm LeLeskWSD object '''
+
+    def __init__(self, args, wsd=None):
+        self.args = args
+        self.wsd = wsd if wsd is not None else build_wsd_object(None, args)
+        self.cli = SimpleNamespace(logger=getLogger())
+        self.started = time.time()
+        self.requests = 0
+        self.sentences = 0
+
+    def warm_up(self):
+        ''' Open databases and load stopwords and NLTK models before the first request '''
+        self.wsd.connect()
+        self.wsd.warm_up()
+        return self
+
+    def request_args(self, options):
+        ''' Build WSD arguments for a request (server arguments + request options) '''
+        args = SimpleNamespace(**vars(self.args))
+        for key in REQUEST_OPTIONS:
+            if options.get(key) is not None:
+                setattr(args, key, options[key])
+        if args.method and args.method.lower() not in WSD_METHODS:
+            raise ValueError("Unknown WSD method: {}".format(args.method))
+        if args.method and args.method.lower() == 'sparse' and self.wsd.matrix is None:
+            self.wsd.load_matrix()
+        return args
+
+    def process(self, request, candidates_only=False):
+        ''' Process a WSD request (a dict), returns a response (a dict) '''
+        items = request.get('sentences')
+        if not isinstance(items, list):
+            raise ValueError("sentences (a list of texts or TTL sentences) is required")
+        args = self.request_args(request)
+        sents = [ttl.Sentence(text=item) if isinstance(item, str) else ttl.Sentence.from_json(item) for item in items]
+        results = [sent.to_json() for sent in wsd_sents(sents, self.cli, args, self.wsd, candidates_only, chunk_size=len(sents) or 1)]
+        self.requests += 1
+        self.sentences += len(results)
+        return {'sentences': results}
+
+    def status(self):
+        return {'lelesk': __version__,
+                'uptime': time.time() - self.started,
+                'requests': self.requests,
+                'sentences': self.sentences,
+                'method': self.args.method,
+                'cache': self.wsd.cache_stats()}
+
+
+class WSDRequestHandler(BaseHTTPRequestHandler):
+    ''' HTTP handler of WSD requests (see module docstring) '''
+
+    def log_message(self, format, *args):
+        getLogger().debug(format % args)
+
+    def reply(self, code, response):
+        body = json.dumps(response).encode('utf-8')
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path.rstrip('/') == '/status':
+            self.reply(200, self.server.service.status())
+        else:
+            self.reply(404, {'error': 'Unknown endpoint {}'.format(self.path)})
+
+    def do_POST(self):
+        path = self.path.rstrip('/')
+        if path not in ('/wsd', '/cand'):
+            self.reply(404, {'error': 'Unknown endpoint {}'.format(self.path)})
+            return
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            request = json.loads(self.rfile.read(length).decode('utf-8'))
+            if not isinstance(request, dict):
+                raise ValueError("A WSD request must be a JSON object")
+        except ValueError as e:
+            self.reply(400, {'error': 'Invalid request ({})'.format(e)})
+            return
+        try:
+            response = self.server.service.process(request, candidates_only=(path == '/cand'))
+        except ValueError as e:
+            self.reply(400, {'error': str(e)})
+        except Exception as e:
+            getLogger().exception("WSD request failed")
+            self.reply(500, {'error': '{}: {}'.format(type(e).__name__, e)})
+        else:
+            self.reply(200, response)
+
+
+class WSDHTTPServer(HTTPServer):
+    ''' WSD server on a TCP port (requests are processed one at a time) '''
+
+    def __init__(self, service, address):
+        self.service = service
+        super().__init__(address, WSDRequestHandler)
+
+    @property
+    def address(self):
+        return '{}:{}'.format(*self.server_address[:2])
+
+
+class WSDUnixServer(socketserver.UnixStreamServer):
+    ''' WSD server on a Unix socket (requests are processed one at a time) '''
+
+    def __init__(self, service, path):
+        self.service = service
+        self.socket_id = None
+        remove_stale_socket(path)
+        super().__init__(path, WSDRequestHandler)
+        st = os.lstat(path)
+        self.socket_id = (st.st_dev, st.st_ino)
+
+    @property
+    def address(self):
+        return 'unix:{}'.format(self.server_address)
+
+    def get_request(self):
+        request, _ = super().get_request()
+        return request, ('unix', 0)  # BaseHTTPRequestHandler expects a (host, port) client address
+
+    def server_close(self):
+        super().server_close()
+        # only remove the socket which was created by this server
+        try:
+            st = os.lstat(self.server_address)
+        except FileNotFoundError:
+            return
+        if self.socket_id == (st.st_dev, st.st_ino):
+            os.remove(self.server_address)
+
+
+def remove_stale_socket(path):
+    ''' Remove a socket left by a stopped server at path.
+    OSError is raised if path is not a socket or another server is listening on it
+    '''
+    try:
+        st = os.lstat(path)
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(st.st_mode):
+        raise FileExistsError(errno.EEXIST, "Cannot create a Unix socket, file exists and is not a socket", path)
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(path)
+        except ConnectionRefusedError:
+            os.remove(path)
+            return
+    raise OSError(errno.EADDRINUSE, "Another server is listening on this Unix socket", path)
+
+
+def make_server(service, address):
+    ''' Create a WSD server (WSDHTTPServer or WSDUnixServer) from an address (see parse_address()) '''
+    kind, addr = parse_address(address)
+    if kind == 'unix':
+        return WSDUnixServer(service, addr)
+    return WSDHTTPServer(service, addr)
+
+
+# -----------------------------------------------------------------------
+# Client
+# -----------------------------------------------------------------------
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+
+    def __init__(self, path, timeout=None):
+        super().__init__('localhost', timeout=timeout)
+        self.path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        if self.timeout is not None:
+            self.sock.settimeout(self.timeout)
+        self.sock.connect(self.path)
+
+
+class WSDClient:
+    ''' Thin client of a WSD server (lelesk serve) '''
+
+    def __init__(self, address, timeout=None):
+        self.address = address
+        self.timeout = timeout
+        self.kind, self.addr = parse_address(address)
+
+    def connection(self):
+        if self.kind == 'unix':
+            return UnixHTTPConnection(self.addr, timeout=self.timeout)
+        return http.client.HTTPConnection(*self.addr, timeout=self.timeout)
+
+    def request(self, method, path, payload=None):
+        conn = self.connection()
+        try:
+            body = json.dumps(payload).encode('utf-8') if payload is not None else None
+            conn.request(method, path, body=body, headers={'Content-Type': 'application/json'})
+            response = conn.getresponse()
+            result = json.loads(response.read().decode('utf-8'))
+        finally:
+            conn.close()
+        if response.status != 200:
+            raise ValueError("WSD server error ({}): {}".format(response.status, result.get('error')))
+        return result
+
+    def status(self):
+        return self.request('GET', '/status')
+
+    def wsd(self, sents, candidates_only=False, **options):
+        ''' Disambiguate (or find sense candidates of) sentences (texts or ttl.Sentence objects),
+        returns a list of ttl.Sentence objects
+        '''
+        payload = {key: value for key, value in options.items() if key in REQUEST_OPTIONS}
+        payload['sentences'] = [sent if isinstance(sent, str) else sent.to_json() for sent in sents]
+        result = self.request('POST', '/cand' if candidates_only else '/wsd', payload)
+        return [ttl.Sentence.from_json(sent_json) for sent_json in result['sentences']]
+
+    def wsd_sents(self, sents, candidates_only=False, chunk_size=DEFAULT_CHUNK_SIZE, **options):
+        ''' Send a stream of sentences to the server chunk by chunk, sentences are yielded in their original order '''
+        for chunk in iter_chunks(sents, chunk_size):
+            yield from self.wsd(chunk, candidates_only=candidates_only, **options)
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Read-only LESK signature file which can be memory-mapped and shared by many WSD processes
+"""
+
+# This code is a part of lelesk library: https://github.com/letuananh/lelesk
+# :copyright: (c) 2014 Le Tuan Anh <tuananh.ke@gmail.com>
+# :license: MIT, see LICENSE for more details.
+
+import os
+import sys
+import mmap
+import struct
+import logging
+from array import array
+
+from .index import SignatureStore, TagCounts
+
+# -----------------------------------------------------------------------
+# File layout
+#
+# The header is packed little-endian (see HEADER). All other integers are unsigned 32-bit
+# in the native byte order of the writer, which is recorded in the header and checked on load.
+#
+#   header        : magic, version, byte order, #synsets, #tokens, #token IDs
+#   synset IDs    : #synsets canonical synset IDs (10 ASCII bytes each, sorted)
+#   sig offsets   : #synsets + 1 offsets into token IDs
+#   tag counts    : #synsets tag counts (NO_TAGCOUNT when not available)
+#   token IDs     : sorted token IDs of each synset
+#   vocab offsets : #tokens + 1 offsets into vocab blob
+#   vocab blob    : UTF-8 tokens, sorted (token ID = position in this list)
+# -----------------------------------------------------------------------
+
+MAGIC = b'LLSIG'
+VERSION = 1
+HEADER = struct.Struct('<5sBcxIII')
+SID_SIZE = 10
+NO_TAGCOUNT = TagCounts.NA
+
+
+def getLogger():
+    return logging.getLogger(__name__)
+
+
+def _pad(size):
+    return (4 - size % 4) % 4
+
+
+def _search(count, key, get_item):
+    """ Binary search on a sorted sequence of bytes, return the index of key or None """
+    lo, hi = 0, count
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if get_item(mid) < key:
+            lo = mid + 1
+        else:
+            hi = mid
+    if lo < count and get_item(lo) == key:
+        return lo
+    return None
+
+
+def write_signature_file(path, store, tagcounts=None):
+    """ Write a SignatureStore (and optionally tag counts, see TagCounts) to a signature file """
+    with open(path, 'wb') as outfile:
+        write_signatures(outfile, store, tagcounts)
+    getLogger().info("Wrote {} signatures ({} tokens) to {}".format(len(store), len(store.vocab), path))
+
+
+def write_signatures(outfile, store, tagcounts=None):
+    """ Write a SignatureStore (and optionally tag counts) in signature file format to an open binary file """
+    tagcounts = tagcounts if tagcounts is not None else {}
+    # renumber tokens so that token IDs follow the sorted vocab order
+    tokens = sorted(store.vocab.token_map, key=lambda t: t.encode('utf-8'))
+    id_map = {store.vocab.get(t): idx for idx, t in enumerate(tokens)}
+    vocab_blob = bytearray()
+    vocab_offsets = array('I', [0])
+    for token in tokens:
+        vocab_blob.extend(token.encode('utf-8'))
+        vocab_offsets.append(len(vocab_blob))
+    synsetids = sorted(store.synsetids)
+    sids = bytearray()
+    sig_offsets = array('I', [0])
+    counts = array('I')
+    data = array('I')
+    for synsetid in synsetids:
+        encoded_sid = synsetid.encode('ascii')
+        if len(encoded_sid) != SID_SIZE:
+            raise ValueError("Invalid synset ID ({})".format(synsetid))
+        sids.extend(encoded_sid)
+        data.extend(sorted(id_map[tid] for tid in store.token_ids(store.lookup(synsetid))))
+        sig_offsets.append(len(data))
+        tagcount = tagcounts.get(synsetid)
+        counts.append(NO_TAGCOUNT if tagcount is None else tagcount)
+    outfile.write(HEADER.pack(MAGIC, VERSION, sys.byteorder[0].encode('ascii'), len(synsetids), len(tokens), len(data)))
+    outfile.write(sids)
+    outfile.write(bytes(_pad(len(sids))))
+    for arr in (sig_offsets, counts, data, vocab_offsets):
+        outfile.write(arr.tobytes())
+    outfile.write(vocab_blob)
+
+
+class MappedVocabulary:
+    """ Read-only vocabulary backed by a signature file.
+    Tokens are looked up with binary search so no dictionary has to be built.
+    """
+    def __init__(self, buf, offsets, blob_start):
+        self.buf = buf
+        self.offsets = offsets
+        self.blob_start = blob_start
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __contains__(self, token):
+        return self.get(token) is not None
+
+    def _token_bytes(self, tid):
+        return self.buf[self.blob_start + self.offsets[tid]:self.blob_start + self.offsets[tid + 1]]
+
+    def get(self, token, default=None):
+        tid = _search(len(self), token.encode('utf-8'), self._token_bytes)
+        return default if tid is None else tid
+
+    def encode(self, tokens):
+        """ Convert tokens to a sorted array of unique token IDs (unknown tokens are ignored) """
+        ids = (self.get(t) for t in set(tokens))
+        return array('I', sorted(tid for tid in ids if tid is not None))
+
+    def decode(self, token_ids):
+        return [self._token_bytes(tid).decode('utf-8') for tid in token_ids]
+
+
+class SignatureFile(SignatureStore):
+    """ Memory-mapped signature file
+
+    It can be used as a (read-only) replacement for LeskCache and SignatureStore.
+    Processes which open the same file share its pages through the OS page cache.
+    Signatures can be embedded in a larger file (e.g. a FrozenModel) starting at offset.
+    """
+    def __init__(self, path, offset=0):
+        self.path = path
+        with open(path, 'rb') as infile:
+            self.buf = mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, byteorder, n_synsets, n_tokens, n_data = HEADER.unpack_from(self.buf, offset)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("{} is not a valid signature file (version {})".format(path, VERSION))
+        if byteorder.decode('ascii') != sys.byteorder[0]:
+            raise ValueError("Signature file {} was created on a machine with a different byte order".format(path))
+        self.n_synsets = n_synsets
+        pos = offset + HEADER.size
+        self.sid_start = pos
+        pos += n_synsets * SID_SIZE
+        pos += _pad(n_synsets * SID_SIZE)
+        view = memoryview(self.buf)
+        self.offsets, pos = self._uint_view(view, pos, n_synsets + 1)
+        self.counts, pos = self._uint_view(view, pos, n_synsets)
+        self.data, pos = self._uint_view(view, pos, n_data)
+        vocab_offsets, pos = self._uint_view(view, pos, n_tokens + 1)
+        self.vocab = MappedVocabulary(self.buf, vocab_offsets, pos)
+
+    @staticmethod
+    def _uint_view(view, pos, count):
+        return view[pos:pos + count * 4].cast('I'), pos + count * 4
+
+    @staticmethod
+    def is_signature_file(path):
+        """ Check if a file is a signature file (by its magic bytes) """
+        if not path or not os.path.isfile(path):
+            return False
+        with open(path, 'rb') as infile:
+            return infile.read(len(MAGIC)) == MAGIC
+
+    def close(self):
+        self.offsets.release()
+        self.counts.release()
+        self.data.release()
+        self.vocab.offsets.release()
+        self.buf.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __len__(self):
+        return self.n_synsets
+
+    def __contains__(self, synsetid):
+        return self.lookup(synsetid) is not None
+
+    @property
+    def synsetids(self):
+        return [self._sid(sno) for sno in range(self.n_synsets)]
+
+    def _sid_bytes(self, sno):
+        start = self.sid_start + sno * SID_SIZE
+        return self.buf[start:start + SID_SIZE]
+
+    def _sid(self, sno):
+        return self._sid_bytes(sno).decode('ascii')
+
+    def lookup(self, synsetid):
+        """ Get the internal number of a synset (None if it is not available) """
+        return _search(self.n_synsets, str(synsetid).encode('ascii'), self._sid_bytes)
+
+    def add(self, synsetid, tokens):
+        raise TypeError("Signature files are read-only")
+
+    def add_ids(self, synsetid, token_ids):
+        raise TypeError("Signature files are read-only")
+
+    def tagcount(self, synsetid, default=None):
+        """ Get the tag count of a synset from the signature file """
+        sno = self.lookup(synsetid)
+        if sno is None or self.counts[sno] == NO_TAGCOUNT:
+            return default
+        return self.counts[sno]
+
+    # -------------------------------------------------------------------
+    # LeskCache compatible API
+    # -------------------------------------------------------------------
+
+    def select(self, synsetid, ctx=None):
+        return self.tokens(synsetid)
+
+    def cache(self, synsetid, tokens):
+        getLogger().debug("Signature file is read-only, tokens of {} will not be cached".format(synsetid))
+
+    def select_many(self, synsetids, ctx=None):
+        results = {}
+        for synsetid in synsetids:
+            tokens = self.tokens(synsetid)
+            if tokens is not None:
+                results[str(synsetid)] = tokens
+        return results
+
+    def cache_many(self, items, ctx=None):
+        getLogger().debug("Signature file is read-only, tokens will not be cached")
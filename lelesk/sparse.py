@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+LESK signatures as a sparse binary matrix (synsets x vocabulary) for overlap scoring
+"""
+
+# This code is a part of lelesk library: https://github.com/letuananh/lelesk
+# :copyright: (c) 2014 Le Tuan Anh <tuananh.ke@gmail.com>
+# :license: MIT, see LICENSE for more details.
+
+import logging
+
+try:
+    import numpy as np
+    from scipy import sparse
+except ImportError:
+    np = None
+    sparse = None
+
+
+def getLogger():
+    return logging.getLogger(__name__)
+
+
+class SparseSignatures:
+    """ Binary CSR matrix of LESK signatures, row i is the signature of synset number i
+
+    The matrix shares its buffers with a SignatureStore (or a SignatureFile):
+    offsets are the row pointers and token IDs are the column indices.
+    Overlaps between contexts and synsets are computed with sparse matrix products
+    using SciPy when it is available, or with a pure Python CSR product otherwise.
+    """
+    def __init__(self, store, use_scipy=True):
+        self.store = store
+        self.vocab = store.vocab
+        n_rows = len(store)
+        n_cols = (max(store.data) + 1) if len(store.data) else 1
+        self.shape = (n_rows, n_cols)
+        self.matrix = None
+        if use_scipy and sparse is not None:
+            indptr = np.frombuffer(store.offsets, dtype=np.uint32).astype(np.int64)
+            indices = np.frombuffer(store.data, dtype=np.uint32).astype(np.int64)
+            self.matrix = sparse.csr_matrix((np.ones(len(indices), dtype=np.int32), indices, indptr), shape=self.shape)
+        getLogger().info("Sparse signature matrix: {}x{} ({} non-zeros, SciPy: {})".format(n_rows, n_cols, len(store.data), self.matrix is not None))
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __contains__(self, synsetid):
+        return self.store.lookup(synsetid) is not None
+
+    def lookup(self, synsetid):
+        return self.store.lookup(synsetid)
+
+    def encode(self, context):
+        """ Encode context tokens to sorted column indices """
+        return [tid for tid in self.vocab.encode(context) if tid < self.shape[1]]
+
+    def overlap(self, synsetids, context):
+        """ Count shared tokens between a context and each synset (a single sparse mat-vec).
+        All synsets must be in this matrix.
+        """
+        return [row[0] for row in self.overlap_batch(synsetids, [context])]
+
+    def overlap_batch(self, synsetids, contexts):
+        """ Score many synsets against many contexts with a single sparse matrix product.
+
+        Returns a list (one item for each synset) of lists of scores (one for each context)
+        """
+        rows = [self.store.lookup(sid) for sid in synsetids]
+        columns = [self.encode(context) for context in contexts]
+        if not rows or not columns:
+            return [[0] * len(columns) for _ in rows]
+        if self.matrix is not None:
+            indptr = np.zeros(len(columns) + 1, dtype=np.int64)
+            indptr[1:] = np.cumsum([len(c) for c in columns])
+            indices = np.fromiter((tid for c in columns for tid in c), dtype=np.int64, count=int(indptr[-1]))
+            contexts_matrix = sparse.csr_matrix((np.ones(len(indices), dtype=np.int32), indices, indptr), shape=(len(columns), self.shape[1]))
+            product = self.matrix[np.array(rows, dtype=np.int64)] @ contexts_matrix.T
+            return product.toarray().tolist()
+        # pure Python: walk each signature row once and look up the dense context vectors
+        vectors = []
+        for c in columns:
+            vector = bytearray(self.shape[1])
+            for tid in c:
+                vector[tid] = 1
+            vectors.append(vector)
+        offsets, data = self.store.offsets, self.store.data
+        results = []
+        for sno in rows:
+            row = data[offsets[sno]:offsets[sno + 1]]
+            results.append([sum(map(vector.__getitem__, row)) for vector in vectors])
+        return results
@@ -9,17 +9,6 @@ LeLESK utilities
 # :copyright: (c) 2014 Le Tuan Anh <tuananh.ke@gmail.com>
 # :license: MIT, see LICENSE for more details.
 
-from texttaglib.chirptext.cli import setup_logging
-setup_logging('logging.json', 'logs')
-
-
-from nltk.tokenize import word_tokenize
-from nltk import pos_tag
-from nltk.stem import WordNetLemmatizer
-
-wnl = WordNetLemmatizer()
-
-
 PUNCS = '''[][!"#$%&'()*+,./:;<=>?@\\^_`{|}~-]“”'''
 
 
@@ -82,8 +71,22 @@ def ptpos_to_wn(ptpos, default='x'):
         return default
 
 
+wnl = None  # NLTK is slow to import, the lemmatizer is created on first use
+
+
+def get_lemmatizer():
+    ''' Shared NLTK WordNet lemmatizer '''
+    global wnl
+    if wnl is None:
+        from nltk.stem import WordNetLemmatizer
+        wnl = WordNetLemmatizer()
+    return wnl
+
+
 def tokenize(sent):
+    from nltk import pos_tag, word_tokenize
     words = word_tokenize(sent)
     tags = pos_tag(words)
-    tokens = [(w, t, wnl.lemmatize(w, pos=ptpos_to_wn(t, default='n'))) for w, t in tags]
+    lemmatizer = get_lemmatizer()
+    tokens = [(w, t, lemmatizer.lemmatize(w, pos=ptpos_to_wn(t, default='n'))) for w, t in tags]
     return tokens
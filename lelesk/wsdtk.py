@@ -11,8 +11,8 @@ Usage:
     # Test retrieving sense candidates for a word
     python3 wsdtk.py --candidates "love" --pos "v"
 
-    # test WSD batch mode
-    python3 wsdtk.py -b data/test.txt -o data/test_report.txt -r data/test_debug.txt
+    # evaluate WSD on a sense-tagged gold file
+    python3 -m lelesk eval data/test.txt -o data/test_report.txt --workers 4
 """
 
 # This code is a part of lelesk library: https://github.com/letuananh/lelesk
@@ -20,7 +20,14 @@ Usage:
 # :license: MIT, see LICENSE for more details.
 
 import os.path
-from collections import namedtuple
+import time
+import signal
+import logging
+import multiprocessing
+from array import array
+from types import SimpleNamespace
+from itertools import groupby, islice
+from collections import namedtuple, deque
 
 from texttaglib.chirptext.leutile import Timer, Counter, Table
 from texttaglib.chirptext.cli import CLIApp, setup_logging
@@ -29,182 +36,261 @@ from texttaglib.chirptext import ttl
 from yawlib import YLConfig
 
 from . import __version__
+from .config import LLConfig
 from .main import LeLeskWSD, LeskCache
+from .instrument import Instrumentation, NULL_INSTRUMENTATION
 from .util import ptpos_to_wn
 
 # -----------------------------------------------------------------------
 
 OutputLine = namedtuple('OutputLine', 'results word correct_sense suggested_sense sentence_text'.split())
-setup_logging('logging.json', 'logs')
+DEFAULT_CHUNK_SIZE = 100  # number of sentences to be processed together
 
 
-def generate_tokens(wsd):
+def generate_tokens(cli, args):
     ''' Pre-generate LESK tokens for all synsets for faster WSD
     '''
-    lesk_cache = LeskCache(wsd)
+    wsd = LeLeskWSD(args.glosswn, args.wnsql, verbose=not args.quiet)
+    lesk_cache = LeskCache(args.cache, wsd=wsd)
     lesk_cache.info()
-    lesk_cache.generate()
+    lesk_cache.generate(jobs=args.jobs, debug=args.debug, batch_size=args.batch, force=args.force)
     print("Done!")
 
 
 # -----------------------------------------------------------------------
 
-def batch_wsd(infile_loc, wsd_obj, outfile_loc=None, method='lelesk', use_pos=False, assume_perfect_POS=False, lemmatizing=False, pretokenized=False):
-    ''' Perform WSD in batch mode (input is a text file with each line is a sentence)
-        Arguments:
-            infile_loc         -- path to input file (Tab separated file)
-            wsd_obj            -- WSD component (e.g. LeLeskWSD object)
-            outfile_loc        -- Path to output (log) file
-            method             -- 'lelesk' or 'mfs'
-            use_pos            -- Use part-of-speech or not
-            assume_perfect_POS -- If True then use POS from input file
-            lemmatizing        -- Lemmatize tokens
-            pretokenized       -- Use context's tokens from input file
-    '''
-    tbatch = Timer()  # total time used to process this batch
-    tbatch.start("Batch WSD started | Method=%s | File = %s" % (method, infile_loc))
-    t = Timer()
-    t.start("Reading file %s" % infile_loc)
-    lines = open(os.path.expanduser(infile_loc)).readlines()
-    t.end("File has been loaded")
-
-    c = Counter('Match InTop3 Wrong NoSense TotalSense'.split())
-    outputlines = []
-    # Counters for different type of words
-    match_count = Counter()
-    top3_count = Counter()
-    wrong_count = Counter()
-    nosense_count = Counter()
+GoldItem = namedtuple('GoldItem', 'lineno word correct_sense pos sentence_text context'.split())
+LATENCY_PERCENTILES = (50, 90, 95, 99)
+
 
+def iter_gold(path):
+    ''' Read test items from a tab-separated gold file one by one. Each line is
+        word | correct sense | sentence text
+        word | correct sense | POS | sentence text
+        word | correct sense | POS | sentence text | context tokens (separated by |)
+    Lines which start with # are comments
+    '''
     # sample line in input file:
     # adventure 00796315-n  n   The Adventure of the Speckled Band  the|adventure|of|the|speckle|band
-    total_lines = len(lines)
-    processed = 0
-    for line in lines:
-        processed += 1
-        if line.startswith('#'):
-            # it is a comment line
-            continue
-        parts = line.split('\t')
-        if parts:
-            context = None
-            if len(parts) == 3: 
-                word = parts[0].strip()
-                correct_sense = parts[1].strip()
-                pos = None
-                sentence_text = parts[2].strip()
-            elif len(parts) == 4:
-                word = parts[0].strip()
-                correct_sense = parts[1].strip()
-                pos = parts[2].strip()
-                sentence_text = parts[3].strip()
-            elif len(parts) == 5:
-                word = parts[0].strip()
-                correct_sense = parts[1].strip()
-                pos = parts[2].strip()
-                sentence_text = parts[3].strip()
-                context = parts[4].strip().split('|')
-            if pos in ('', 'x'):
-                pos = None
-
-            if assume_perfect_POS:
-                pos = correct_sense[-1]
-            if not use_pos:
-                # if use choose to ignore POS
-                pos = None
-
-            results = 'X'
-            # Perform WSD on given word & sentence
-            t.start('Analysing word ["%s"] on sentence: %s' % (word, sentence_text))
-            if method == 'mfs':
-                scores = wsd_obj.mfs_wsd(word, sentence_text, correct_sense, lemmatizing=lemmatizing, pos=pos)
+    with chio.open(os.path.expanduser(path)) as infile:
+        for lineno, line in enumerate(infile, 1):
+            if line.startswith('#') or not line.strip():
+                continue
+            parts = [p.strip() for p in line.rstrip('\n').split('\t')]
+            if len(parts) == 3:
+                word, correct_sense, sentence_text = parts
+                pos, context = None, None
+            elif len(parts) in (4, 5):
+                word, correct_sense, pos, sentence_text = parts[:4]
+                context = parts[4].split('|') if len(parts) == 5 and parts[4] else None
             else:
-                if pretokenized and context and len(context) > 0:
-                    scores = wsd_obj.lelesk_wsd(word, sentence_text, correct_sense, lemmatizing=lemmatizing, pos=pos, context=context)
-                else:
-                    scores = wsd_obj.lelesk_wsd(word, sentence_text, correct_sense, lemmatizing=lemmatizing, pos=pos)
-            suggested_senses = [score.candidate.synset.ID for score in scores[:3]]
-            # c.count("TotalSense")
+                logging.getLogger(__name__).warning("Line {} of {} is malformed (ignored)".format(lineno, path))
+                continue
+            yield GoldItem(lineno, word, correct_sense, pos if pos not in ('', 'x') else None, sentence_text, context)
+
 
-            if correct_sense in YLConfig.NTUMC_PRONOUNS:
-                c.count("IGNORED")
+def eval_items(items, wsd, args):
+    ''' Disambiguate a stream of gold items with a single LeLeskWSD object.
+    Items are processed in chunks (--chunk), candidates of all words in a chunk are looked up together.
+    Yields (item, top 3 suggested senses, seconds) for each item, suggested senses is None if the item is ignored (a pronoun)
+    '''
+    wsd_method, wsd_func = get_wsd_method(wsd, args)
+    for chunk in iter_chunks(items, getattr(args, 'chunk', None) or DEFAULT_CHUNK_SIZE):
+        targets = [(item, _gold_pos(item, args)) for item in chunk]
+        words = {(item.word, pos) for item, pos in targets if item.correct_sense not in YLConfig.NTUMC_PRONOUNS}
+        if wsd_method == "MFS":
+            wsd.synset_cache.update(wsd.batch_synset_search(w for w in words if w not in wsd.synset_cache))
+        else:
+            wsd.prefetch_candidates(words)
+        for item, pos in targets:
+            if item.correct_sense in YLConfig.NTUMC_PRONOUNS:
+                yield item, None, 0.0
                 continue
+            t = time.perf_counter()
+            if wsd_method == "MFS":
+                scores = wsd_func(item.word, item.sentence_text, item.correct_sense, lemmatizing=args.lemmatize, pos=pos)
             else:
-                c.count("TotalSense")
-
-            if len(suggested_senses) == 0:
-                nosense_count.count(correct_sense + '\t' + word)
-                c.count("NoSense")
-                results = '_'
-            elif correct_sense == suggested_senses[0]:
-                match_count.count(correct_sense + '\t' + word)
-                c.count("Match")
-                results = 'O'
-            elif correct_sense in suggested_senses:
-                top3_count.count(correct_sense + '\t' + word)
-                c.count("InTop3")
-                results = 'V'
-            else:
-                wrong_count.count(correct_sense + '\t' + word)
-                c.count("Wrong")
+                context = item.context if args.pretokenized and item.context else None
+                scores = wsd_func(item.word, item.sentence_text, item.correct_sense, lemmatizing=args.lemmatize, pos=pos, context=context, top_k=3)
+            suggested_senses = [str(score.candidate.synset.ID) for score in scores[:3]]
+            yield item, suggested_senses, time.perf_counter() - t
 
-            # write to output file
-            if len(suggested_senses) > 0:
-                outputlines.append(OutputLine(results, word, correct_sense, suggested_senses[0], sentence_text))
-            else:
-                outputlines.append(OutputLine(results, word, correct_sense, "", sentence_text))
-            t.end('Analysed word ["%s"] (%s/%s completed)' % (word, processed, total_lines))
-    print("")
-    tbatch.start("Batch WSD finished | Method=%s | File = %s" % (method, infile_loc))
-
-    if outfile_loc:
-        print("Writing output file ==> %s..." % (outfile_loc,))
-
-        with open(outfile_loc, 'w') as outfile:
-            outfile.write("Sections\n")
-            outfile.write("::SENTENCES::\n")
-            outfile.write("::MATCH-TOKENS::\n")
-            outfile.write("::TOP3-TOKENS::\n")
-            outfile.write("::WRONG-TOKENS::\n")
-            outfile.write("::NOSENSE-TOKENS::\n")
-            outfile.write("::SUMMARY::\n")
-            outfile.write(("-" * 20) + '\n')
-
-            outfile.write("::SENTENCES::\n")
-            tbl = Table()
-            tbl.add_row("results word correct_sense suggested_sense sentence_text".split())
-            for line in outputlines:
-                tbl.add_row((line.results ,line.word ,line.correct_sense ,line.suggested_sense ,line.sentence_text))
-            print_tbl = lambda x: outfile.write('%s\n' % x)
-            # write table
-            tbl.print(print_func=print_tbl)
-            
+
+def _gold_pos(item, args):
+    if not args.use_pos:
+        # if use choose to ignore POS
+        return None
+    if args.perfect_pos:
+        return item.correct_sense[-1]
+    return item.pos
+
+
+def _eval_chunk(items):
+    ''' Evaluate a chunk of gold items in a worker process '''
+    return list(eval_items(items, _worker_wsd, _worker_args))
+
+
+def eval_parallel(items, args, workers):
+    ''' Shard a stream of gold items across a pool of worker processes (see wsd_parallel()), results are yielded in their original order '''
+    chunks = iter_chunks(items, getattr(args, 'chunk', None) or DEFAULT_CHUNK_SIZE)
+    with multiprocessing.Pool(workers, initializer=_init_wsd_worker, initargs=(args,)) as pool:
+        for results in _iter_async(pool, _eval_chunk, chunks, workers):
+            yield from results
+
+
+class EvalReport:
+    ''' Evaluation report of batch WSD (MATCH/TOP3/WRONG/NOSENSE tokens, summary, throughput and latency).
+    Results of each item are written as soon as they are added.
+    '''
+    def __init__(self, outfile_loc=None):
+        self.outfile_loc = outfile_loc
+        self.c = Counter('Match InTop3 Wrong NoSense TotalSense'.split())
+        # Counters for different type of words
+        self.match_count = Counter()
+        self.top3_count = Counter()
+        self.wrong_count = Counter()
+        self.nosense_count = Counter()
+        self.latencies = array('d')
+        self.started = time.perf_counter()
+        self.elapsed = None
+        self.outfile = open(outfile_loc, 'w', buffering=1) if outfile_loc else None
+        if self.outfile:
+            print("Writing output file ==> %s..." % (outfile_loc,))
+            self.outfile.write("Sections\n")
+            self.outfile.write("::SENTENCES::\n")
+            self.outfile.write("::MATCH-TOKENS::\n")
+            self.outfile.write("::TOP3-TOKENS::\n")
+            self.outfile.write("::WRONG-TOKENS::\n")
+            self.outfile.write("::NOSENSE-TOKENS::\n")
+            self.outfile.write("::PERFORMANCE::\n")
+            self.outfile.write("::SUMMARY::\n")
+            self.outfile.write(("-" * 20) + '\n')
+            self.outfile.write("::SENTENCES::\n")
+            self.outfile.write('\t'.join(OutputLine._fields) + '\n')
+
+    def add(self, item, suggested_senses, latency):
+        ''' Add the result of a gold item (see eval_items()) '''
+        if suggested_senses is None:
+            self.c.count("IGNORED")
+            return
+        self.c.count("TotalSense")
+        self.latencies.append(latency)
+        key = item.correct_sense + '\t' + item.word
+        results = 'X'
+        if len(suggested_senses) == 0:
+            self.nosense_count.count(key)
+            self.c.count("NoSense")
+            results = '_'
+        elif item.correct_sense == suggested_senses[0]:
+            self.match_count.count(key)
+            self.c.count("Match")
+            results = 'O'
+        elif item.correct_sense in suggested_senses:
+            self.top3_count.count(key)
+            self.c.count("InTop3")
+            results = 'V'
+        else:
+            self.wrong_count.count(key)
+            self.c.count("Wrong")
+        # write to output file
+        if self.outfile:
+            outputline = OutputLine(results, item.word, item.correct_sense, suggested_senses[0] if suggested_senses else "", item.sentence_text)
+            self.outfile.write('\t'.join(outputline) + '\n')
+
+    def performance(self):
+        ''' Throughput (items/sec) and latency percentiles (in seconds) '''
+        elapsed = self.elapsed if self.elapsed is not None else time.perf_counter() - self.started
+        latencies = sorted(self.latencies)
+        perf = {'items': len(latencies), 'elapsed': elapsed, 'throughput': len(latencies) / elapsed if elapsed else 0.0}
+        for pc in LATENCY_PERCENTILES:
+            # nearest-rank percentile
+            perf['p{}'.format(pc)] = latencies[max(0, -(-len(latencies) * pc // 100) - 1)] if latencies else 0.0
+        perf['max'] = latencies[-1] if latencies else 0.0
+        return perf
+
+    def summary_rows(self):
+        return [("Correct sense ranked the first", self.c['Match'], len(self.match_count)),
+                ("Correct sense ranked the 2nd or 3rd", self.c['InTop3'], len(self.top3_count)),
+                ("Wrong", self.c['Wrong'], len(self.wrong_count)),
+                ("NoSense", self.c['NoSense'], len(self.nosense_count)),
+                ("TotalSense", self.c['TotalSense'], '')]
+
+    def performance_rows(self):
+        perf = self.performance()
+        rows = [("Items", perf['items']),
+                ("Elapsed (sec)", '{:.2f}'.format(perf['elapsed'])),
+                ("Throughput (items/sec)", '{:.1f}'.format(perf['throughput']))]
+        rows.extend(("Latency {} (ms)".format(k), '{:.3f}'.format(perf[k] * 1000)) for k in ['p{}'.format(pc) for pc in LATENCY_PERCENTILES] + ['max'])
+        return rows
+
+    def close(self, tbatch=None):
+        ''' Write token tables, performance and summary sections '''
+        self.elapsed = time.perf_counter() - self.started
+        if not self.outfile:
+            return
+        with self.outfile as outfile:
             outfile.write("\n")
             # dump counter tokens
-            dump_counter(match_count, outfile, '::MATCH-TOKENS::')
-            dump_counter(top3_count, outfile, '::TOP3-TOKENS::')
-            dump_counter(wrong_count, outfile, '::WRONG-TOKENS::')
-            dump_counter(nosense_count, outfile, '::NOSENSE-TOKENS::')
+            dump_counter(self.match_count, outfile, '::MATCH-TOKENS::')
+            dump_counter(self.top3_count, outfile, '::TOP3-TOKENS::')
+            dump_counter(self.wrong_count, outfile, '::WRONG-TOKENS::')
+            dump_counter(self.nosense_count, outfile, '::NOSENSE-TOKENS::')
+            outfile.write("\n")
+            outfile.write("::PERFORMANCE::\n")
+            outfile.write("\n")
+            outfile.write("| Information                         |       Value |\n")
+            outfile.write("|:------------------------------------|------------:|\n")
+            for name, value in self.performance_rows():
+                outfile.write("| %s | %s |\n" % (name.ljust(35, ' '), str(value).rjust(11, ' ')))
             # write summary
-            # totalcount = len(match_count) + len(top3_count) + len(wrong_count) + len(nosense_count)
             outfile.write("\n")
             outfile.write("::SUMMARY::\n")
-            outfile.write("%s\n" % (tbatch))
+            if tbatch is not None:
+                outfile.write("%s\n" % (tbatch))
             outfile.write("\n")
             outfile.write("| Information                         |    Instance | Classes |\n")
             outfile.write("|:------------------------------------|--------:|-----------:\n")
-            outfile.write("| Correct sense ranked the first      |   %s | %s |\n" % (str(c['Match']).rjust(5, ' '), str(len(match_count)).rjust(5, ' ')))
-            outfile.write("| Correct sense ranked the 2nd or 3rd |   %s | %s |\n" % (str(c['InTop3']).rjust(5, ' '), str(len(top3_count)).rjust(5, ' ')))
-            outfile.write("| Wrong                               |   %s | %s |\n" % (str(c['Wrong']).rjust(5, ' '), str(len(wrong_count)).rjust(5, ' ')))
-            outfile.write("| NoSense                             |   %s | %s |\n" % (str(c['NoSense']).rjust(5, ' '), str(len(nosense_count)).rjust(5, ' ')))
-            outfile.write("| TotalSense                          |   %s | %s |\n" % (str(c['TotalSense']).rjust(5, ' '), str('').rjust(5, ' '))) # totalcount is wrong!
+            for name, instances, classes in self.summary_rows():
+                outfile.write("| %s |   %s | %s |\n" % (name.ljust(35, ' '), str(instances).rjust(5, ' '), str(classes).rjust(5, ' ')))
+
+
+def batch_wsd(infile_loc, wsd_obj, outfile_loc=None, method='lelesk', use_pos=False, assume_perfect_POS=False, lemmatizing=False, pretokenized=False, chunk_size=DEFAULT_CHUNK_SIZE):
+    ''' Perform WSD in batch mode (input is a tab-separated gold file, see iter_gold())
+        Arguments:
+            infile_loc         -- path to input file (Tab separated file)
+            wsd_obj            -- WSD component (e.g. LeLeskWSD object)
+            outfile_loc        -- Path to output (log) file
+            method             -- 'lelesk', 'sparse' or 'mfs'
+            use_pos            -- Use part-of-speech or not
+            assume_perfect_POS -- If True then use POS from input file
+            lemmatizing        -- Lemmatize tokens
+            pretokenized       -- Use context's tokens from input file
+            chunk_size         -- Number of items whose candidates are looked up together
+        Returns an EvalReport
+    '''
+    args = SimpleNamespace(method=method, use_pos=use_pos, perfect_pos=assume_perfect_POS, lemmatize=lemmatizing, pretokenized=pretokenized, chunk=chunk_size)
+    return eval_report(eval_items(iter_gold(infile_loc), wsd_obj, args), args, outfile_loc, infile_loc)
+
+
+def eval_report(results, args, outfile_loc, infile_loc):
+    ''' Build an EvalReport from a stream of evaluation results (see eval_items()) '''
+    tbatch = Timer()  # total time used to process this batch
+    tbatch.start("Batch WSD started | Method=%s | File = %s" % (args.method, infile_loc))
+    report = EvalReport(outfile_loc)
+    for processed, (item, suggested_senses, latency) in enumerate(results, 1):
+        report.add(item, suggested_senses, latency)
+        if processed % 1000 == 0:
+            logging.getLogger(__name__).info("Processed {} items".format(processed))
+    tbatch.stop("Batch WSD finished | Method=%s | File = %s" % (args.method, infile_loc))
+    report.close(tbatch)
     print("Batch job finished")
+    return report
 
 
 def dump_counter(counter, file_obj, header):
     tbl = Table()
     tbl.add_row(["Synset ID", "Lemma", "Count"])
-    items = counter.sorted_by_count()
+    items = counter.most_common()
     for k, v in items:
         tbl.add_row(k.split('\t') + [v])
 
@@ -224,10 +310,44 @@ def get_lelesk_set(cli, args):
 
 
 def build_wsd_object(cli, args):
-    wsd = LeLeskWSD(args.glosswn, args.wnsql, verbose=not args.quiet, dbcache=LeskCache())
+    wsd = LeLeskWSD(args.glosswn, args.wnsql, verbose=not args.quiet, dbcache=args.cache, cache_size=args.cache_size)
+    if getattr(args, 'stats', None):
+        wsd.enable_stats()
+    if getattr(args, 'index', False):
+        wsd.build_index()
+    if getattr(args, 'preload', False):
+        wsd.load_tagcounts()
+    if (getattr(args, 'method', None) or '').lower() == 'sparse':
+        wsd.load_matrix()
     return wsd
 
 
+def export_signatures(cli, args):
+    ''' Export a LeskCache DB to a read-only signature file '''
+    wsd = build_wsd_object(cli, args)
+    if not isinstance(wsd.dbcache, LeskCache):
+        print("Error. {} is not a LeskCache DB".format(args.cache))
+        return
+    t = Timer()
+    t.start("Exporting signatures to {}".format(args.output))
+    store = wsd.dbcache.export(args.output, wn=wsd.wn)
+    t.stop("Exported {} signatures ({} tokens)".format(len(store), len(store.vocab)))
+    print("Signature file was written to {}".format(args.output))
+
+
+def freeze_model(cli, args):
+    ''' Compile WordNet data and LESK signatures into a frozen model which does not need any database '''
+    wsd = build_wsd_object(cli, args)
+    if not isinstance(wsd.dbcache, LeskCache):
+        print("Error. {} is not a LeskCache DB".format(args.cache))
+        return
+    t = Timer()
+    t.start("Freezing WSD model to {}".format(args.output))
+    store = wsd.freeze(args.output)
+    t.stop("Froze {} signatures ({} tokens)".format(len(store), len(store.vocab)))
+    print("Frozen model was written to {}".format(args.output))
+
+
 def tokenize_text(cli, args):
     wsd = build_wsd_object(cli, args)
     tokens = wsd.prepare_data(args.text)
@@ -237,7 +357,10 @@ def tokenize_text(cli, args):
 
 def wsd_text(cli, args):
     ''' Perform word-sense disambiguation on a sentence '''
-    sent = wsd_sent(ttl.Sentence(text=args.context), cli, args)
+    if args.server:
+        sent = next(remote_wsd_sents([ttl.Sentence(text=args.context)], args))
+    else:
+        sent = wsd_sent(ttl.Sentence(text=args.context), cli, args)
     print("Text: {}".format(sent.text))
     if args.debug:
         print("Tokens: {}".format(', '.join('{}/{}/{}'.format(x, x.pos, x.lemma) for x in sent.tokens)))
@@ -247,34 +370,288 @@ def wsd_text(cli, args):
         print(c)
 
 
-def wsd_document(doc, cli, args):
-    """ Batch perform WSD """
-    wsd = build_wsd_object(cli, args)
-    if args.ttl_format == ttl.MODE_JSON:
-        _writer = ttl.JSONWriter.from_path(args.output)
-    else:
-        _writer = ttl.TxtWriter.from_path(args.output)
-    stopwords = set(wsd.stopwords)
+def get_wsd_method(wsd, args):
+    ''' Get (method name, WSD function) from command-line arguments, (None, None) if the method is unknown '''
     if not args.method or args.method.lower() in ('lesk', 'lelesk'):
-        wsd_method = "LELESK"
-        wsd_func = wsd.lelesk_wsd
+        return "LELESK", wsd.lelesk_wsd
     elif args.method.lower() == 'mfs':
-        wsd_method = "MFS"
-        wsd_func = wsd.mfs_wsd
-    else:
+        return "MFS", wsd.mfs_wsd
+    elif args.method.lower() == 'sparse':
+        return "SPARSE", wsd.sparse_wsd
+    return None, None
+
+
+def wsd_sents(sents, cli, args, wsd, candidates_only=False, chunk_size=None):
+    ''' Disambiguate (or find sense candidates of) a stream of sentences with a single LeLeskWSD object.
+    Sentences are processed in chunks (--chunk), candidates of all words in a chunk are looked up together
+    and each sentence is yielded as soon as it is done.
+    '''
+    stopwords = set(wsd.stopwords)
+    wsd_method, wsd_func = get_wsd_method(wsd, args)
+    if not chunk_size:
+        chunk_size = getattr(args, 'chunk', None) or DEFAULT_CHUNK_SIZE
+    for chunk in iter_chunks(sents, chunk_size):
+        prepare_sents(chunk, args, wsd)
+        words = {(token.lemma if token.lemma else token.text, ptpos_to_wn(token.pos)) for sent in chunk for token in wsd_targets(sent, wsd)}
+        if wsd_method in ("LELESK", "SPARSE") and not candidates_only:
+            wsd.prefetch_candidates(words)
+        else:
+            missing = {w for w in words if w not in wsd.synset_cache}
+            if missing:
+                wsd.synset_cache.update(wsd.batch_synset_search(missing))
+        if wsd_method == "SPARSE" and not candidates_only:
+            # the whole chunk is scored with one sparse matrix product
+            inputs = [wsd_inputs(sent, wsd, stopwords) for sent in chunk]
+            outputs = wsd.sparse_wsd_batch([(words, context) for context, _, words in inputs], remove_stop_words=False, top_k=1)
+            for sent, sent_outputs in zip(chunk, outputs):
+                wsd_sent(sent, cli, args, wsd, stopwords, wsd_method, wsd_func, prepared=True, outputs=sent_outputs)
+                yield sent
+            continue
+        for sent in chunk:
+            if candidates_only:
+                wsd_candidates(sent, cli, args, wsd, stopwords, prepared=True)
+            else:
+                wsd_sent(sent, cli, args, wsd, stopwords, wsd_method, wsd_func, prepared=True)
+            yield sent
+
+
+# Worker process of wsd_document()
+_worker_wsd = None
+_worker_args = None
+
+
+def _init_wsd_worker(args):
+    global _worker_wsd, _worker_args
+    _worker_args = args
+    _worker_wsd = build_wsd_object(None, args)
+    _worker_wsd.connect()
+
+
+def _wsd_chunk(job):
+    ''' Process a chunk of sentences (in JSON format) in a worker process '''
+    sent_jsons, candidates_only = job
+    t = time.perf_counter()
+    cli = SimpleNamespace(logger=logging.getLogger(__name__))
+    sents = [ttl.Sentence.from_json(j) for j in sent_jsons]
+    results = [sent.to_json() for sent in wsd_sents(sents, cli, _worker_args, _worker_wsd, candidates_only, chunk_size=len(sents))]
+    stats = None
+    if _worker_wsd.stats.enabled:
+        # statistics of this chunk only, they are merged by the main process
+        stats = _worker_wsd.stats.report()
+        _worker_wsd.stats.reset()
+    return os.getpid(), time.perf_counter() - t, results, stats
+
+
+def wsd_parallel(sents, args, workers, candidates_only=False, worker_stats=None, stats=None):
+    ''' Shard a stream of sentences across a pool of worker processes.
+    Each worker builds its own LeLeskWSD object once, sentences are yielded in their original order.
+    At most 2 chunks per worker are in progress at any time so that memory use does not depend on input size.
+    worker_stats (a dict of worker ID => [#sentences, seconds]) will be updated if it is provided.
+    Timers and counters of workers (when --stats is given) are merged into stats (an Instrumentation object) if it is provided.
+    '''
+    chunk_size = getattr(args, 'chunk', None) or DEFAULT_CHUNK_SIZE
+    jobs = (([sent.to_json() for sent in chunk], candidates_only) for chunk in iter_chunks(sents, chunk_size))
+    with multiprocessing.Pool(workers, initializer=_init_wsd_worker, initargs=(args,)) as pool:
+        for pid, elapsed, results, chunk_stats in _iter_async(pool, _wsd_chunk, jobs, workers):
+            if stats is not None and chunk_stats:
+                stats.merge(chunk_stats)
+            if worker_stats is not None:
+                counts = worker_stats.setdefault(pid, [0, 0.0])
+                counts[0] += len(results)
+                counts[1] += elapsed
+            yield from (ttl.Sentence.from_json(sent_json) for sent_json in results)
+
+
+def _iter_async(pool, func, jobs, workers):
+    ''' Apply func to a stream of jobs on a process pool and yield results in the original order.
+    At most 2 jobs per worker are in progress at any time so that memory use does not depend on input size.
+    '''
+    pending = deque()
+    for job in jobs:
+        pending.append(pool.apply_async(func, (job,)))
+        if len(pending) >= workers * 2:
+            yield pending.popleft().get()
+    while pending:
+        yield pending.popleft().get()
+
+
+def remote_wsd_sents(sents, args, candidates_only=False):
+    ''' Send a stream of sentences to a WSD server (lelesk serve) instead of building a LeLeskWSD object '''
+    from .server import WSDClient, REQUEST_OPTIONS
+    client = WSDClient(args.server)
+    options = {key: getattr(args, key, None) for key in REQUEST_OPTIONS}
+    return client.wsd_sents(sents, candidates_only, chunk_size=getattr(args, 'chunk', None) or DEFAULT_CHUNK_SIZE, **options)
+
+
+def serve_wsd(cli, args):
+    ''' Keep a warm WSD model in memory and serve WSD requests (use it with --server) '''
+    from .server import WSDService, make_server
+    t = Timer()
+    t.start("Loading WSD model")
+    service = WSDService(args, build_wsd_object(cli, args)).warm_up()
+    t.stop("WSD model is ready")
+    server = make_server(service, args.socket if args.socket else '{}:{}'.format(args.host, args.port))
+    print("Serving WSD on {} (stop with Ctrl+C)".format(server.address))
+    signal.signal(signal.SIGTERM, signal.default_int_handler)  # stop cleanly when the server is killed
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    print("Served {} requests ({} sentences)".format(service.requests, service.sentences))
+
+
+def wsd_document(doc, cli, args, candidates_only=False, wsd=None):
+    """ Batch perform WSD
+
+    doc can be a ttl.Document or any iterable of sentences (e.g. from iter_ttl()),
+    each sentence is written to output as soon as it is disambiguated.
+    A new LeLeskWSD object is built from args unless wsd is given (single process mode only).
+    """
+    if not candidates_only and args.method and args.method.lower() not in ('lesk', 'lelesk', 'mfs', 'sparse'):
         print("Unknown WSD method: {}".format(args.method))
         exit()
+    if args.ttl_format == ttl.MODE_JSON:
+        _writer = ttl.JSONWriter.from_path(args.output)
+    else:
+        _writer = ttl.TxtWriter.from_path(args.output)
     t = Timer()
-    t.start("WSD method: {}".format(wsd_method))
-    for idx, sent in enumerate(doc):
-        if args.topk and args.topk - 1 < idx:
-            break
-        print("Sent {}/{}: {} ".format(idx + 1, len(doc), sent.text))
-        wsd_sent(sent, cli, args, wsd, stopwords, wsd_method, wsd_func)
+    sents = islice(doc, args.topk) if args.topk else doc
+    workers = getattr(args, 'workers', 1) or 1
+    worker_stats = {}
+    stats_path = getattr(args, 'stats', None)
+    stats = NULL_INSTRUMENTATION
+    started = time.perf_counter()
+    t.start("{} (method: {}, workers: {})".format("Finding candidates" if candidates_only else "Disambiguating", args.method, workers))
+    if args.server:
+        if stats_path:
+            cli.logger.warning("Statistics are not available with --server")
+            stats_path = None
+        results = remote_wsd_sents(sents, args, candidates_only)
+    elif workers > 1:
+        if stats_path:
+            stats = Instrumentation()
+        results = wsd_parallel(sents, args, workers, candidates_only, worker_stats, stats=stats if stats_path else None)
+    else:
+        if wsd is None:
+            wsd = build_wsd_object(cli, args)
+        if stats_path and not wsd.stats.enabled:
+            wsd.enable_stats()
+        stats = wsd.stats
+        results = wsd_sents(sents, cli, args, wsd, candidates_only)
+    processed = 0
+    for sent in results:
+        processed += 1
+        print("Sent {}: {} ".format(processed, sent.text))
         # write sentence
-        _writer.write_sent(sent)
+        with stats.stage('writing'):
+            _writer.write_sent(sent)
+    with stats.stage('writing'):
+        _writer.close()
     print("Output was written to {}".format(args.output))
-    t.stop("Done WSD")
+    t.stop("Done WSD ({} sentences)".format(processed))
+    for idx, (pid, (count, elapsed)) in enumerate(sorted(worker_stats.items())):
+        print("Worker #{} (pid={}): {} sentences in {:.2f} sec".format(idx + 1, pid, count, elapsed))
+    single = wsd is not None and not args.server and workers <= 1
+    if single:
+        cli.logger.info("Cache statistics: {}".format(wsd.cache_stats()))
+    if stats_path:
+        extra = {'caches': wsd.cache_stats()} if single else {}
+        stats.dump(stats_path, method=args.method, workers=workers, sentences=processed, elapsed=time.perf_counter() - started, **extra)
+        print("Statistics were written to {}".format(stats_path))
+
+
+def iter_chunks(items, size):
+    ''' Split an iterable into lists of (at most) size items '''
+    items = iter(items)
+    while True:
+        chunk = list(islice(items, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def iter_txt(path):
+    ''' Read sentences from a text file (each line is a sentence) one by one '''
+    with chio.open(path) as infile:
+        for idx, line in enumerate(infile):
+            yield ttl.Sentence(line.rstrip('\n'), ID=idx + 1)
+
+
+class _SentRows:
+    ''' Rows of a TTL/TSV stream grouped by sentence ID (rows must be in the same order as sentences) '''
+    def __init__(self, rows, path=''):
+        self.path = path
+        self.groups = groupby(rows, key=lambda row: int(row[0])) if rows is not None else iter(())
+        self.current = next(self.groups, None)
+
+    def pop(self, sid):
+        sid = int(sid)
+        if self.current is not None and self.current[0] < sid:
+            self.invalid()
+        if self.current is None or self.current[0] != sid:
+            return []
+        rows = list(self.current[1])
+        self.current = next(self.groups, None)
+        return rows
+
+    def finish(self):
+        ''' Make sure that all rows were read '''
+        if self.current is not None:
+            self.invalid()
+
+    def invalid(self):
+        raise KeyError("Invalid sentence ID ({}) in {} (unknown sentence or rows are not in the same order as sentences)".format(self.current[0], self.path))
+
+
+def iter_ttl_tsv(path):
+    ''' Read sentences from a TTL/TSV document one by one (same as ttl.read() but without loading the whole document) '''
+    reader = ttl.TxtReader.from_path(path)
+    try:
+        streams = (reader.token_stream, reader.concept_stream, reader.link_stream, reader.tag_stream)
+        rows = (reader.token_reader(), reader.concept_reader(), reader.link_reader(), reader.tag_reader())
+        token_rows, concept_rows, link_rows, tag_rows = (_SentRows(r, path=getattr(stream, 'name', path)) for r, stream in zip(rows, streams))
+        for row in reader.sent_reader():
+            sent = ttl.Sentence(row[1].strip(), ID=row[0])
+            if len(row) == 4:
+                sent.flag, sent.comment = row[2], row[3]
+            sent_tokens = [(r[2], r[3], r[4].strip(), r[5] if len(r) == 6 else '') for r in token_rows.pop(sent.ID)]
+            if sent_tokens:
+                sent.import_tokens([x[0] for x in sent_tokens])
+                for (tk, lemma, pos, comment), token in zip(sent_tokens, sent.tokens):
+                    token.pos = pos
+                    token.lemma = lemma
+                    token.comment = comment
+            for r in concept_rows.pop(sent.ID):
+                sent.new_concept(r[3].strip(), clemma=r[2], cidx=int(r[1]), comment=r[4] if len(r) == 5 else '')
+            for r in link_rows.pop(sent.ID):
+                try:
+                    concept, token = sent.concept(int(r[1])), sent[int(r[2].strip())]
+                except (KeyError, IndexError):
+                    raise KeyError("Invalid link (concept {}, token {}) of sentence {} in {}".format(r[1], r[2].strip(), sent.ID, link_rows.path)) from None
+                concept.add_token(token)
+            for r in tag_rows.pop(sent.ID):
+                cfrom, cto, label, tagtype = r[1:5]
+                wid = r[5] if len(r) == 6 else None
+                cfrom = int(cfrom) if cfrom else cfrom
+                cto = int(cto) if cto else cto
+                if wid is None or wid == '':
+                    sent.new_tag(label, cfrom, cto, tagtype=tagtype)
+                else:
+                    sent[int(wid)].new_tag(label, cfrom, cto, tagtype=tagtype)
+            yield sent
+        for sent_rows in (token_rows, concept_rows, link_rows, tag_rows):
+            sent_rows.finish()
+    finally:
+        reader.close()
+
+
+def iter_ttl(path, mode=ttl.MODE_TSV):
+    ''' Read sentences from a TTL document one by one '''
+    if mode == ttl.MODE_JSON:
+        return ttl.read_json_iter(path)
+    return iter_ttl_tsv(path)
 
 
 def wsd_file(cli, args):
@@ -283,31 +660,87 @@ def wsd_file(cli, args):
         return wsd_ttl(cli, args)
     elif args.format == "txt":
         if os.path.isfile(args.input):
-            lines = chio.read_file(args.input).splitlines()
-            doc = ttl.Document()
-            for line in lines:
-                doc.new_sent(line)
-            wsd_document(doc, cli, args)
+            wsd_document(iter_txt(args.input), cli, args)
         else:
             print(f"Error. Input file not found! ({args.input})")
 
 
 def wsd_ttl(cli, args):
     ''' Perform WSD on a TTL document '''
-    doc = ttl.read(args.input, mode=args.ttl_format)  # input TTL
-    wsd_document(doc, cli, args)
+    wsd_document(iter_ttl(args.input, mode=args.ttl_format), cli, args)
+
+
+def find_ttl_candidates(cli, args):
+    ''' Find sense candidates of all words in a TTL document '''
+    wsd_document(iter_ttl(args.input, mode=args.ttl_format), cli, args, candidates_only=True)
+
+
+def wsd_eval(cli, args):
+    ''' Evaluate WSD on a sense-tagged gold file (see iter_gold()) '''
+    if not os.path.isfile(os.path.expanduser(args.input)):
+        print(f"Error. Input file not found! ({args.input})")
+        return
+    items = iter_gold(args.input)
+    if args.topk:
+        items = islice(items, args.topk)
+    workers = getattr(args, 'workers', 1) or 1
+    if workers > 1:
+        results = eval_parallel(items, args, workers)
+    else:
+        results = eval_items(items, build_wsd_object(cli, args), args)
+    report = eval_report(results, args, args.output, args.input)
+    for name, instances, _ in report.summary_rows():
+        print("{:<36} {:>8}".format(name, instances))
+    for name, value in report.performance_rows():
+        print("{:<36} {:>8}".format(name, value))
+
+
+def prepare_sent(sent, args, wsd):
+    ''' Tokenize and lemmatize a sentence if needed '''
+    return prepare_sents([sent], args, wsd)[0]
+
+
+def prepare_sents(sents, args, wsd):
+    ''' Tokenize and lemmatize sentences if needed, all sentences are POS tagged together '''
+    for sent in sents:
+        if not sent.tokens:
+            sent.tokens = wsd.tokenize(sent.text)
+    # lemmatize if needed
+    if not args.nolemmatize:
+        wsd.lemmatize_ttl_sents(sents, keep_existing=getattr(args, 'keep_tags', False))
+    return sents
+
+
+def wsd_targets(sent, wsd):
+    ''' Tokens of a sentence which should be disambiguated '''
+    for token in sent:
+        if token.lemma in wsd.PUNCS or token.text in wsd.PUNCS:
+            continue
+        elif token.pos and token.pos in ('PRP', '.'):
+            continue
+        yield token
 
 
-def wsd_candidates(sent, cli, args, wsd=None, stopwords=None, remove_stop_words=True, **kwargs):
+def wsd_inputs(sent, wsd, stopwords, remove_stop_words=True):
+    ''' Build the WSD context of a sentence and find its target words.
+    Returns (context, target tokens, list of (word, pos) of targets)
+    '''
+    context = set(token.text.lower() for token in sent.tokens)
+    context.update(token.lemma.lower() for token in sent.tokens if token.lemma)
+    if remove_stop_words:
+        context = context - stopwords
+    targets = list(wsd_targets(sent, wsd))
+    words = [(token.lemma if token.lemma else token.text, ptpos_to_wn(token.pos)) for token in targets]
+    return context, targets, words
+
+
+def wsd_candidates(sent, cli, args, wsd=None, stopwords=None, remove_stop_words=True, prepared=False, **kwargs):
     if wsd is None:
         wsd = build_wsd_object(cli, args)
     if stopwords is None:
         stopwords = set(wsd.stopwords)
-    if not sent.tokens:
-        sent.tokens = wsd.tokenize(sent.text)
-    # lemmatize if needed
-    if not args.nolemmatize:
-        wsd.lemmatize_ttl(sent)
+    if not prepared:
+        prepare_sent(sent, args, wsd)
     # build WSD context
     context = set(token.text.lower() for token in sent.tokens)
     context.update(token.lemma.lower() for token in sent.tokens if token.lemma)
@@ -315,11 +748,7 @@ def wsd_candidates(sent, cli, args, wsd=None, stopwords=None, remove_stop_words=
         context = context - stopwords
     cli.logger.debug("Sent #{} tokens: {}".format(sent.ID, [(t.text, t.lemma, t.pos) for t in sent]))
     cli.logger.debug("Sent #{} context: {}".format(sent.ID, context))
-    for token in sent:
-        if token.lemma in wsd.PUNCS or token.text in wsd.PUNCS:
-            continue
-        elif token.pos and token.pos in ('PRP', '.'):
-            continue
+    for token in wsd_targets(sent, wsd):
         # no need to remove stopwords again, they are removed above
         # output = wsd_func(token.lemma if token.lemma else token.text, sent.text, pos=ptpos_to_wn(token.pos), context=context, remove_stop_words=False)
         synsets = wsd.smart_synset_search(lemma=token.lemma if token.lemma else token.text, pos=ptpos_to_wn(token.pos))
@@ -333,37 +762,32 @@ def wsd_candidates(sent, cli, args, wsd=None, stopwords=None, remove_stop_words=
     return sent
 
 
-def wsd_sent(sent, cli, args, wsd=None, stopwords=None, wsd_method=None, wsd_func=None, remove_stop_words=True):
+def wsd_sent(sent, cli, args, wsd=None, stopwords=None, wsd_method=None, wsd_func=None, remove_stop_words=True, prepared=False, outputs=None):
+    ''' Disambiguate a sentence and add the best sense of each target word as a concept.
+    Ranked scores of the targets can be given as outputs (e.g. from LeLeskWSD.sparse_wsd_batch())
+    '''
     if wsd is None:
         wsd = build_wsd_object(cli, args)
     if wsd_method is None or wsd_func is None:
-        if not args.method or args.method.lower() in ('lesk', 'lelesk'):
-            wsd_method = "LELESK"
-            wsd_func = wsd.lelesk_wsd
-        elif args.method.lower() == 'mfs':
-            wsd_method = "MFS"
-            wsd_func = wsd.mfs_wsd
+        wsd_method, wsd_func = get_wsd_method(wsd, args)
     if stopwords is None:
         stopwords = set(wsd.stopwords)
-    if not sent.tokens:
-        sent.tokens = wsd.tokenize(sent.text)
-    # lemmatize if needed
-    if not args.nolemmatize:
-        wsd.lemmatize_ttl(sent)
+    if not prepared:
+        prepare_sent(sent, args, wsd)
     # build WSD context
-    context = set(token.text.lower() for token in sent.tokens)
-    context.update(token.lemma.lower() for token in sent.tokens if token.lemma)
-    if remove_stop_words:
-        context = context - stopwords
+    context, targets, words = wsd_inputs(sent, wsd, stopwords, remove_stop_words)
     cli.logger.debug("Sent #{} tokens: {}".format(sent.ID, [(t.text, t.lemma, t.pos) for t in sent]))
     cli.logger.debug("Sent #{} context: {}".format(sent.ID, context))
-    for token in sent:
-        if token.lemma in wsd.PUNCS or token.text in wsd.PUNCS:
-            continue
-        elif token.pos and token.pos in ('PRP', '.'):
-            continue
-        # no need to remove stopwords again, they are removed above
-        output = wsd_func(token.lemma if token.lemma else token.text, sent.text, pos=ptpos_to_wn(token.pos), context=context, remove_stop_words=False)
+    # no need to remove stopwords again, they are removed above
+    if outputs is None:
+        if wsd_method == "LELESK":
+            # all words share the same context so they are scored in one pass
+            outputs = wsd.disambiguate_sentence(words, context, remove_stop_words=False, top_k=1)
+        elif wsd_method == "SPARSE":
+            outputs = wsd.sparse_wsd_batch([(words, context)], remove_stop_words=False, top_k=1)[0]
+        else:
+            outputs = [wsd_func(word, sent.text, pos=pos, context=context, remove_stop_words=False, top_k=1) for word, pos in words]
+    for token, output in zip(targets, outputs):
         if output:
             c = output[0].candidate
             concept = sent.new_concept(c.synset.ID, clemma=token.lemma if token.lemma else token.text, tokens=[token])
@@ -387,17 +811,23 @@ def find_candidates(cli, args):
 def main():
     '''Main entry of WSD toolkit
     '''
+    setup_logging('logging.json', 'logs')
     app = CLIApp(desc=f'LeLesk - Word-Sense Disambiguation Toolkit - Version {__version__}', logger=__name__)
     # Positional argument(s)
     app.parser.add_argument('-w', '--wnsql', help='Location to WordNet 3.0 SQLite database', default=YLConfig.WNSQL30_PATH)
     app.parser.add_argument('-g', '--glosswn', help='Location to Gloss WordNet SQLite database', default=YLConfig.GWN30_DB)
+    app.parser.add_argument('-c', '--cache', help='Location to LeskCache DB, signature file or frozen model', default=LLConfig.LELESK_CACHE_DB_LOC)
+    app.parser.add_argument('--cache_size', help='Maximum number of words in in-memory candidate caches', type=int, default=LLConfig.LELESK_CANDIDATES_CACHE_SIZE)
+    app.parser.add_argument('--server', help='Send wsd/file/ttl/cand requests to a WSD server (host:port or unix:path, see serve)')
 
     task = app.add_task('wsd', func=wsd_text)
     task.add_argument('context', help='Context to perform WSD')
     task.add_argument('--word', help='word to perform WSD')
     task.add_argument('--notag', help='Also use sentence level tags for annotations', action='store_true')
     task.add_argument('--nolemmatize', help='Do not perform lemmatization', action='store_true')
-    task.add_argument('-m', '--method', help='WSD method (mfs/lelesk)', choices=['mfs', 'lelesk'])
+    task.add_argument('-m', '--method', help='WSD method (mfs/lelesk/sparse)', choices=['mfs', 'lelesk', 'sparse'])
+    task.add_argument('--index', help='Score overlaps with an inverted index built from LeskCache', action='store_true')
+    task.add_argument('--preload', help='Preload tag counts of all synsets', action='store_true')
     task.add_argument('--debug', action='store_true')
 
     task = app.add_task('file', func=wsd_file)
@@ -406,9 +836,15 @@ def main():
     task.add_argument('-n', '--topk', help='Only process top k sentences', type=int)
     task.add_argument('--notag', help='Also use sentence level tags for annotations', action='store_true')
     task.add_argument('--nolemmatize', help='Do not perform lemmatization', action='store_true')
-    task.add_argument('-m', '--method', help='WSD method (mfs/lelesk)', choices=['mfs', 'lelesk', 'lesk'], default='lelesk')
+    task.add_argument('--keep_tags', help='Keep POS tags and lemmas of input tokens, only tag tokens without them', action='store_true')
+    task.add_argument('-m', '--method', help='WSD method (mfs/lelesk/sparse)', choices=['mfs', 'lelesk', 'lesk', 'sparse'], default='lelesk')
     task.add_argument('-f', '--format', help="File format (TTL, txt)", choices=["txt", "ttl"], default='txt')
     task.add_argument('--ttl_format', help='TTL format', default=ttl.MODE_TSV, choices=[ttl.MODE_JSON, ttl.MODE_TSV])
+    task.add_argument('--workers', help='Number of worker processes', type=int, default=1)
+    task.add_argument('--chunk', help='Number of sentences to be processed together', type=int, default=DEFAULT_CHUNK_SIZE)
+    task.add_argument('--index', help='Score overlaps with an inverted index built from LeskCache', action='store_true')
+    task.add_argument('--preload', help='Preload tag counts of all synsets', action='store_true')
+    task.add_argument('--stats', help='Write per-stage timers, counters and DB query counts to a JSON file')
     
     task = app.add_task('ttl', func=wsd_ttl)
     task.add_argument('input', help='TTL profile')
@@ -416,17 +852,40 @@ def main():
     task.add_argument('-n', '--topk', help='Only process top k sentences', type=int)
     task.add_argument('--notag', help='Also use sentence level tags for annotations', action='store_true')
     task.add_argument('--nolemmatize', help='Do not perform lemmatization', action='store_true')
-    task.add_argument('-m', '--method', help='WSD method (mfs/lelesk)', choices=['mfs', 'lelesk', 'lesk'], default='lelesk')
+    task.add_argument('--keep_tags', help='Keep POS tags and lemmas of input tokens, only tag tokens without them', action='store_true')
+    task.add_argument('-m', '--method', help='WSD method (mfs/lelesk/sparse)', choices=['mfs', 'lelesk', 'lesk', 'sparse'], default='lelesk')
     task.add_argument('--ttl_format', help='TTL format', default=ttl.MODE_TSV, choices=[ttl.MODE_JSON, ttl.MODE_TSV])
+    task.add_argument('--workers', help='Number of worker processes', type=int, default=1)
+    task.add_argument('--chunk', help='Number of sentences to be processed together', type=int, default=DEFAULT_CHUNK_SIZE)
+    task.add_argument('--index', help='Score overlaps with an inverted index built from LeskCache', action='store_true')
+    task.add_argument('--preload', help='Preload tag counts of all synsets', action='store_true')
+    task.add_argument('--stats', help='Write per-stage timers, counters and DB query counts to a JSON file')
 
-    task = app.add_task('cand', func=wsd_candidates)
+    task = app.add_task('cand', func=find_ttl_candidates)
     task.add_argument('input', help='TTL profile')
     task.add_argument('output', help='Output TTL profile')
     task.add_argument('-n', '--topk', help='Only process top k sentences', type=int)
     task.add_argument('--notag', help='Also use sentence level tags for annotations', action='store_true')
     task.add_argument('--nolemmatize', help='Do not perform lemmatization', action='store_true')
-    task.add_argument('-m', '--method', help='WSD method (mfs/lelesk)', choices=['mfs', 'lelesk', 'lesk'], default='lelesk')
+    task.add_argument('--keep_tags', help='Keep POS tags and lemmas of input tokens, only tag tokens without them', action='store_true')
+    task.add_argument('-m', '--method', help='WSD method (mfs/lelesk/sparse)', choices=['mfs', 'lelesk', 'lesk', 'sparse'], default='lelesk')
     task.add_argument('--ttl_format', help='TTL format', default=ttl.MODE_TSV, choices=[ttl.MODE_JSON, ttl.MODE_TSV])
+    task.add_argument('--workers', help='Number of worker processes', type=int, default=1)
+    task.add_argument('--chunk', help='Number of sentences to be processed together', type=int, default=DEFAULT_CHUNK_SIZE)
+
+    task = app.add_task('eval', func=wsd_eval)
+    task.add_argument('input', help='Tab-separated gold file (word, sense, [POS], sentence, [context tokens])')
+    task.add_argument('-o', '--output', help='Output report file')
+    task.add_argument('-n', '--topk', help='Only process top k items', type=int)
+    task.add_argument('-m', '--method', help='WSD method (mfs/lelesk/sparse)', choices=['mfs', 'lelesk', 'lesk', 'sparse'], default='lelesk')
+    task.add_argument('--use_pos', help='Use POS from input file', action='store_true')
+    task.add_argument('--perfect_pos', help='Use POS of the correct sense instead of POS from input file (with --use_pos)', action='store_true')
+    task.add_argument('--lemmatize', help='Lemmatize tokens', action='store_true')
+    task.add_argument('--pretokenized', help="Use context tokens from input file", action='store_true')
+    task.add_argument('--workers', help='Number of worker processes', type=int, default=1)
+    task.add_argument('--chunk', help='Number of items to be processed together', type=int, default=DEFAULT_CHUNK_SIZE)
+    task.add_argument('--index', help='Score overlaps with an inverted index built from LeskCache', action='store_true')
+    task.add_argument('--preload', help='Preload tag counts of all synsets', action='store_true')
 
     task = app.add_task('forms', func=get_lelesk_set)
     task.add_argument('synsetid', help='Synset ID')
@@ -436,6 +895,29 @@ def main():
     task.add_argument('--pos', default=None)
     task.add_argument('--show_tokens', action="store_true")
 
+    task = app.add_task('generate', func=generate_tokens)
+    task.add_argument('-j', '--jobs', help='Number of worker processes', type=int, default=1)
+    task.add_argument('--batch', help='Number of synsets to write per transaction', type=int, default=1000)
+    task.add_argument('--debug', help='Write token generation details to debug folder', action='store_true')
+    task.add_argument('--force', help='Regenerate all synsets, including up-to-date ones', action='store_true')
+
+    task = app.add_task('export', func=export_signatures)
+    task.add_argument('output', help='Path to output signature file')
+
+    task = app.add_task('freeze', func=freeze_model)
+    task.add_argument('output', help='Path to output frozen model (use it with -c)')
+
+    task = app.add_task('serve', func=serve_wsd)
+    task.add_argument('--host', help='Host to listen on', default='127.0.0.1')
+    task.add_argument('--port', help='Port to listen on', type=int, default=8765)
+    task.add_argument('--socket', help='Listen on a Unix socket instead of a TCP port')
+    task.add_argument('-m', '--method', help='Default WSD method (mfs/lelesk/sparse)', choices=['mfs', 'lelesk', 'lesk', 'sparse'], default='lelesk')
+    task.add_argument('--notag', help='Also use sentence level tags for annotations', action='store_true')
+    task.add_argument('--nolemmatize', help='Do not perform lemmatization', action='store_true')
+    task.add_argument('--keep_tags', help='Keep POS tags and lemmas of input tokens, only tag tokens without them', action='store_true')
+    task.add_argument('--index', help='Score overlaps with an inverted index built from LeskCache', action='store_true')
+    task.add_argument('--preload', help='Preload tag counts of all synsets', action='store_true')
+
     task = app.add_task('tokenize', func=tokenize_text)
     task.add_argument('text', help='Sentence text to analyse')
 
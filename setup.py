@@ -36,7 +36,7 @@ setup(
     version=pkg_info['__version__'],
     tests_require=requirements + ['coverage'],
     install_requires=requirements,
-    python_requires=">=3.6",
+    python_requires=">=3.7",
     license=pkg_info['__license__'],
     author=pkg_info['__author__'],
     author_email=pkg_info['__email__'],
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Test asyncio WSD API
+"""
+
+# This code is a part of lelesk library: https://github.com/letuananh/lelesk
+# :copyright: (c) 2014 Le Tuan Anh <tuananh.ke@gmail.com>
+# :license: MIT, see LICENSE for more details.
+
+import os
+import asyncio
+import tempfile
+import threading
+import unittest
+from lelesk import LeLeskWSD, AsyncLeLeskWSD
+from lelesk.index import SignatureStore, TagCounts
+from lelesk.frozen import write_frozen_model
+
+
+class TestAsyncWSD(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        path = os.path.join(self.tmpdir.name, 'lelesk.llz')
+        store = SignatureStore()
+        store.add('02512053-n', ['fish', 'aquatic', 'shark', 'water'])
+        store.add('07775375-n', ['fish', 'food', 'flesh'])
+        store.add('01316949-n', ['dog', 'pet'])
+        tagcounts = TagCounts()
+        tagcounts.add('02512053-n', 12)
+        tagcounts.add('07775375-n', 14)
+        words = {'fish': [('n07775375', 'n'), ('n02512053', 'n')], 'dog': [('n01316949', 'n')]}
+        write_frozen_model(path, store, tagcounts, words, {}, lelesk_version='test')
+        self.wsd = LeLeskWSD.from_frozen(path, wng_db_loc=os.path.join(self.tmpdir.name, 'missing_gwn.db'),
+                                         wn30_loc=os.path.join(self.tmpdir.name, 'missing_wn.db'))
+        # record lookups (words which are not cached) and the threads which run them
+        self.lookups = []
+        prefetch_candidates = self.wsd.prefetch_candidates
+
+        def _prefetch(words):
+            words = [w for w in words if w not in self.wsd.candidates_cache]
+            if words:
+                self.lookups.append((threading.current_thread().name, sorted(words)))
+            return prefetch_candidates(words)
+        self.wsd.prefetch_candidates = _prefetch
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_lelesk_wsd(self):
+        async def _wsd():
+            async with AsyncLeLeskWSD(self.wsd, max_workers=3) as awsd:
+                requests = [awsd.lelesk_wsd('fish', pos='n', context=['water', 'shark'], remove_stop_words=False) for _ in range(10)]
+                requests.append(awsd.lelesk_wsd('dog', pos='n', context=['pet'], remove_stop_words=False))
+                results = await asyncio.gather(*requests)
+                mfs = await awsd.mfs_wsd('fish', pos='n')
+                sent = await awsd.disambiguate_sentence([('fish', 'n'), ('dog', 'n')], ['food'], remove_stop_words=False, top_k=1)
+                return results, mfs, sent, awsd.coalesced
+        results, mfs, sent, coalesced = asyncio.run(_wsd())
+        expected = [(str(s.candidate.synset.ID), s.score, s.freq) for s in self.wsd.lelesk_wsd('fish', pos='n', context=['water', 'shark'], remove_stop_words=False)]
+        self.assertEqual(expected, [('02512053-n', 2, 12), ('07775375-n', 0, 14)])
+        for scores in results[:10]:
+            self.assertEqual([(str(s.candidate.synset.ID), s.score, s.freq) for s in scores], expected)
+        self.assertEqual(str(results[10][0].candidate.synset.ID), '01316949-n')
+        self.assertEqual([str(s.candidate.synset.ID) for s in mfs], ['07775375-n', '02512053-n'])
+        self.assertEqual([str(scores[0].candidate.synset.ID) for scores in sent], ['07775375-n', '01316949-n'])
+        # concurrent requests for (fish, n) share a single lookup which runs on a worker thread
+        self.assertEqual(len([words for _, words in self.lookups if ('fish', 'n') in words]), 1)
+        self.assertEqual(coalesced, 9)
+        self.assertTrue(all(name.startswith('lelesk') for name, _ in self.lookups))
+
+    def test_warm_up(self):
+        jobs = []
+        self.wsd.warm_up = lambda: jobs.append(('warm_up', threading.current_thread().name))
+
+        async def _wsd():
+            awsd = AsyncLeLeskWSD(self.wsd, max_workers=3)
+            # the first burst of requests waits for a single warm-up job
+            await asyncio.gather(*(awsd.run(lambda: jobs.append(('job', threading.current_thread().name))) for _ in range(5)))
+            await awsd.start()
+            await awsd.close()
+        asyncio.run(_wsd())
+        self.assertEqual([kind for kind, _ in jobs], ['warm_up'] + ['job'] * 5)
+        self.assertTrue(jobs[0][1].startswith('lelesk'))
+
+
+if __name__ == '__main__':
+    unittest.main()
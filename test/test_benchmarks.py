@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Test the benchmark suite (synthetic fixture, offline)
+"""
+
+# This code is a part of lelesk library: https://github.com/letuananh/lelesk
+# :copyright: (c) 2014 Le Tuan Anh <tuananh.ke@gmail.com>
+# :license: MIT, see LICENSE for more details.
+
+import json
+import tempfile
+import unittest
+
+from benchmarks.suite import BenchmarkSuite, compare
+
+
+class TestBenchmarks(unittest.TestCase):
+
+    def test_quick_run(self):
+        with tempfile.TemporaryDirectory() as folder:
+            suite = BenchmarkSuite(folder, n_synsets=60, n_sents=10, repeat=2)
+            report = suite.run(['build_lelesk_set', 'lelesk_wsd', 'mfs_wsd', 'wsd_document'])
+        report = json.loads(json.dumps(report))
+        results = report['results']
+        for name in ('build_lelesk_set.cold', 'build_lelesk_set.warm', 'mfs_wsd', 'wsd_document.lelesk', 'wsd_document.mfs', 'wsd_document.sparse'):
+            self.assertGreater(results[name]['ops_per_sec'], 0)
+        self.assertEqual(results['wsd_document.lelesk']['ops'], 10)
+        self.assertTrue(any(name.startswith('lelesk_wsd.polysemy_') for name in results))
+        self.assertEqual(report['fixture']['synsets'], 60)
+        # compare
+        slower = json.loads(json.dumps(report))
+        slower['results']['mfs_wsd']['median'] *= 2
+        regressions = {row[0] for row in compare(report, slower, threshold=0.5) if row[-1]}
+        self.assertEqual(regressions, {'mfs_wsd'})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Test thread-keyed SQLite connection pools
+"""
+
+# This code is a part of lelesk library: https://github.com/letuananh/lelesk
+# :copyright: (c) 2014 Le Tuan Anh <tuananh.ke@gmail.com>
+# :license: MIT, see LICENSE for more details.
+
+import os
+import sqlite3
+import tempfile
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from texttaglib.puchikarui import Schema
+from lelesk import LeLeskWSD, LeskCache
+from lelesk.config import LLConfig
+from lelesk.dbpool import ConnectionPool
+
+
+class TestConnectionPool(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'test.db')
+        with sqlite3.connect(self.path) as conn:
+            conn.execute('CREATE TABLE word (lemma TEXT)')
+            conn.executemany('INSERT INTO word VALUES (?)', [('fish',), ('dog',)])
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_readonly(self):
+        pool = ConnectionPool(Schema(self.path), readonly=True, pragmas=LLConfig.SQLITE_READONLY_PRAGMAS)
+        ctx = pool.ctx()
+        self.assertIs(pool.ctx(), ctx)
+        self.assertEqual(ctx.select_scalar('SELECT count(*) FROM word'), 2)
+        self.assertEqual(ctx.select_scalar('PRAGMA cache_size'), -65536)
+        self.assertEqual(ctx.select_scalar('PRAGMA query_only'), 1)
+        with self.assertRaises(sqlite3.OperationalError):
+            ctx.execute('INSERT INTO word VALUES (?)', ('cat',))
+        pool.close_all()
+        self.assertEqual(len(pool), 0)
+        with self.assertRaises(FileNotFoundError):
+            ConnectionPool(Schema(os.path.join(self.tmpdir.name, 'missing.db')), readonly=True).ctx()
+
+    def test_threads(self):
+        pool = ConnectionPool(Schema(self.path), readonly=True)
+
+        def _count(_):
+            ctx = pool.ctx()
+            return threading.get_ident(), id(ctx), ctx.select_scalar('SELECT count(*) FROM word')
+        with ThreadPoolExecutor(4) as executor:
+            results = list(executor.map(_count, range(100)))
+        self.assertTrue(all(count == 2 for _, _, count in results))
+        # one connection for each thread
+        self.assertEqual(len({tid for tid, _, _ in results}), len({cid for _, cid, _ in results}))
+        self.assertEqual(len(pool), len({tid for tid, _, _ in results}))
+        # connections of finished threads are closed when a new one is opened
+        pool.ctx()
+        self.assertEqual(len(pool), 1)
+        pool.close_all()
+
+    def test_shared_wsd(self):
+        cache = LeskCache(os.path.join(self.tmpdir.name, 'lesk_cache.db'))
+        cache.cache_many([('02512053-n', ['fish', 'aquatic']), ('07775375-n', ['fish', 'food'])])
+        wsd = LeLeskWSD(dbcache=cache)
+        with ThreadPoolExecutor(4) as executor:
+            results = list(executor.map(lambda _: wsd.get_lelesk_sets(['02512053-n', '07775375-n']), range(40)))
+        self.assertTrue(all(r == {'02512053-n': ['fish', 'aquatic'], '07775375-n': ['fish', 'food']} for r in results))
+        self.assertGreater(len(wsd.dbcache_pool), 0)
+        wsd.disconnect()
+        self.assertEqual(len(wsd.dbcache_pool), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
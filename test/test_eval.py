@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Test batch WSD evaluation (eval task)
+"""
+
+# This code is a part of lelesk library: https://github.com/letuananh/lelesk
+# :copyright: (c) 2014 Le Tuan Anh <tuananh.ke@gmail.com>
+# :license: MIT, see LICENSE for more details.
+
+import os
+import tempfile
+import unittest
+from lelesk import LeLeskWSD
+from lelesk.index import SignatureStore, TagCounts
+from lelesk.frozen import write_frozen_model
+from lelesk.wsdtk import iter_gold, batch_wsd
+
+GOLD = '''# word\tsense\tpos\tsentence\tcontext
+fish\t02512053-n\tn\tFish in the water with a shark\tfish|water|shark
+fish\t07775375-n\tx\tI cook fish for food\tcook|fish|food
+fish\t07775375-n\tn\tFish swim in the water\tfish|swim|water
+he\t77000100-n\tn\tHe said\the|said
+cat\t02121620-n\tn\tA cat\tcat
+malformed line
+'''
+
+
+class TestEval(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        path = os.path.join(self.tmpdir.name, 'lelesk.llz')
+        store = SignatureStore()
+        store.add('02512053-n', ['fish', 'aquatic', 'shark', 'water'])
+        store.add('07775375-n', ['fish', 'food', 'flesh'])
+        tagcounts = TagCounts()
+        tagcounts.add('02512053-n', 12)
+        tagcounts.add('07775375-n', 10)
+        words = {'fish': [('n07775375', 'n'), ('n02512053', 'n')]}
+        write_frozen_model(path, store, tagcounts, words, {}, lelesk_version='test')
+        self.wsd = LeLeskWSD.from_frozen(path, wng_db_loc=os.path.join(self.tmpdir.name, 'missing_gwn.db'),
+                                         wn30_loc=os.path.join(self.tmpdir.name, 'missing_wn.db'))
+        self.wsd.stopwords = ['the', 'a', 'in', 'with']
+        self.gold = os.path.join(self.tmpdir.name, 'gold.txt')
+        with open(self.gold, 'w') as outfile:
+            outfile.write(GOLD)
+
+    def tearDown(self):
+        self.wsd.disconnect()
+        self.tmpdir.cleanup()
+
+    def test_iter_gold(self):
+        items = list(iter_gold(self.gold))
+        self.assertEqual(len(items), 5)
+        self.assertEqual(items[0].lineno, 2)
+        self.assertEqual(items[0].context, ['fish', 'water', 'shark'])
+        self.assertIsNone(items[1].pos)  # x means no POS
+        self.assertEqual(items[2].sentence_text, 'Fish swim in the water')
+
+    def test_batch_wsd(self):
+        output = os.path.join(self.tmpdir.name, 'report.txt')
+        report = batch_wsd(self.gold, self.wsd, output, use_pos=True, pretokenized=True, chunk_size=2)
+        self.assertEqual(report.c['TotalSense'], 4)
+        self.assertEqual(report.c['IGNORED'], 1)
+        self.assertEqual(report.c['Match'], 2)
+        self.assertEqual(report.c['InTop3'], 1)
+        self.assertEqual(report.c['NoSense'], 1)
+        perf = report.performance()
+        self.assertEqual(perf['items'], 4)
+        self.assertLessEqual(perf['p50'], perf['p99'])
+        self.assertLessEqual(perf['p99'], perf['max'])
+        with open(output) as infile:
+            lines = infile.read().splitlines()
+        self.assertIn('O\tfish\t02512053-n\t02512053-n\tFish in the water with a shark', lines)
+        self.assertIn('_\tcat\t02121620-n\t\tA cat', lines)
+        self.assertIn('::PERFORMANCE::', lines)
+        self.assertTrue(lines[-1].startswith('| TotalSense'))
+        # MFS
+        report = batch_wsd(self.gold, self.wsd, method='mfs', use_pos=True)
+        self.assertEqual((report.c['Match'], report.c['InTop3'], report.c['NoSense']), (1, 2, 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
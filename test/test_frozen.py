@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Test frozen WSD models
+"""
+
+# This code is a part of lelesk library: https://github.com/letuananh/lelesk
+# :copyright: (c) 2014 Le Tuan Anh <tuananh.ke@gmail.com>
+# :license: MIT, see LICENSE for more details.
+
+import os
+import tempfile
+import unittest
+from lelesk import LeLeskWSD
+from lelesk.index import SignatureStore, TagCounts
+from lelesk.sigfile import SignatureFile
+from lelesk.frozen import FrozenModel, write_frozen_model
+
+
+class TestFrozenModel(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'lelesk.llz')
+        store = SignatureStore()
+        store.add('02512053-n', ['fish', 'aquatic', 'shark', 'water'])
+        store.add('07775375-n', ['fish', 'food', 'flesh'])
+        store.add('01316949-n', ['dog', 'pet'])
+        tagcounts = TagCounts()
+        tagcounts.add('02512053-n', 12)
+        tagcounts.add('07775375-n', 12)
+        words = {'fish': [('n07775375', 'n'), ('n02512053', 'n'), ('v01165871', 'v')],
+                 'dog': [('n01316949', 'n')],
+                 'hot dog': [('n07697537', 'n')]}
+        synsets = {'02512053-n': (['fish'], 'any of various mostly cold-blooded aquatic vertebrates'),
+                   '07775375-n': (['fish'], 'the flesh of fish used as food')}
+        write_frozen_model(self.path, store, tagcounts, words, synsets, lelesk_version='test')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_frozen_model(self):
+        self.assertTrue(FrozenModel.is_frozen_model(self.path))
+        self.assertFalse(SignatureFile.is_signature_file(self.path))
+        with FrozenModel(self.path) as model:
+            self.assertEqual(model.lelesk_version, 'test')
+            self.assertEqual(len(model), 3)
+            self.assertEqual(set(model.tokens('01316949-n')), {'dog', 'pet'})
+            self.assertEqual(model.tagcount('02512053-n'), 12)
+            self.assertIsNone(model.tagcount('01316949-n'))
+            self.assertEqual(model.tagcounts().get('07775375-n'), 12)
+            # same order as Gloss WordNet search: rowid order with POS, sorted by GWN ID without
+            self.assertEqual([str(ss.ID) for ss in model.search('Fish', 'n')], ['07775375-n', '02512053-n'])
+            self.assertEqual([str(ss.ID) for ss in model.search('fish')], ['02512053-n', '07775375-n', '01165871-v'])
+            self.assertEqual([str(ss.ID) for ss in model.search('hot-dog', 'n')], ['07697537-n'])
+            self.assertFalse(model.search('cat'))
+            ss = model.search('fish', 'n', deep_select=True)['02512053-n']
+            self.assertEqual(ss.lemmas, ['fish'])
+            self.assertEqual(ss.definition, 'any of various mostly cold-blooded aquatic vertebrates')
+
+    def test_from_frozen(self):
+        wsd = LeLeskWSD.from_frozen(self.path, wng_db_loc=os.path.join(self.tmpdir.name, 'missing_gwn.db'),
+                                    wn30_loc=os.path.join(self.tmpdir.name, 'missing_wn.db'))
+        self.assertTrue(wsd.frozen)
+        self.assertIs(wsd.signatures, wsd.dbcache)
+        wsd.connect()
+        scores = wsd.lelesk_wsd('fish', pos='n', context=['water', 'shark', 'river'], remove_stop_words=False)
+        self.assertEqual([(str(s.candidate.synset.ID), s.score, s.freq) for s in scores],
+                         [('02512053-n', 2, 12), ('07775375-n', 0, 12)])
+        scores = wsd.mfs_wsd('dog', '', pos='n')
+        self.assertEqual([(str(s.candidate.synset.ID), s.freq) for s in scores], [('01316949-n', None)])
+        wsd.disconnect()
+        # no database should be created
+        self.assertEqual(os.listdir(self.tmpdir.name), ['lelesk.llz'])
+
+
+if __name__ == '__main__':
+    unittest.main()
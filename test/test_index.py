@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Test LeLesk inverted index
+"""
+
+# This code is a part of lelesk library: https://github.com/letuananh/lelesk
+# :copyright: (c) 2014 Le Tuan Anh <tuananh.ke@gmail.com>
+# :license: MIT, see LICENSE for more details.
+
+import os
+import tempfile
+import unittest
+from lelesk import LeskCache
+from lelesk.index import InvertedIndex, Vocabulary, SignatureStore, TagCounts
+
+
+class TestInvertedIndex(unittest.TestCase):
+
+    def test_overlap(self):
+        index = InvertedIndex()
+        index.add('02512053-n', ['fish', 'aquatic', 'shark', 'water'])
+        index.add('07775375-n', ['fish', 'food', 'flesh'])
+        index.add('01316949-n', ['dog', 'pet'])
+        self.assertEqual(len(index), 3)
+        self.assertIn('02512053-n', index)
+        self.assertEqual(index.lookup('07775375-n'), 1)
+        self.assertIsNone(index.lookup('00000000-n'))
+        context = ['fish', 'water', 'river', 'fish']
+        self.assertEqual(index.scores(context), {'02512053-n': 2, '07775375-n': 1})
+        overlap = index.overlap(context)
+        self.assertEqual(overlap[index.lookup('01316949-n')], 0)
+        self.assertRaises(ValueError, lambda: index.add('01316949-n', []))
+
+    def test_build_from_cache(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache = LeskCache(os.path.join(tmpdir, 'lesk_cache.db'))
+            cache.cache('02512053-n', ['fish', 'aquatic', 'water'])
+            cache.cache('07775375-n', ['fish', 'food'])
+            index = cache.build_index()
+            self.assertEqual(len(index), 2)
+            self.assertEqual(index.scores(['fish', 'food']), {'02512053-n': 1, '07775375-n': 2})
+
+
+class TestSignatureStore(unittest.TestCase):
+
+    def test_vocab(self):
+        vocab = Vocabulary()
+        self.assertEqual(vocab.add('fish'), 1)
+        self.assertEqual(vocab.add('water', 10), 10)
+        self.assertEqual(vocab.add('river'), 11)
+        self.assertEqual(vocab.add('fish'), 1)
+        self.assertEqual(list(vocab.encode(['river', 'fish', 'unknown', 'fish'])), [1, 11])
+        self.assertEqual(vocab.decode([10, 1]), ['water', 'fish'])
+
+    def test_overlap(self):
+        store = SignatureStore()
+        store.add('02512053-n', ['fish', 'aquatic', 'shark', 'water'])
+        store.add('07775375-n', ['fish', 'food', 'flesh'])
+        store.add('01316949-n', [])
+        self.assertEqual(len(store), 3)
+        self.assertEqual(set(store.tokens('07775375-n')), {'fish', 'food', 'flesh'})
+        self.assertEqual(store.tokens('01316949-n'), [])
+        self.assertIsNone(store.tokens('00000000-n'))
+        context = store.vocab.encode(['fish', 'water', 'river'])
+        self.assertEqual(store.overlap(store.lookup('02512053-n'), context), 2)
+        self.assertEqual(store.overlap(store.lookup('07775375-n'), context), 1)
+        self.assertEqual(store.overlap(store.lookup('01316949-n'), context), 0)
+
+    def test_build_from_cache(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache = LeskCache(os.path.join(tmpdir, 'lesk_cache.db'))
+            cache.cache('02512053-n', ['fish', 'aquatic', 'water'])
+            cache.cache('07775375-n', ['fish', 'food'])
+            store = cache.build_signatures()
+            self.assertEqual(len(store), 2)
+            self.assertEqual(len(store.vocab), 4)
+            self.assertEqual(set(store.tokens('02512053-n')), {'fish', 'aquatic', 'water'})
+            # vocab IDs are stable
+            cache.cache('01316949-n', ['dog', 'fish'])
+            vocab = cache.build_vocab()
+            self.assertEqual(vocab.get('fish'), store.vocab.get('fish'))
+            self.assertEqual(len(vocab), 5)
+
+
+class TestTagCounts(unittest.TestCase):
+
+    def test_tagcounts(self):
+        tagcounts = TagCounts()
+        tagcounts.add('02512053-n', 12)
+        tagcounts.add('07775375-n', 0)
+        tagcounts.add('01316949-n', None)
+        self.assertEqual(len(tagcounts), 3)
+        self.assertEqual(tagcounts.get('02512053-n'), 12)
+        self.assertEqual(tagcounts.get('07775375-n'), 0)
+        self.assertIsNone(tagcounts.get('01316949-n'))
+        self.assertEqual(tagcounts.get('00000000-n', -1), -1)
+        tagcounts.add('02512053-n', 13)
+        self.assertEqual(tagcounts.get('02512053-n'), 13)
+
+    def test_cache_tagcounts(self):
+        tagcounts = TagCounts()
+        tagcounts.add('02512053-n', 12)
+        tagcounts.add('01316949-n', None)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache = LeskCache(os.path.join(tmpdir, 'lesk_cache.db'))
+            self.assertIsNone(cache.load_tagcounts())
+            cache.cache_tagcounts(tagcounts)
+            cached = cache.load_tagcounts()
+            self.assertEqual(dict(cached.items()), {'02512053-n': 12, '01316949-n': None})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Test per-stage timers, counters and DB query counts
+"""
+
+# This code is a part of lelesk library: https://github.com/letuananh/lelesk
+# :copyright: (c) 2014 Le Tuan Anh <tuananh.ke@gmail.com>
+# :license: MIT, see LICENSE for more details.
+
+import os
+import json
+import tempfile
+import unittest
+from lelesk import LeLeskWSD, LeskCache
+from lelesk.instrument import Instrumentation, NULL_INSTRUMENTATION
+
+
+class TestInstrumentation(unittest.TestCase):
+
+    def test_stages(self):
+        stats = Instrumentation()
+        with stats.stage('scoring'):
+            with stats.stage('tagcount'):
+                pass
+            with stats.stage('scoring'):
+                pass  # re-entered stages are timed once
+        stats.count('signatures.hit', 3)
+        stats.query('wn')
+        stats.tracer('wn')('SELECT 1')
+        report = stats.report()
+        self.assertEqual(list(report['stages']), ['tagcount', 'scoring'])
+        self.assertEqual(report['stages']['scoring']['calls'], 1)
+        self.assertEqual(report['counters'], {'signatures.hit': 3})
+        self.assertEqual(report['queries'], {'wn': 2})
+        other = Instrumentation()
+        other.merge(report)
+        other.merge(report)
+        self.assertEqual(other.report()['stages']['tagcount']['calls'], 2)
+        self.assertEqual(other.report()['queries'], {'wn': 4})
+        stats.reset()
+        self.assertEqual(stats.report(), NULL_INSTRUMENTATION.report())
+
+    def test_wsd(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache = LeskCache(os.path.join(tmpdir, 'lesk_cache.db'))
+            cache.cache_many([('02512053-n', ['fish', 'aquatic']), ('07775375-n', ['fish', 'food'])])
+            wsd = LeLeskWSD(dbcache=cache)
+            self.assertFalse(wsd.stats.enabled)
+            wsd.get_lelesk_sets(['02512053-n'])
+            stats = wsd.enable_stats()
+            self.assertIs(wsd.stats, stats)
+            wsd.get_lelesk_sets(['02512053-n', '07775375-n'])
+            wsd.build_lelesk_set('02512053-n')
+            report = wsd.stats_report()
+            self.assertEqual(report['stages']['signatures']['calls'], 2)
+            self.assertEqual(report['counters'], {'signatures.hit': 3, 'signatures.miss': 0})
+            self.assertEqual(report['queries']['lesk_cache'], 2)
+            self.assertIn('candidates', report['caches'])
+            path = os.path.join(tmpdir, 'stats.json')
+            stats.dump(path, sentences=0)
+            with open(path) as infile:
+                self.assertEqual(json.load(infile)['sentences'], 0)
+            wsd.disable_stats()
+            wsd.get_lelesk_sets(['02512053-n'])
+            self.assertEqual(stats.report()['queries']['lesk_cache'], 2)
+            wsd.disconnect()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -10,8 +10,15 @@ Test LeLesk package
 # :license: MIT, see LICENSE for more details.
 
 import os
+import sqlite3
+import tempfile
+import random
 import unittest
+from yawlib import Synset
 from lelesk import LeLeskWSD, LeskCache
+from lelesk.main import WSDCandidate
+from lelesk.index import TagCounts
+from benchmarks import fixture
 
 
 TEST_DIR = os.path.dirname(__file__)
@@ -61,6 +68,65 @@ class TestMain(unittest.TestCase):
         l = LeLeskWSD(dbcache=":memory:")
         l.dbcache.select('01775164-v')
 
+    def test_bulk_insert(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache = LeskCache(os.path.join(tmpdir, 'lesk_cache.db'))
+            batches = [[('02512053-n', ['fish', 'aquatic']), ('07775375-n', ['fish', 'food'])],
+                       [('01316949-n', ['dog'])]]
+            cache.bulk_insert(iter(batches), 3, hashes={'02512053-n': 'a', '07775375-n': 'b', '01316949-n': 'c'})
+            self.assertEqual(cache.select('02512053-n'), ['fish', 'aquatic'])
+            self.assertEqual(cache.select('01316949-n'), ['dog'])
+            self.assertEqual(cache.generated(), {'02512053-n': 'a', '07775375-n': 'b', '01316949-n': 'c'})
+            # regenerated synsets replace old tokens
+            cache.bulk_insert([[('01316949-n', ['dog', 'pet'])]], hashes={'01316949-n': 'd'})
+            self.assertEqual(cache.select('01316949-n'), ['dog', 'pet'])
+            self.assertEqual(cache.generated()['01316949-n'], 'd')
+
+    def test_cache_candidates(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache = LeskCache(os.path.join(tmpdir, 'lesk_cache.db'))
+            self.assertIsNone(cache.select_candidates('fish', 'n'))
+            cache.cache_candidates('fish', 'n', ['02512053-n', '07775375-n'])
+            cache.cache_candidates_many([(('fish', None), ['02512053-n']), (('so-called', 'a'), [])])
+            self.assertEqual(cache.select_candidates('fish', 'n'), ['02512053-n', '07775375-n'])
+            self.assertEqual(cache.select_candidates_many([('fish', None), ('so-called', 'a'), ('dog', 'n')]),
+                             {('fish', None): ['02512053-n'], ('so-called', 'a'): []})
+            cache.clear_candidates()
+            self.assertIsNone(cache.select_candidates('fish', 'n'))
+            # a warm cache answers synset search without Gloss WordNet
+            cache.cache_candidates('fish', 'n', ['02512053-n', '07775375-n'])
+            l = LeLeskWSD(wng_db_loc=os.path.join(tmpdir, 'missing.db'), dbcache=cache)
+            self.assertEqual([ss.ID for ss in l.smart_synset_search('fish', 'n')], ['02512053-n', '07775375-n'])
+
+    def test_cache_candidates_single_word(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            gwn_path, wn_path = fixture.build_wordnet(tmpdir, n_synsets=30)
+            _, words = fixture.read_lexicon(gwn_path)
+            lemma, pos = sorted(words)[0]
+            cache = LeskCache(os.path.join(tmpdir, 'lesk_cache.db'))
+            l = LeLeskWSD(wng_db_loc=gwn_path, wn30_loc=wn_path, dbcache=cache)
+            expected = [ss.ID for ss in l.smart_synset_search(lemma, pos)]
+            self.assertEqual(len(expected), words[(lemma, pos)])
+            l.disconnect()
+            # candidates found by a single-word search are stored in LeskCache
+            l = LeLeskWSD(wng_db_loc=os.path.join(tmpdir, 'missing.db'), dbcache=cache)
+            self.assertEqual([ss.ID for ss in l.smart_synset_search(lemma, pos)], expected)
+            l.disconnect()
+
+    def test_cache_candidates_old_schema(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            # a cache created by an older version (no candidates table) is read without changing it
+            path = os.path.join(tmpdir, 'old_cache.db')
+            with sqlite3.connect(path) as conn:
+                conn.execute('CREATE TABLE tokens (synsetid TEXT, token TEXT)')
+            cache = LeskCache(path)
+            self.assertIsNone(cache.select_candidates('fish', 'n'))
+            with sqlite3.connect(path) as conn:
+                tables = {name for name, in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+            self.assertEqual(tables, {'tokens'})
+            cache.cache_candidates('fish', 'n', ['02512053-n'])
+            self.assertEqual(cache.select_candidates('fish', 'n'), ['02512053-n'])
+
     def test_mfs(self):
         print("Test MFS WSD")
         # without cache
@@ -82,6 +148,65 @@ class TestMain(unittest.TestCase):
         self.assertEqual(scores[0].freq, 12)
         # self.dump_scores(scores)
 
+    def test_prefetch_candidates(self):
+        words = [('fish', 'n'), ('river', 'n'), ('so-called', 'a'), ('fish', None)]
+        l = LeLeskWSD()
+        l.connect()
+        found = l.batch_synset_search(words)
+        expected = LeLeskWSD()
+        for lemma, pos in words:
+            self.assertEqual([ss.ID for ss in found[(lemma, pos)]],
+                             [ss.ID for ss in expected.smart_synset_search(lemma, pos)])
+        # lelesk_wsd() should use prefetched candidates
+        w, sent = self.test_data()
+        l.prefetch_candidates(words)
+        self.assertIn(('fish', 'n'), l.candidates_cache)
+        scores = l.lelesk_wsd(w, sent, context=sent.split(), pos='n')
+        self.assertEqual(scores[0].candidate.synset.ID, '02512053-n')
+
+    def test_disambiguate_sentence(self):
+        l = LeLeskWSD()
+        l.connect()
+        w, sent = self.test_data()
+        context = sent.split()
+        results = l.disambiguate_sentence([('fish', 'n'), ('river', 'n')], context)
+        self.assertEqual(len(results), 2)
+        self.assertEqual(results[0][0].candidate.synset.ID, '02512053-n')
+        for (word, pos), scores in zip([('fish', 'n'), ('river', 'n')], results):
+            expected = l.lelesk_wsd(word, sent, context=context, pos=pos)
+            self.assertEqual([(s.candidate.synset.ID, s.score, s.freq) for s in scores],
+                             [(s.candidate.synset.ID, s.score, s.freq) for s in expected])
+
+    def test_sparse_wsd(self):
+        l = LeLeskWSD(dbcache=LeskCache(TEST_CACHE))
+        l.connect()
+        w, sent = self.test_data()
+        context = sent.split()
+        expected = l.lelesk_wsd(w, sent, context=context)
+        scores = l.sparse_wsd(w, sent, context=context)
+        self.assertEqual([(s.candidate.synset.ID, s.score, s.freq) for s in scores],
+                         [(s.candidate.synset.ID, s.score, s.freq) for s in expected])
+        results = l.sparse_wsd_batch([([('fish', 'n'), ('river', 'n')], context), ([('fish', None)], ['fish', 'food'])])
+        self.assertEqual([len(r) for r in results], [2, 1])
+        self.assertEqual(results[0][0][0].candidate.synset.ID, '02512053-n')
+
+    def test_top_k(self):
+        # many ties to check that top-k selection keeps the order of the full ranking
+        rand = random.Random(2014)
+        vocab = ['fish', 'river', 'water', 'food', 'dog', 'pet', 'swim', 'boat']
+        tagcounts = TagCounts()
+        candidates = []
+        for idx in range(40):
+            sid = '{:08d}-n'.format(idx + 1)
+            tagcounts.add(sid, rand.choice([0, 1, 2]))
+            candidates.append(WSDCandidate(idx + 1, Synset(sid), rand.sample(vocab, rand.randint(0, 5))))
+        l = LeLeskWSD(tagcounts=tagcounts)
+        context = {'fish', 'river', 'water', 'swim'}
+        full = [(s.candidate.synset.ID, s.score, s.freq) for s in l.score_candidates(candidates, context)]
+        for k in (0, 1, 3, 10, 40, 50):
+            top = l.score_candidates(candidates, context, top_k=k)
+            self.assertEqual([(s.candidate.synset.ID, s.score, s.freq) for s in top], full[:k])
+
     def test_fast_wsd(self):
         # disable lemmatizer => faster
         l = LeLeskWSD()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Test LRU cache
+"""
+
+# This code is a part of lelesk library: https://github.com/letuananh/lelesk
+# :copyright: (c) 2014 Le Tuan Anh <tuananh.ke@gmail.com>
+# :license: MIT, see LICENSE for more details.
+
+import unittest
+from lelesk.lru import LRUCache
+
+
+class TestLRUCache(unittest.TestCase):
+
+    def test_max_entries(self):
+        cache = LRUCache(max_entries=2)
+        cache['a'] = 1
+        cache['b'] = 2
+        self.assertEqual(cache['a'], 1)  # 'b' is now the least recently used
+        cache['c'] = 3
+        self.assertNotIn('b', cache)
+        self.assertEqual(cache.keys(), ['a', 'c'])
+        self.assertIsNone(cache.get('b'))
+        stats = cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['evictions'], stats['entries']), (1, 1, 1, 2))
+
+    def test_max_bytes(self):
+        cache = LRUCache(max_bytes=10, sizeof=len)
+        cache['a'] = 'x' * 4
+        cache['b'] = 'x' * 4
+        self.assertEqual(cache.nbytes, 8)
+        cache['c'] = 'x' * 4
+        self.assertEqual(cache.keys(), ['b', 'c'])
+        self.assertEqual(cache.nbytes, 8)
+        # replacing a value updates its size
+        cache['c'] = 'x'
+        self.assertEqual(cache.nbytes, 5)
+        del cache['b']
+        self.assertEqual(cache.nbytes, 1)
+        # values larger than max_bytes are not kept
+        cache['d'] = 'x' * 20
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.stats()['evictions'], 3)
+
+    def test_no_max_bytes(self):
+        def _sizeof(value):
+            raise AssertionError("sizeof is called")
+        cache = LRUCache(max_entries=2, sizeof=_sizeof)
+        cache['a'] = 'x' * 4
+        cache.update({'b': 'x', 'c': 'xx'})
+        self.assertEqual(cache.keys(), ['b', 'c'])
+        self.assertEqual(cache.nbytes, 0)
+
+    def test_update(self):
+        cache = LRUCache()
+        cache.update({'a': 1})
+        cache.update([('b', 2)])
+        self.assertEqual(len(cache), 2)
+        cache.clear()
+        self.assertEqual((len(cache), cache.nbytes), (0, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Test WSD server and client
+"""
+
+# This code is a part of lelesk library: https://github.com/letuananh/lelesk
+# :copyright: (c) 2014 Le Tuan Anh <tuananh.ke@gmail.com>
+# :license: MIT, see LICENSE for more details.
+
+import os
+import socket
+import tempfile
+import threading
+import unittest
+from types import SimpleNamespace
+from texttaglib.chirptext import ttl
+from lelesk import LeLeskWSD
+from lelesk.index import SignatureStore, TagCounts
+from lelesk.frozen import write_frozen_model
+from lelesk.server import WSDService, WSDClient, make_server, parse_address
+
+
+def make_sent(text, tokens):
+    sent = ttl.Sentence(text)
+    sent.tokens = [t for t, _, _ in tokens]
+    for token, (_, pos, lemma) in zip(sent, tokens):
+        token.pos = pos
+        token.lemma = lemma
+    return sent
+
+
+class TestServer(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        path = os.path.join(self.tmpdir.name, 'lelesk.llz')
+        store = SignatureStore()
+        store.add('02512053-n', ['fish', 'aquatic', 'shark', 'water'])
+        store.add('07775375-n', ['fish', 'food', 'flesh'])
+        tagcounts = TagCounts()
+        tagcounts.add('02512053-n', 12)
+        tagcounts.add('07775375-n', 12)
+        words = {'fish': [('n07775375', 'n'), ('n02512053', 'n')]}
+        write_frozen_model(path, store, tagcounts, words, {}, lelesk_version='test')
+        wsd = LeLeskWSD.from_frozen(path, wng_db_loc=os.path.join(self.tmpdir.name, 'missing_gwn.db'),
+                                    wn30_loc=os.path.join(self.tmpdir.name, 'missing_wn.db'))
+        wsd.stopwords = frozenset(('in', 'the', 'with', 'a', 'I'))  # NLTK data are not needed
+        args = SimpleNamespace(method='lelesk', notag=False, nolemmatize=True, keep_tags=False)
+        self.service = WSDService(args, wsd)
+        self.sents = [make_sent('Fish in the water with a shark', [('Fish', 'NN', 'fish'), ('in', 'IN', 'in'), ('the', 'DT', 'the'),
+                                                                   ('water', 'NN', 'water'), ('with', 'IN', 'with'),
+                                                                   ('a', 'DT', 'a'), ('shark', 'NN', 'shark')]),
+                      make_sent('I cook fish', [('I', 'PRP', 'I'), ('cook', 'VBP', 'cook'), ('fish', 'NN', 'fish')])]
+
+    def tearDown(self):
+        self.service.wsd.disconnect()
+        self.tmpdir.cleanup()
+
+    def serve(self, address):
+        server = make_server(self.service, address)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(thread.join)
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        return server
+
+    def check_client(self, client):
+        sents = client.wsd(self.sents)
+        self.assertEqual([s.text for s in sents], [s.text for s in self.sents])
+        self.assertEqual([str(c.tag) for c in sents[0].concepts], ['02512053-n'])
+        self.assertEqual(sents[0].concepts[0].clemma, 'fish')
+        self.assertEqual([(t.text, t.pos, t.lemma) for t in sents[0]], [(t.text, t.pos, t.lemma) for t in self.sents[0]])
+        # candidates only
+        sents = client.wsd(self.sents[1:], candidates_only=True, notag=True)
+        self.assertEqual({str(c.tag) for c in sents[0].concepts}, {'02512053-n', '07775375-n'})
+        self.assertFalse(sents[0].tags)
+        # stream of sentences in chunks
+        sents = list(client.wsd_sents(iter(self.sents * 3), chunk_size=2, method='mfs'))
+        self.assertEqual([s.text for s in sents], [s.text for s in self.sents * 3])
+        with self.assertRaises(ValueError):
+            client.wsd(self.sents, method='unknown')
+        status = client.status()
+        self.assertEqual(status['requests'], 5)
+        self.assertEqual(status['sentences'], 9)
+
+    def test_parse_address(self):
+        self.assertEqual(parse_address('127.0.0.1:8080'), ('tcp', ('127.0.0.1', 8080)))
+        self.assertEqual(parse_address('http://localhost:8080/'), ('tcp', ('localhost', 8080)))
+        self.assertEqual(parse_address(':8080'), ('tcp', ('127.0.0.1', 8080)))
+        self.assertEqual(parse_address('unix:/tmp/lelesk.sock'), ('unix', '/tmp/lelesk.sock'))
+        self.assertEqual(parse_address('/tmp/lelesk.sock'), ('unix', '/tmp/lelesk.sock'))
+
+    def test_tcp_server(self):
+        server = self.serve('127.0.0.1:0')
+        self.check_client(WSDClient(server.address))
+
+    @unittest.skipUnless(hasattr(socket, 'AF_UNIX'), 'Unix sockets are not available')
+    def test_unix_server(self):
+        path = os.path.join(self.tmpdir.name, 'lelesk.sock')
+        self.serve('unix:' + path)
+        self.check_client(WSDClient(path))
+        # a live socket is not taken over
+        with self.assertRaises(OSError):
+            make_server(self.service, path)
+        self.assertEqual(WSDClient(path).status()['requests'], 5)
+        # a socket left by a stopped server is replaced
+        stale = os.path.join(self.tmpdir.name, 'stale.sock')
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.bind(stale)
+        make_server(self.service, stale).server_close()
+        self.assertFalse(os.path.exists(stale))
+
+    @unittest.skipUnless(hasattr(socket, 'AF_UNIX'), 'Unix sockets are not available')
+    def test_unix_server_file_exists(self):
+        path = os.path.join(self.tmpdir.name, 'notes.txt')
+        with open(path, 'w') as outfile:
+            outfile.write('notes')
+        with self.assertRaises(FileExistsError):
+            make_server(self.service, path)
+        with open(path) as infile:
+            self.assertEqual(infile.read(), 'notes')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Test memory-mapped signature files
+"""
+
+# This code is a part of lelesk library: https://github.com/letuananh/lelesk
+# :copyright: (c) 2014 Le Tuan Anh <tuananh.ke@gmail.com>
+# :license: MIT, see LICENSE for more details.
+
+import os
+import tempfile
+import unittest
+from lelesk import LeLeskWSD, LeskCache
+from lelesk.index import SignatureStore
+from lelesk.sigfile import SignatureFile, write_signature_file
+
+
+class TestSignatureFile(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.sig_path = os.path.join(self.tmpdir.name, 'lelesk.llsig')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_roundtrip(self):
+        store = SignatureStore()
+        store.add('07775375-n', ['fish', 'food', 'flesh', 'café'])
+        store.add('02512053-n', ['fish', 'aquatic', 'shark', 'water'])
+        store.add('01316949-n', [])
+        write_signature_file(self.sig_path, store, {'02512053-n': 12, '07775375-n': 0})
+        self.assertTrue(SignatureFile.is_signature_file(self.sig_path))
+        with SignatureFile(self.sig_path) as sigfile:
+            self.assertEqual(len(sigfile), 3)
+            self.assertEqual(len(sigfile.vocab), 7)
+            self.assertEqual(sigfile.synsetids, ['01316949-n', '02512053-n', '07775375-n'])
+            for sid in store.synsetids:
+                self.assertEqual(set(sigfile.tokens(sid)), set(store.tokens(sid)))
+            self.assertIsNone(sigfile.select('00000000-n'))
+            self.assertNotIn('00000000-n', sigfile)
+            self.assertEqual(sigfile.tagcount('02512053-n'), 12)
+            self.assertEqual(sigfile.tagcount('07775375-n'), 0)
+            self.assertIsNone(sigfile.tagcount('01316949-n'))
+            context = sigfile.vocab.encode(['fish', 'water', 'café', 'river'])
+            self.assertEqual(sigfile.overlap(sigfile.lookup('02512053-n'), context), 2)
+            self.assertEqual(sigfile.overlap(sigfile.lookup('07775375-n'), context), 2)
+            self.assertRaises(TypeError, lambda: sigfile.add('00000000-n', ['fish']))
+
+    def test_export_cache(self):
+        cache = LeskCache(os.path.join(self.tmpdir.name, 'lesk_cache.db'))
+        cache.cache('02512053-n', ['fish', 'aquatic', 'water'])
+        cache.cache('07775375-n', ['fish', 'food'])
+        cache.export(self.sig_path)
+        self.assertFalse(SignatureFile.is_signature_file(cache.db_file))
+        wsd = LeLeskWSD(dbcache=self.sig_path)
+        self.assertIsInstance(wsd.dbcache, SignatureFile)
+        self.assertIs(wsd.signatures, wsd.dbcache)
+        self.assertEqual(set(wsd.dbcache.select('02512053-n')), {'fish', 'aquatic', 'water'})
+        wsd.dbcache.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Test sparse signature matrix
+"""
+
+# This code is a part of lelesk library: https://github.com/letuananh/lelesk
+# :copyright: (c) 2014 Le Tuan Anh <tuananh.ke@gmail.com>
+# :license: MIT, see LICENSE for more details.
+
+import unittest
+from lelesk.index import SignatureStore
+from lelesk.sparse import SparseSignatures
+
+
+class TestSparseSignatures(unittest.TestCase):
+
+    def build_store(self):
+        store = SignatureStore()
+        store.add('02512053-n', ['fish', 'aquatic', 'shark', 'water'])
+        store.add('07775375-n', ['fish', 'food', 'flesh'])
+        store.add('01316949-n', ['dog', 'pet'])
+        return store
+
+    def test_overlap(self):
+        store = self.build_store()
+        for use_scipy in (True, False):
+            matrix = SparseSignatures(store, use_scipy=use_scipy)
+            self.assertEqual(len(matrix), 3)
+            self.assertIn('07775375-n', matrix)
+            self.assertNotIn('00000000-n', matrix)
+            sids = ['02512053-n', '07775375-n', '01316949-n']
+            context = {'fish', 'water', 'river'}
+            self.assertEqual(matrix.overlap(sids, context), [store.overlap(store.lookup(sid), store.vocab.encode(context)) for sid in sids])
+            self.assertEqual(matrix.overlap_batch(sids, [context, {'dog', 'food', 'fish'}, set()]),
+                             [[2, 1, 0], [1, 2, 0], [0, 1, 0]])
+            self.assertEqual(matrix.overlap_batch([], [context]), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Test lelesk's start-up time (heavy modules must be imported lazily)
+"""
+
+# This code is a part of lelesk library: https://github.com/letuananh/lelesk
+# :copyright: (c) 2014 Le Tuan Anh <tuananh.ke@gmail.com>
+# :license: MIT, see LICENSE for more details.
+
+import os
+import sys
+import json
+import time
+import tempfile
+import subprocess
+import unittest
+
+
+TEST_DIR = os.path.dirname(__file__)
+PROJECT_DIR = os.path.abspath(os.path.join(TEST_DIR, '..'))
+# generous wall-clock bounds (about 5 times the expected time) which only catch gross regressions,
+# lazy imports are checked with the lists of imported modules below
+IMPORT_BUDGET = 1.25  # seconds, import lelesk (in a fresh interpreter)
+CLI_BUDGET = 10.0  # seconds, start python, parse arguments and print help
+HEAVY_MODULES = ('nltk', 'scipy', 'numpy', 'sqlite3', 'yawlib', 'texttaglib')  # must not be imported by import lelesk
+CLI_HEAVY_MODULES = ('nltk', 'scipy', 'numpy')  # must not be imported to print help
+
+IMPORT_SCRIPT = '''
+import sys, json, time
+started = time.perf_counter()
+import lelesk
+elapsed = time.perf_counter() - started
+import lelesk.wsdtk
+print(json.dumps({'elapsed': elapsed, 'modules': [m for m in sys.modules if m.split('.')[0] in %r]}))
+''' % (HEAVY_MODULES,)
+
+CLI_SCRIPT = '''
+import sys, json, runpy
+sys.argv = ['lelesk', 'wsd', '-h']
+try:
+    runpy.run_module('lelesk', run_name='__main__')
+except SystemExit:
+    pass
+sys.stderr.write(json.dumps({'modules': [m for m in sys.modules if m.split('.')[0] in %r]}))
+''' % (CLI_HEAVY_MODULES,)
+
+
+def run_python(script, cwd):
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(p for p in (PROJECT_DIR, env.get('PYTHONPATH')) if p)
+    started = time.perf_counter()
+    proc = subprocess.run([sys.executable, '-c', script], cwd=cwd, env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True, check=True)
+    return proc, time.perf_counter() - started
+
+
+class TestStartup(unittest.TestCase):
+
+    def test_import(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            proc, _ = run_python(IMPORT_SCRIPT, tmpdir)
+            # importing lelesk does not configure logging (no logs folder)
+            self.assertEqual(os.listdir(tmpdir), [])
+        info = json.loads(proc.stdout.splitlines()[-1])
+        # the toolkit module needs texttaglib, yawlib and sqlite3, but not NLTK or scipy
+        self.assertFalse([m for m in info['modules'] if m.split('.')[0] in CLI_HEAVY_MODULES])
+        self.assertLess(info['elapsed'], IMPORT_BUDGET)
+
+    def test_import_no_heavy_modules(self):
+        script = ("import sys, lelesk; print(sorted(m for m in sys.modules if m.split('.')[0] in %r or m == 'lelesk.main'))"
+                  % (HEAVY_MODULES,))
+        with tempfile.TemporaryDirectory() as tmpdir:
+            proc, _ = run_python(script, tmpdir)
+        self.assertEqual(proc.stdout.strip(), '[]')
+
+    def test_cli_help(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            proc, elapsed = run_python(CLI_SCRIPT, tmpdir)
+        self.assertIn('usage:', proc.stdout)
+        self.assertEqual(json.loads(proc.stderr.splitlines()[-1])['modules'], [])
+        self.assertLess(elapsed, CLI_BUDGET)
+
+
+if __name__ == '__main__':
+    unittest.main()
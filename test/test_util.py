@@ -12,8 +12,11 @@ Test lelesk's  utility functions
 import os
 import unittest
 import logging
+import tempfile
 from lelesk import LeLeskWSD, LeskCache
 from lelesk.util import tokenize
+from lelesk.wsdtk import iter_ttl_tsv
+from texttaglib.chirptext import ttl
 
 
 TEST_DIR = os.path.dirname(__file__)
@@ -60,11 +63,48 @@ class TestMain(unittest.TestCase):
         self.assertEqual(set(leset), set(lesetc))
         # TODO: Test this method properly
 
+    def test_build_lelesk_sets(self):
+        wsd = LeLeskWSD()
+        synsetids = [ss.ID for ss in wsd.smart_synset_search('fish', 'n')]
+        lesets = wsd.build_lelesk_sets(synsetids)
+        self.assertEqual(set(lesets.keys()), {str(sid) for sid in synsetids})
+        self.assertEqual(len(lesets['02512053-n']), 192)
+        for sid in synsetids:
+            self.assertEqual(lesets[str(sid)], wsd.build_lelesk_set(sid))
+        self.assertIsInstance(wsd.stopwords, frozenset)
+        self.assertFalse(wsd.stopwords.intersection(lesets['02512053-n']))
+
     def test_tokenize(self):
         text = 'I have eaten some cakes and gave my dogs some too.'
         actual = tokenize(text)
         print(actual)
 
+    def test_lemmatize_sents(self):
+        wsd = LeLeskWSD()
+        sents = [ttl.Sentence('I have eaten some cakes.'), ttl.Sentence('My dogs ate some cakes too.')]
+        for sent in sents:
+            sent.tokens = wsd.tokenize(sent.text)
+        wsd.lemmatize_ttl_sents(sents)
+        self.assertEqual([t.lemma for t in sents[0]], [l for _, _, l in wsd.lemmatize(wsd.tokenize(sents[0].text))])
+        self.assertEqual(sents[1][1].lemma, 'dog')
+        self.assertEqual(sents[1][4].lemma, 'cake')
+        # 'cakes' as NNS is lemmatized once
+        self.assertGreater(wsd.lemma_cache.hits, 0)
+
+    def test_lemmatize_keep_existing(self):
+        wsd = LeLeskWSD()
+        sent = ttl.Sentence('My dogs ate some cakes.')
+        sent.tokens = wsd.tokenize(sent.text)
+        sent[1].pos = 'NNS'
+        sent[1].lemma = 'doggy'
+        sent[3].lemma = 'any'  # a lemma without POS
+        sent[4].pos = 'NN'
+        wsd.lemmatize_ttl_sents([sent], keep_existing=True)
+        self.assertEqual((sent[1].pos, sent[1].lemma), ('NNS', 'doggy'))
+        self.assertEqual((sent[3].pos, sent[3].lemma), ('DT', 'any'))
+        self.assertEqual((sent[4].pos, sent[4].lemma), ('NN', 'cake'))
+        self.assertEqual(sent[2].lemma, 'eat')
+
     def test_stopwords(self):
         wsd = LeLeskWSD()
         print(wsd.stopwords)
@@ -88,5 +128,48 @@ class TestMain(unittest.TestCase):
         self.assertEqual(len(ls), 192)
 
 
+class TestStreaming(unittest.TestCase):
+
+    def write_doc(self, folder):
+        path = os.path.join(folder, 'doc')
+        doc = ttl.Document('doc', folder)
+        for idx, text in enumerate(('I eat fish.', 'Fish swim.', 'Sharks eat fish.')):
+            sent = doc.new_sent(text, ID=idx + 1)
+            sent.tokens = text[:-1].split() + ['.']
+            sent.new_concept('02512053-n', clemma='fish', tokens=[sent[len(sent) - 2]])
+            sent.new_tag('note', 0, 1, tagtype='test')
+        ttl.write(path, doc)
+        return path
+
+    def test_iter_ttl_tsv(self):
+        with tempfile.TemporaryDirectory() as folder:
+            path = self.write_doc(folder)
+            expected = ttl.read(path)
+            sents = list(iter_ttl_tsv(path))
+            self.assertEqual([s.to_json() for s in sents], [s.to_json() for s in expected])
+
+    def test_iter_ttl_tsv_invalid(self):
+        with tempfile.TemporaryDirectory() as folder:
+            path = self.write_doc(folder)
+            # a row of an unknown sentence
+            with open(path + '_tags.txt', 'a') as outfile:
+                outfile.write('999\t0\t1\tnote\ttest\n')
+            with self.assertRaises(KeyError) as cm:
+                list(iter_ttl_tsv(path))
+            self.assertIn('999', str(cm.exception))
+            self.assertIn('doc_tags.txt', str(cm.exception))
+            # rows which are not in the same order as sentences
+            for name in ('tokens', 'concepts'):
+                path = self.write_doc(folder)
+                with open('{}_{}.txt'.format(path, name)) as infile:
+                    rows = infile.readlines()
+                with open('{}_{}.txt'.format(path, name), 'w') as outfile:
+                    outfile.writelines(reversed(rows))
+                with self.assertRaises(KeyError) as cm:
+                    list(iter_ttl_tsv(path))
+                self.assertIn('Invalid', str(cm.exception))
+                self.assertIn('doc_', str(cm.exception))
+
+
 if __name__ == '__main__':
     unittest.main()